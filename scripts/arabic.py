@@ -0,0 +1,75 @@
+"""
+Arabic text normalization shared by the sync's parsing, detection,
+sentiment, headline dedup and search.
+
+Arabic spellings of the same word differ in ways that literal string
+matching treats as different words: hamza on alef (إسرائيل / اسرائيل),
+alef maqsura vs ya (مستشفى / مستشفي), ta marbuta vs ha (غزة / غزه),
+harakat and tatweel. Both forms below fold those with one precomputed
+str.translate table:
+
+- normalize_arabic(text): harakat (U+064B-U+065F), superscript alef and
+  tatweel removed; أ إ آ ٱ -> ا, ى -> ي, ة -> ه. Identical to the
+  database's public.normalize_arabic(), which builds articles.search_vector,
+  and to normalizeArabic() in src/lib/arabic.ts (shared fixtures in
+  tests/fixtures/arabic-normalization-cases.json).
+- normalize(text): normalize_arabic() of the lowercased text - the form
+  keyword tables and texts are compared in. Callers normalize a text once
+  and pass the result to every matcher.
+
+Keyword tables are normalized once at import with normalize_keys(), so
+they need one entry per word instead of one per spelling.
+
+Usage:
+    python arabic.py --check-fixtures
+"""
+
+import sys
+import json
+from pathlib import Path
+
+FIXTURES_FILE = Path(__file__).parent.parent / 'tests' / 'fixtures' / 'arabic-normalization-cases.json'
+
+# Removed: harakat, superscript alef, tatweel
+ARABIC_MARKS = [chr(c) for c in range(0x064B, 0x0660)] + ['\u0670', '\u0640']
+
+# Letter variants folded to one form
+ARABIC_FOLDS = {
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي',
+    'ة': 'ه',
+}
+
+_TABLE = str.maketrans({**dict.fromkeys(ARABIC_MARKS), **ARABIC_FOLDS})
+
+
+def normalize_arabic(text: str) -> str:
+    """Text with Arabic marks removed and letter variants folded (search form)."""
+    return text.translate(_TABLE)
+
+
+def normalize(text: str) -> str:
+    """Lowercased, Arabic-normalized text (matching form)."""
+    return text.lower().translate(_TABLE)
+
+
+def normalize_keys(table: dict) -> dict:
+    """Keyword table with normalized keys (variants that fold together merge)."""
+    return {normalize(key): value for key, value in table.items()}
+
+
+def check_fixtures(path: Path = FIXTURES_FILE) -> bool:
+    """Compare normalize_arabic with the shared fixtures."""
+    cases = json.loads(path.read_text(encoding='utf-8'))
+    failures = [case for case in cases if normalize_arabic(case['input']) != case['normalized']]
+    for case in failures:
+        print(f"  FAIL {case['input']!r}: expected {case['normalized']!r}, got {normalize_arabic(case['input'])!r}")
+    print(f"{len(cases) - len(failures)}/{len(cases)} normalization fixtures match")
+    return not failures
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] != ['--check-fixtures']:
+        print("Usage: python arabic.py --check-fixtures")
+        sys.exit(2)
+    sys.exit(0 if check_fixtures() else 1)
@@ -0,0 +1,259 @@
+"""
+Columnar in-memory index of the article set, for aggregate computation.
+
+Articles are stored as NumPy arrays instead of row dicts:
+
+- channel, category and sentiment: dictionary-encoded integer codes, one
+  per article (`codes[i]` indexes into the column's vocabulary list)
+- countries and organizations: multi-valued, stored as flat arrays of
+  (article row, code) pairs, deduplicated per article
+- telegram_date: int64 seconds since the epoch (UTC); NO_DATE if missing
+
+Group-by counts, daily counts, rolling windows and per-channel splits are
+then single vectorized passes (np.bincount / np.cumsum) instead of Python
+loops over every row. The index is built from rows as they come out of
+the paginated export (from_rows / from_supabase); building is the only
+per-row Python work.
+
+Usage:
+    index = ArticleIndex.from_supabase(supabase)
+    index.value_counts('countries')            # {'Iran': 812, ...}
+    index.value_counts('category', by_channel=True)
+    days, counts = index.daily_counts()
+"""
+
+from array import array
+from datetime import datetime, timezone
+
+import numpy as np
+
+from metrics_snapshot import sentiment_label
+
+SECONDS_PER_DAY = 86400
+
+# telegram_date sentinel for articles without a date
+NO_DATE = np.iinfo(np.int64).min
+
+# Columns the index is built from
+INDEX_COLUMNS = 'id, channel, category, countries, organizations, telegram_date, sentiment_score'
+
+SINGLE_VALUED = ('channel', 'category', 'sentiment')
+MULTI_VALUED = ('countries', 'organizations')
+
+
+def iter_article_rows(supabase, columns: str = INDEX_COLUMNS, batch_size: int = 1000):
+    """
+    Yield every article row, read in id order with keyset pagination.
+    Stops on an empty page: the server may cap pages below batch_size.
+    """
+    last_id = 0
+    while True:
+        result = supabase.table('articles').select(columns).gt(
+            'id', last_id
+        ).order('id').limit(batch_size).execute()
+        if not result.data:
+            return
+        yield from result.data
+        last_id = result.data[-1]['id']
+
+
+def utc_timestamp(value) -> int:
+    """Seconds since the epoch for an ISO 8601 telegram_date (NO_DATE if unparsable)."""
+    if not value:
+        return NO_DATE
+    try:
+        return int(datetime.fromisoformat(str(value).replace('Z', '+00:00')).astimezone(timezone.utc).timestamp())
+    except ValueError:
+        return NO_DATE
+
+
+class _Encoder:
+    """Assigns dense integer codes to values in first-seen order."""
+
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+
+    def encode(self, value) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class ArticleIndex:
+    """Dictionary-encoded, array-backed article set."""
+
+    def __init__(self, size: int, timestamps, single: dict, multi: dict):
+        self.size = size
+        # int64 seconds since the epoch, NO_DATE if missing
+        self.timestamps = timestamps
+        # column -> (codes, vocabulary)
+        self.single = single
+        # column -> (article rows, codes, vocabulary)
+        self.multi = multi
+
+    def __len__(self) -> int:
+        return self.size
+
+    # --- building ---
+
+    @classmethod
+    def from_rows(cls, rows) -> 'ArticleIndex':
+        """Build the index from article row dicts (any iterable, consumed once)."""
+        encoders = {name: _Encoder() for name in SINGLE_VALUED + MULTI_VALUED}
+        single_codes = {name: array('i') for name in SINGLE_VALUED}
+        multi_rows = {name: array('i') for name in MULTI_VALUED}
+        multi_codes = {name: array('i') for name in MULTI_VALUED}
+        timestamps = array('q')
+
+        size = 0
+        for row in rows:
+            single_codes['channel'].append(encoders['channel'].encode(row.get('channel') or ''))
+            single_codes['category'].append(encoders['category'].encode(row.get('category') or 'Analysis'))
+            single_codes['sentiment'].append(encoders['sentiment'].encode(sentiment_label(row)))
+            for name in MULTI_VALUED:
+                values = set(row.get(name) or [])
+                if values:
+                    encode = encoders[name].encode
+                    multi_codes[name].extend(encode(v) for v in values)
+                    multi_rows[name].extend([size] * len(values))
+            timestamps.append(utc_timestamp(row.get('telegram_date')))
+            size += 1
+
+        def as_numpy(data: array, dtype) -> np.ndarray:
+            return np.frombuffer(data, dtype=dtype).copy() if len(data) else np.zeros(0, dtype=dtype)
+
+        return cls(
+            size,
+            as_numpy(timestamps, np.int64),
+            {name: (as_numpy(single_codes[name], np.int32), encoders[name].values) for name in SINGLE_VALUED},
+            {
+                name: (as_numpy(multi_rows[name], np.int32), as_numpy(multi_codes[name], np.int32), encoders[name].values)
+                for name in MULTI_VALUED
+            },
+        )
+
+    @classmethod
+    def from_supabase(cls, supabase, batch_size: int = 1000) -> 'ArticleIndex':
+        """Build the index from the articles table (paginated export)."""
+        return cls.from_rows(iter_article_rows(supabase, INDEX_COLUMNS, batch_size))
+
+    # --- columns ---
+
+    def days(self) -> np.ndarray:
+        """Day number (days since the epoch, UTC) per article; -1 if undated."""
+        days = np.full(self.size, -1, dtype=np.int64)
+        dated = self.timestamps != NO_DATE
+        days[dated] = self.timestamps[dated] // SECONDS_PER_DAY
+        return days
+
+    def channel_mask(self, channel: str) -> np.ndarray:
+        """Boolean mask of the articles in one channel."""
+        codes, vocabulary = self.single['channel']
+        if channel not in vocabulary:
+            return np.zeros(self.size, dtype=bool)
+        return codes == vocabulary.index(channel)
+
+    # --- aggregates ---
+
+    def code_counts(self, column: str, mask: np.ndarray | None = None) -> np.ndarray:
+        """Article count per code of a column (optionally only masked articles)."""
+        if column in self.single:
+            codes, vocabulary = self.single[column]
+            if mask is not None:
+                codes = codes[mask]
+        else:
+            rows, codes, vocabulary = self.multi[column]
+            if mask is not None:
+                codes = codes[mask[rows]]
+        return np.bincount(codes, minlength=len(vocabulary))
+
+    def value_counts(self, column: str, by_channel: bool = False, mask: np.ndarray | None = None) -> dict:
+        """
+        {value: article count} for a column, or {channel: {value: count}}
+        with by_channel (one bincount over channel * vocabulary + code).
+        """
+        vocabulary = (self.single.get(column) or self.multi[column])[-1]
+        if not by_channel:
+            counts = self.code_counts(column, mask)
+            return {vocabulary[code]: int(counts[code]) for code in np.flatnonzero(counts)}
+
+        channel_codes, channels = self.single['channel']
+        if column in self.single:
+            codes = self.single[column][0]
+            article_channels = channel_codes
+        else:
+            rows, codes, _ = self.multi[column]
+            article_channels = channel_codes[rows]
+            if mask is not None:
+                mask = mask[rows]
+        if mask is not None:
+            codes, article_channels = codes[mask], article_channels[mask]
+        counts = np.bincount(
+            article_channels.astype(np.int64) * len(vocabulary) + codes,
+            minlength=len(channels) * len(vocabulary),
+        ).reshape(len(channels), len(vocabulary))
+        return {
+            channel: {vocabulary[code]: int(counts[i, code]) for code in np.flatnonzero(counts[i])}
+            for i, channel in enumerate(channels)
+        }
+
+    def daily_counts(self, mask: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """(day numbers, article counts) over the dated articles' full day range, zeros included."""
+        days = self.days()
+        dated = days >= 0 if mask is None else (days >= 0) & mask
+        days = days[dated]
+        if not len(days):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        first = days.min()
+        counts = np.bincount(days - first)
+        return np.arange(first, first + len(counts)), counts
+
+    @staticmethod
+    def rolling_sum(counts: np.ndarray, window: int) -> np.ndarray:
+        """Trailing window sums (e.g. 7-day totals per day) via one cumulative sum."""
+        totals = np.cumsum(counts)
+        totals[window:] = totals[window:] - totals[:-window]
+        return totals
+
+    def topic_counts(self, columns=MULTI_VALUED, bucket_seconds: int = SECONDS_PER_DAY, since_bucket: int = 0) -> dict:
+        """
+        {bucket number: {topic: articles}} for articles in time buckets of
+        bucket_seconds (bucket n starts n * bucket_seconds after the epoch)
+        from since_bucket on. An article's topics are the union of its
+        values in columns (a value in two columns counts once per article).
+        """
+        topics = _Encoder()
+        pair_rows, pair_topics = [], []
+        for column in columns:
+            rows, codes, vocabulary = self.multi[column]
+            # Map this column's codes into the shared topic vocabulary
+            remap = np.array([topics.encode(v) for v in vocabulary], dtype=np.int64)
+            pair_rows.append(rows)
+            pair_topics.append(remap[codes] if len(codes) else np.zeros(0, dtype=np.int64))
+        if not pair_rows:
+            return {}
+        rows = np.concatenate(pair_rows).astype(np.int64)
+        codes = np.concatenate(pair_topics)
+
+        timestamps = self.timestamps[rows]
+        buckets = timestamps // bucket_seconds
+        keep = (timestamps != NO_DATE) & (buckets >= since_bucket)
+        rows, codes, buckets = rows[keep], codes[keep], buckets[keep]
+        # One mention per (article, topic)
+        _, first = np.unique(rows * len(topics.values) + codes, return_index=True)
+        codes, buckets = codes[first], buckets[first]
+
+        result = {}
+        if not len(buckets):
+            return result
+        first_bucket = buckets.min()
+        n_topics = len(topics.values)
+        counts = np.bincount((buckets - first_bucket) * n_topics + codes)
+        counts = np.pad(counts, (0, -len(counts) % n_topics)).reshape(-1, n_topics)
+        for offset in np.flatnonzero(counts.any(axis=1)):
+            row = counts[offset]
+            result[int(first_bucket + offset)] = {topics.values[c]: int(row[c]) for c in np.flatnonzero(row)}
+        return result
@@ -0,0 +1,322 @@
+"""
+Bulk import / export of the articles table as NDJSON.
+
+One article per line, as JSON; files ending in .gz are gzip-compressed
+JSONL. Both directions stream, so memory stays bounded by one batch
+whatever the size of the table:
+
+- export: reads the table in id order with keyset pagination
+  (`id > last_id`, --batch-size rows per request) and writes each page as
+  it arrives. The file is written under a .partial name and renamed when
+  complete, so an interrupted export never looks like a backup.
+- import: reads the file line by line, validates every row against
+  ARTICLE_SCHEMA (known columns, types, required fields, allowed values)
+  and upserts valid rows on telegram_id in batches. Invalid lines are
+  reported with their line number and skipped; the exit code is 1 if
+  there were any. --dry-run only validates.
+
+Imports assign new ids by default, so links between articles
+(translation_of) are dropped; re-pair afterwards with
+`python translations.py --rebuild`. --keep-ids restores ids and links
+as exported (links are written after all rows, as they can point at a
+later row) - for restoring a backup into an empty table. On Postgres,
+reset the id sequence after such an import:
+`SELECT setval('articles_id_seq', (SELECT MAX(id) FROM articles));`
+
+--store PATH reads or writes a local SQLite store (local_store.LocalClient)
+instead of Supabase, e.g. to seed a stand-in database for benchmarks
+from an export.
+
+Usage:
+    python article_io.py export articles.jsonl.gz
+    python article_io.py export en.ndjson --channel en
+    python article_io.py import articles.jsonl.gz --dry-run
+    python article_io.py import articles.jsonl.gz --store bench.db
+    python article_io.py import backup.jsonl.gz --keep-ids
+"""
+
+import os
+import sys
+import gzip
+import json
+import argparse
+from pathlib import Path
+from datetime import datetime
+from dotenv import load_dotenv
+
+# Fix Windows console encoding for Arabic
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+load_dotenv()
+
+SUPABASE_URL = os.getenv('SUPABASE_URL', 'https://gbqvivmfivsuvvdkoiuc.supabase.co')
+SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_KEY')
+
+CHANNELS = ('en', 'ar')
+STATUSES = ('draft', 'published', 'archived')
+
+# Rows per request
+DEFAULT_BATCH_SIZE = 500
+
+# Invalid lines printed in full (the rest are only counted)
+MAX_REPORTED_ERRORS = 20
+
+# column -> (type, required). Types: 'text', 'int', 'real', 'bool',
+# 'timestamp', 'text[]'. search_vector is built by a trigger and never
+# exported.
+ARTICLE_SCHEMA = {
+    'id': ('int', False),
+    'telegram_id': ('text', True),
+    'slug': ('text', True),
+    'channel': ('text', True),
+    'title': ('text', True),
+    'excerpt': ('text', False),
+    'content': ('text', True),
+    'category': ('text', False),
+    'countries': ('text[]', False),
+    'organizations': ('text[]', False),
+    'is_structured': ('bool', False),
+    'telegram_link': ('text', True),
+    'telegram_date': ('timestamp', True),
+    'status': ('text', False),
+    'published_at': ('timestamp', False),
+    'scheduled_at': ('timestamp', False),
+    'author_id': ('text', False),
+    'last_edited_by': ('text', False),
+    'image_url': ('text', False),
+    'video_url': ('text', False),
+    'media_hash': ('text', False),
+    'sentiment_score': ('real', False),
+    'translation_of': ('int', False),
+    'views': ('int', False),
+    'likes_count': ('int', False),
+    'dislikes_count': ('int', False),
+    'comment_count': ('int', False),
+    'created_at': ('timestamp', False),
+    'updated_at': ('timestamp', False),
+}
+
+EXPORT_COLUMNS = ', '.join(ARTICLE_SCHEMA)
+
+
+def open_text(path: Path, mode: str, name: str | None = None):
+    """Open an NDJSON file for text 'r' / 'w', gzip-compressed if it (or name) ends in .gz."""
+    if (name or path.name).endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8', compresslevel=6)
+    return open(path, mode, encoding='utf-8')
+
+
+def is_timestamp(value) -> bool:
+    try:
+        datetime.fromisoformat(value.replace('Z', '+00:00'))
+        return True
+    except (AttributeError, ValueError):
+        return False
+
+
+def check_type(value, kind: str) -> bool:
+    """Whether a non-null JSON value fits a column type."""
+    if kind == 'text':
+        return isinstance(value, str)
+    if kind == 'int':
+        return isinstance(value, int) and not isinstance(value, bool)
+    if kind == 'real':
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    if kind == 'bool':
+        return isinstance(value, bool)
+    if kind == 'timestamp':
+        return is_timestamp(value)
+    if kind == 'text[]':
+        return isinstance(value, list) and all(isinstance(item, str) for item in value)
+    raise ValueError(f"unknown column type {kind!r}")
+
+
+def validate_row(row) -> list[str]:
+    """Schema errors of one imported row (empty if valid)."""
+    if not isinstance(row, dict):
+        return ['not a JSON object']
+    errors = [f"unknown column {column!r}" for column in row if column not in ARTICLE_SCHEMA]
+    for column, (kind, required) in ARTICLE_SCHEMA.items():
+        value = row.get(column)
+        if value is None:
+            if required:
+                errors.append(f"missing {column}")
+        elif not check_type(value, kind):
+            errors.append(f"{column} is not a valid {kind}: {value!r:.40}")
+        elif kind == 'text' and required and not value.strip():
+            errors.append(f"empty {column}")
+    if row.get('channel') is not None and row['channel'] not in CHANNELS:
+        errors.append(f"channel must be one of {', '.join(CHANNELS)}")
+    if row.get('status') is not None and row['status'] not in STATUSES:
+        errors.append(f"status must be one of {', '.join(STATUSES)}")
+    score = row.get('sentiment_score')
+    if check_type(score, 'real') and not -1 <= score <= 1:
+        errors.append("sentiment_score must be within [-1, 1]")
+    return errors
+
+
+def iter_articles(supabase, channel: str | None, batch_size: int):
+    """
+    Yield article rows in id order, one keyset-paginated page at a time.
+    Stops on an empty page: the server may cap a page below batch_size
+    (PostgREST max-rows), so a short page doesn't mean the end.
+    """
+    last_id = 0
+    while True:
+        query = supabase.table('articles').select(EXPORT_COLUMNS).gt('id', last_id)
+        if channel:
+            query = query.eq('channel', channel)
+        result = query.order('id').limit(batch_size).execute()
+        if not result.data:
+            return
+        yield from result.data
+        last_id = result.data[-1]['id']
+
+
+def export_articles(supabase, path: Path, channel: str | None = None, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Write the articles table to an NDJSON file. Returns the number of rows."""
+    partial = path.with_name(path.name + '.partial')
+    count = 0
+    with open_text(partial, 'w', name=path.name) as f:
+        for row in iter_articles(supabase, channel, batch_size):
+            f.write(json.dumps(row, ensure_ascii=False) + '\n')
+            count += 1
+            if count % (batch_size * 10) == 0:
+                print(f"  {count} articles exported...")
+    partial.replace(path)
+    return count
+
+
+def read_rows(path: Path, stats: dict):
+    """Yield (line number, row) of the valid rows of an NDJSON file; invalid ones are counted and reported."""
+    with open_text(path, 'r') as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+                errors = validate_row(row)
+            except json.JSONDecodeError as e:
+                errors = [f"invalid JSON: {e.msg}"]
+            if errors:
+                stats['invalid'] += 1
+                if stats['invalid'] <= MAX_REPORTED_ERRORS:
+                    print(f"  line {number}: {'; '.join(errors)}")
+                continue
+            yield number, row
+
+
+def upsert_batch(supabase, batch: list[tuple[int, dict]], stats: dict):
+    """
+    Upsert rows on telegram_id in one request, falling back to one request
+    per row if the batch fails so one bad row doesn't block the others.
+    """
+    try:
+        supabase.table('articles').upsert([row for _, row in batch], on_conflict='telegram_id').execute()
+        stats['written'] += len(batch)
+        return
+    except Exception as e:
+        if len(batch) > 1:
+            print(f"    Batch upsert failed ({e}), retrying row by row")
+    for number, row in batch:
+        try:
+            supabase.table('articles').upsert(row, on_conflict='telegram_id').execute()
+            stats['written'] += 1
+        except Exception as row_error:
+            stats['errors'] += 1
+            print(f"  line {number}: {row['telegram_id']}: {row_error}")
+
+
+def import_articles(
+    supabase, path: Path, batch_size: int = DEFAULT_BATCH_SIZE, keep_ids: bool = False, dry_run: bool = False,
+) -> dict:
+    """Validate and upsert the rows of an NDJSON file in batches. Returns stats."""
+    stats = {'valid': 0, 'invalid': 0, 'written': 0, 'errors': 0, 'links': 0}
+    # (id, translation_of) pairs, written once every row exists
+    links = []
+    batch = []
+    for number, row in read_rows(path, stats):
+        stats['valid'] += 1
+        counterpart = row.pop('translation_of', None)
+        if not keep_ids:
+            row.pop('id', None)
+        elif counterpart is not None and row.get('id') is not None:
+            links.append((row['id'], counterpart))
+        if dry_run:
+            continue
+        batch.append((number, row))
+        if len(batch) >= batch_size:
+            upsert_batch(supabase, batch, stats)
+            batch = []
+            if stats['valid'] % (batch_size * 10) == 0:
+                print(f"  {stats['valid']} articles imported...")
+    if batch:
+        upsert_batch(supabase, batch, stats)
+
+    if dry_run:
+        return stats
+    for article_id, counterpart in links:
+        try:
+            supabase.table('articles').update({'translation_of': counterpart}).eq('id', article_id).execute()
+            stats['links'] += 1
+        except Exception as e:
+            stats['errors'] += 1
+            print(f"  Error linking article {article_id} to {counterpart}: {e}")
+    return stats
+
+
+def get_client(store: str | None):
+    if store:
+        from local_store import LocalClient
+        return LocalClient(store)
+    if not SUPABASE_KEY:
+        print("Error: Missing SUPABASE_SERVICE_KEY in environment (or pass --store PATH).")
+        sys.exit(1)
+    from clients import get_supabase
+    return get_supabase(SUPABASE_URL, SUPABASE_KEY)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export or import the articles table as NDJSON (.gz for gzip)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = commands.add_parser('export', help='Write articles to an NDJSON file')
+    export_parser.add_argument('file', type=Path, help='Output file (.ndjson / .jsonl, or .gz)')
+    export_parser.add_argument('--channel', choices=CHANNELS, help='Only export this channel')
+
+    import_parser = commands.add_parser('import', help='Validate and upsert articles from an NDJSON file')
+    import_parser.add_argument('file', type=Path, help='Input file (.ndjson / .jsonl, or .gz)')
+    import_parser.add_argument('--keep-ids', action='store_true',
+                               help='Keep exported ids and translation links (restore into an empty table)')
+    import_parser.add_argument('--dry-run', action='store_true', help='Validate without writing')
+
+    for command in (export_parser, import_parser):
+        command.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                             help=f'Rows per request (default: {DEFAULT_BATCH_SIZE})')
+        command.add_argument('--store', metavar='PATH',
+                             help='Use a local SQLite store (local_store.LocalClient) instead of Supabase')
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        supabase = get_client(args.store)
+        print(f"Exporting articles to {args.file}...")
+        count = export_articles(supabase, args.file, args.channel, args.batch_size)
+        print(f"Exported {count} articles")
+        return
+
+    if not args.file.exists():
+        print(f"Error: {args.file} not found")
+        sys.exit(1)
+    supabase = None if args.dry_run else get_client(args.store)
+    print(f"{'Validating' if args.dry_run else 'Importing'} articles from {args.file}...")
+    stats = import_articles(supabase, args.file, args.batch_size, keep_ids=args.keep_ids, dry_run=args.dry_run)
+    print(f"{stats['valid']} valid, {stats['invalid']} invalid"
+          + ('' if args.dry_run else f", {stats['written']} written, {stats['errors']} errors")
+          + (f", {stats['links']} links" if args.keep_ids and not args.dry_run else ''))
+    if stats['invalid'] or stats['errors']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Typed article record passed between the fetch_telegram.py pipeline stages.
+
+combine_message_group / parse_message build an ArticleRecord, the media
+stage fills in image_url / video_url / media_hash, and
+smart_upsert_articles writes to_row() to the articles table. Pipeline-only
+metadata (part_count, message_id) lives in attributes that to_row() never
+emits, so nothing has to be stripped before saving.
+"""
+
+from dataclasses import dataclass, field
+
+
+@dataclass(slots=True)
+class ArticleRecord:
+    """One parsed article; field names match the articles table columns."""
+    telegram_id: str
+    channel: str
+    slug: str
+    title: str
+    excerpt: str
+    content: str
+    category: str
+    countries: list[str] = field(default_factory=list)
+    organizations: list[str] = field(default_factory=list)
+    is_structured: bool = False
+    telegram_link: str = ''
+    telegram_date: str = ''
+    status: str = 'published'
+    image_url: str | None = None
+    video_url: str | None = None
+    media_hash: str | None = None
+    sentiment_score: float | None = None
+
+    # Pipeline metadata - not stored
+    part_count: int = 1
+    message_id: int = 0
+
+    def to_row(self) -> dict:
+        """The articles table row for this record."""
+        return {
+            'telegram_id': self.telegram_id,
+            'channel': self.channel,
+            'slug': self.slug,
+            'title': self.title,
+            'excerpt': self.excerpt,
+            'content': self.content,
+            'category': self.category,
+            'countries': self.countries,
+            'organizations': self.organizations,
+            'is_structured': self.is_structured,
+            'telegram_link': self.telegram_link,
+            'telegram_date': self.telegram_date,
+            'status': self.status,
+            'image_url': self.image_url,
+            'video_url': self.video_url,
+            'media_hash': self.media_hash,
+            'sentiment_score': self.sentiment_score,
+        }
@@ -0,0 +1,173 @@
+"""
+Slug backfill and verification for The Observer articles.
+
+Python counterpart of backfill_slugs.js that works through the articles
+table in batches instead of loading it whole. Each channel is read in id
+order with keyset pagination (`id > last_id`), every page is slugged with
+generate_slugs() and compared with the stored slugs:
+
+- Verify (default): report articles whose slug is missing or is not the
+  slug of their title under any slug version (a -N collision suffix is
+  fine). Exits with code 1 if any are found, so it can run in CI.
+- --apply: give those articles a fresh slug of the current version, made
+  collision-free with SlugAllocator. Rewriting a slug changes the article
+  URL.
+- --check-fixtures: check version 1 of generate_slug against the shared
+  fixtures in tests/fixtures/slugify-cases.json (also run by
+  tests/lib/slugify.spec.ts).
+
+Website articles (telegram_id 'website/...') have hand-picked slugs and
+are skipped.
+
+Usage:
+    python backfill_slugs.py
+    python backfill_slugs.py --channel ar --apply
+    python backfill_slugs.py --check-fixtures
+"""
+
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+from dotenv import load_dotenv
+from clients import get_supabase
+from slugs import SLUG_VERSION, SLUG_VERSIONS, generate_slugs
+from slug_allocator import SlugAllocator, split_suffix
+
+# Fix Windows console encoding for Arabic
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+# Load environment variables
+load_dotenv()
+
+# Supabase credentials
+SUPABASE_URL = os.getenv('SUPABASE_URL', 'https://gbqvivmfivsuvvdkoiuc.supabase.co')
+SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_KEY')
+
+CHANNELS = ('en', 'ar')
+
+# Articles read per request
+DEFAULT_BATCH_SIZE = 500
+
+FIXTURES_FILE = Path(__file__).parent.parent / 'tests' / 'fixtures' / 'slugify-cases.json'
+
+# Articles published from the website keep the slug they were given
+WEBSITE_PREFIX = 'website/'
+
+
+def check_fixtures(path: Path = FIXTURES_FILE) -> bool:
+    """Compare generate_slug (version 1) with the expected slugs of the shared fixtures."""
+    cases = json.loads(path.read_text(encoding='utf-8'))
+    actual = generate_slugs(
+        [case['title'] for case in cases],
+        [case.get('fallbackId', '') for case in cases],
+        version=1,
+    )
+    failures = [(case, slug) for case, slug in zip(cases, actual) if slug != case['slug']]
+    for case, slug in failures:
+        print(f"  FAIL {case['title']!r}: expected {case['slug']!r}, got {slug!r}")
+    print(f"{len(cases) - len(failures)}/{len(cases)} slug fixtures match")
+    return not failures
+
+
+def iter_article_pages(supabase, channel: str, batch_size: int):
+    """Yield pages of (id, telegram_id, title, slug) rows in id order."""
+    last_id = 0
+    while True:
+        result = supabase.table('articles').select(
+            'id, telegram_id, title, slug'
+        ).eq('channel', channel).gt('id', last_id).order('id').limit(batch_size).execute()
+        if not result.data:
+            return
+        yield result.data
+        if len(result.data) < batch_size:
+            return
+        last_id = result.data[-1]['id']
+
+
+def find_mismatches(rows: list[dict]) -> list[tuple[dict, str]]:
+    """
+    (row, current-version base slug) for each row whose slug matches its
+    title under no slug version.
+    """
+    rows = [row for row in rows if not (row.get('telegram_id') or '').startswith(WEBSITE_PREFIX)]
+    titles = [row.get('title') or '' for row in rows]
+    fallback_ids = [row.get('telegram_id') or str(row['id']) for row in rows]
+    # Current version last, so it is the one reported and applied
+    bases_by_version = [
+        generate_slugs(titles, fallback_ids, version)
+        for version in sorted(SLUG_VERSIONS, key=lambda v: v == SLUG_VERSION)
+    ]
+    mismatches = []
+    for row, *bases in zip(rows, *bases_by_version):
+        slug = row.get('slug')
+        if not slug or all(split_suffix(slug, base) is None for base in bases):
+            mismatches.append((row, bases[-1]))
+    return mismatches
+
+
+def process_channel(supabase, channel: str, batch_size: int, apply: bool) -> tuple[int, int, int]:
+    """Verify (and with apply, fix) one channel. Returns (checked, mismatched, fixed)."""
+    allocator = SlugAllocator(supabase, channel) if apply else None
+    checked = mismatched = fixed = 0
+
+    for page in iter_article_pages(supabase, channel, batch_size):
+        checked += len(page)
+        mismatches = find_mismatches(page)
+        mismatched += len(mismatches)
+        if not mismatches:
+            continue
+
+        if not apply:
+            for row, base in mismatches:
+                print(f"  {row['telegram_id']}: {row.get('slug')!r} (expected {base!r})")
+            continue
+
+        allocator.prepare(base for _, base in mismatches)
+        for row, base in mismatches:
+            slug = allocator.allocate(base)
+            try:
+                supabase.table('articles').update({'slug': slug}).eq('id', row['id']).execute()
+                fixed += 1
+                print(f"  {row['telegram_id']}: {row.get('slug')!r} -> {slug!r}")
+            except Exception as e:
+                print(f"  Error updating {row['telegram_id']}: {e}")
+
+    return checked, mismatched, fixed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verify or backfill article slugs')
+    parser.add_argument('--channel', choices=CHANNELS, help='Only process this channel')
+    parser.add_argument('--apply', action='store_true', help='Write new slugs for mismatched articles')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Articles per request (default: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--check-fixtures', action='store_true',
+                        help='Only check generate_slug against tests/fixtures/slugify-cases.json')
+    args = parser.parse_args()
+
+    if args.check_fixtures:
+        sys.exit(0 if check_fixtures() else 1)
+
+    if not SUPABASE_KEY:
+        print("Error: Missing SUPABASE_SERVICE_KEY in environment.")
+        sys.exit(1)
+
+    supabase = get_supabase(SUPABASE_URL, SUPABASE_KEY)
+    total_mismatched = total_fixed = 0
+
+    for channel in ([args.channel] if args.channel else CHANNELS):
+        print(f"\n{'Backfilling' if args.apply else 'Verifying'} slugs for channel '{channel}'...")
+        checked, mismatched, fixed = process_channel(supabase, channel, args.batch_size, args.apply)
+        total_mismatched += mismatched
+        total_fixed += fixed
+        print(f"  {checked} checked, {mismatched} mismatched" + (f", {fixed} fixed" if args.apply else ''))
+
+    if total_mismatched > total_fixed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the columnar ArticleIndex (article_index.py).
+
+Builds synthetic article sets (default 10k, 100k and 1M articles) and
+times the dashboard aggregates - country/organization/category counts,
+daily trend and trending topics - computed two ways:
+
+- rows:  SnapshotAggregates.apply() over every row dict (the per-row path)
+- index: ArticleIndex.from_rows() once, then vectorized passes
+         (SnapshotAggregates.from_index), plus a per-channel split and a
+         rolling 7-day window to show the extra group-bys are cheap
+
+Both must give identical aggregates; the benchmark fails otherwise.
+
+Usage:
+    python scripts/bench_article_index.py
+    python scripts/bench_article_index.py --sizes 10000 100000 --runs 5
+"""
+
+import sys
+import time
+import random
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from metrics_snapshot import SnapshotAggregates
+from article_index import ArticleIndex
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+CHANNELS = ('en', 'ar')
+CATEGORIES = ('Military', 'Political', 'Economic', 'Intelligence', 'Diplomatic', 'Breaking', 'Analysis')
+COUNTRIES = tuple(f"Country {i}" for i in range(80))
+ORGANIZATIONS = tuple(f"Org {i}" for i in range(60))
+
+# Synthetic archive spans this many days before "now"
+ARCHIVE_DAYS = 3 * 365
+
+
+def synthetic_articles(count: int, now: datetime, seed: int = 1) -> list[dict]:
+    """Article rows shaped like the export (skewed country/org popularity)."""
+    rnd = random.Random(seed)
+    country_weights = [1 / (i + 1) for i in range(len(COUNTRIES))]
+    org_weights = [1 / (i + 1) for i in range(len(ORGANIZATIONS))]
+    rows = []
+    for i in range(count):
+        rows.append({
+            'id': i + 1,
+            'channel': CHANNELS[i % 2],
+            'category': rnd.choice(CATEGORIES),
+            'countries': rnd.choices(COUNTRIES, country_weights, k=rnd.randint(0, 3)),
+            'organizations': rnd.choices(ORGANIZATIONS, org_weights, k=rnd.randint(0, 2)),
+            'telegram_date': (now - timedelta(seconds=rnd.randint(0, ARCHIVE_DAYS * 86400))).isoformat(),
+        })
+    return rows
+
+
+def best_of(runs: int, func):
+    """(best seconds, last result) over runs calls."""
+    best, result = float('inf'), None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the columnar article index')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help='Article counts')
+    parser.add_argument('--runs', type=int, default=3, help='Timed runs per step (best is reported)')
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    today = now.date()
+
+    def rows_aggregates(rows):
+        aggregates = SnapshotAggregates()
+        for row in rows:
+            aggregates.apply(row, 1, today)
+        return aggregates
+
+    def index_extras(index):
+        index.value_counts('countries', by_channel=True)
+        index.value_counts('category', by_channel=True)
+        _, counts = index.daily_counts()
+        return ArticleIndex.rolling_sum(counts, 7)
+
+    print(f"  {'articles':>10} {'rows':>10} {'build':>10} {'index':>10} {'split+7d':>10} {'speedup':>8}")
+    ok = True
+    for size in args.sizes:
+        rows = synthetic_articles(size, now)
+        rows_time, expected = best_of(args.runs, lambda: rows_aggregates(rows))
+        build_time, index = best_of(args.runs, lambda: ArticleIndex.from_rows(rows))
+        index_time, actual = best_of(args.runs, lambda: SnapshotAggregates.from_index(index, today))
+        extras_time, _ = best_of(args.runs, lambda: index_extras(index))
+        del rows
+
+        expected.prune(today)
+        actual.prune(today)
+        if expected.to_state() != actual.to_state():
+            print(f"  MISMATCH at {size} articles: index aggregates differ from the per-row ones")
+            ok = False
+
+        print(f"  {size:>10,} {rows_time * 1000:8.1f}ms {build_time * 1000:8.1f}ms "
+              f"{index_time * 1000:8.1f}ms {extras_time * 1000:8.1f}ms {rows_time / index_time:7.1f}x")
+
+    print("\n  rows: per-row aggregates; build: rows -> index; index: aggregates from the index;")
+    print("  split+7d: per-channel country/category counts and rolling 7-day totals;")
+    print("  speedup: rows / index (the index is built once per export and reused).")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
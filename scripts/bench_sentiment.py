@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Sentiment scoring benchmark over the article archive.
+
+Scores the text of every article in a channel with score_text() (see
+sentiment.py) and reports throughput and the label distribution:
+
+- us/article, articles/s and MB/s of text (best of --runs)
+- negative / neutral / positive share of the archive
+- how many stored scores (articles.sentiment_score) differ from a fresh
+  score, e.g. after a lexicon change
+
+The corpus is read from Supabase in keyset-paginated batches, or from a
+local file with one article per line.
+
+Usage:
+    python scripts/bench_sentiment.py
+    python scripts/bench_sentiment.py --channel en --save en_articles.txt
+    python scripts/bench_sentiment.py --texts en_articles.txt --repeat 10
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+from collections import Counter
+from dotenv import load_dotenv
+from sentiment import score_text, score_label
+
+# Fix Windows console encoding for Arabic
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+load_dotenv()
+
+SUPABASE_URL = os.getenv('SUPABASE_URL', 'https://gbqvivmfivsuvvdkoiuc.supabase.co')
+SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_KEY')
+
+
+def iter_article_texts(supabase, channel: str, batch_size: int = 500):
+    """Yield (content, stored sentiment_score) for a channel in id order."""
+    last_id = 0
+    while True:
+        result = supabase.table('articles').select(
+            'id, content, sentiment_score'
+        ).eq('channel', channel).gt('id', last_id).order('id').limit(batch_size).execute()
+        for row in result.data:
+            yield row.get('content') or '', row.get('sentiment_score')
+        if len(result.data) < batch_size:
+            return
+        last_id = result.data[-1]['id']
+
+
+def load_corpus(args) -> tuple[list[str], list[float | None]]:
+    """(texts, stored scores) from --texts or the articles table."""
+    if args.texts:
+        texts = [line for line in args.texts.read_text(encoding='utf-8').splitlines() if line.strip()]
+        return texts, [None] * len(texts)
+
+    if not SUPABASE_KEY:
+        print("Error: Missing SUPABASE_SERVICE_KEY in environment (or pass --texts FILE).")
+        sys.exit(1)
+    from clients import get_supabase
+
+    supabase = get_supabase(SUPABASE_URL, SUPABASE_KEY)
+    texts, stored = [], []
+    for text, score in iter_article_texts(supabase, args.channel):
+        texts.append(text)
+        stored.append(score)
+    return texts, stored
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark sentiment scoring over the article archive')
+    parser.add_argument('--channel', choices=('en', 'ar'), default='ar', help="Corpus channel (default: ar)")
+    parser.add_argument('--texts', type=Path, metavar='FILE', help='Read articles from FILE (one per line)')
+    parser.add_argument('--save', type=Path, metavar='FILE', help='Save the corpus to FILE for offline runs')
+    parser.add_argument('--repeat', type=int, default=1, help='Repeat the corpus N times (default: 1)')
+    parser.add_argument('--runs', type=int, default=5, help='Timed runs (best is reported)')
+    args = parser.parse_args()
+
+    texts, stored = load_corpus(args)
+    if args.save:
+        args.save.write_text('\n'.join(t.replace('\n', ' ') for t in texts) + '\n', encoding='utf-8')
+        print(f"Saved {len(texts)} articles to {args.save}")
+    if not texts:
+        print("No articles in corpus")
+        sys.exit(1)
+    corpus = texts * args.repeat
+    megabytes = sum(len(t.encode('utf-8')) for t in corpus) / 1e6
+
+    print(f"Scoring {len(corpus)} articles ({megabytes:.1f} MB), best of {args.runs} runs\n")
+    best = float('inf')
+    scores = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        scores = [score_text(text) for text in corpus]
+        best = min(best, time.perf_counter() - start)
+
+    print(f"  {best / len(corpus) * 1e6:.1f} us/article, {len(corpus) / best:,.0f} articles/s, "
+          f"{megabytes / best:.1f} MB/s")
+
+    scores = scores[:len(texts)]
+    labels = Counter(score_label(score) for score in scores)
+    print("\n  " + ", ".join(f"{label} {labels[label] / len(texts):.1%}" for label in ('negative', 'neutral', 'positive')))
+    scored = [(old, new) for old, new in zip(stored, scores) if old is not None]
+    if scored:
+        changed = sum(abs(old - new) > 1e-6 for old, new in scored)
+        print(f"  {len(scored)} stored scores, {changed} differ from a fresh score")
+
+
+if __name__ == '__main__':
+    main()
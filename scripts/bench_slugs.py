@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Slug generation benchmark over the Arabic article corpus.
+
+Slugs every title in the corpus with each slug version (see slugs.py) and
+reports throughput and slug quality:
+
+- us/title and titles/s (best of --runs)
+- fallback: share of titles that ended up as `article-<hash>`
+- distinct: share of distinct base slugs (lower means more -N suffixes)
+
+The corpus is the titles of the 'ar' channel, read from Supabase in
+keyset-paginated batches, or from a local file with one title per line.
+
+Usage:
+    python scripts/bench_slugs.py
+    python scripts/bench_slugs.py --titles ar_titles.txt --repeat 20
+    python scripts/bench_slugs.py --save ar_titles.txt
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+from dotenv import load_dotenv
+from slugs import SLUG_VERSIONS, generate_slugs
+
+# Fix Windows console encoding for Arabic
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+load_dotenv()
+
+SUPABASE_URL = os.getenv('SUPABASE_URL', 'https://gbqvivmfivsuvvdkoiuc.supabase.co')
+SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_KEY')
+
+
+def load_corpus(args) -> tuple[list[str], list[str]]:
+    """(titles, fallback ids) from --titles or the articles table."""
+    if args.titles:
+        titles = [line for line in args.titles.read_text(encoding='utf-8').splitlines() if line.strip()]
+        return titles, [f"bench/{i}" for i in range(len(titles))]
+
+    if not SUPABASE_KEY:
+        print("Error: Missing SUPABASE_SERVICE_KEY in environment (or pass --titles FILE).")
+        sys.exit(1)
+    from clients import get_supabase
+    from backfill_slugs import iter_article_pages
+
+    supabase = get_supabase(SUPABASE_URL, SUPABASE_KEY)
+    titles, ids = [], []
+    for page in iter_article_pages(supabase, args.channel, 1000):
+        for row in page:
+            titles.append(row.get('title') or '')
+            ids.append(row.get('telegram_id') or str(row['id']))
+    return titles, ids
+
+
+def bench_version(titles: list[str], ids: list[str], version: int, runs: int) -> tuple[float, list[str]]:
+    """Best wall time over runs, and the slugs of the last run."""
+    best = float('inf')
+    slugs = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        slugs = generate_slugs(titles, ids, version)
+        best = min(best, time.perf_counter() - start)
+    return best, slugs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark slug generation over the article corpus')
+    parser.add_argument('--channel', choices=('en', 'ar'), default='ar', help="Corpus channel (default: ar)")
+    parser.add_argument('--titles', type=Path, metavar='FILE', help='Read titles from FILE (one per line)')
+    parser.add_argument('--save', type=Path, metavar='FILE', help='Save the corpus titles to FILE for offline runs')
+    parser.add_argument('--repeat', type=int, default=1, help='Repeat the corpus N times (default: 1)')
+    parser.add_argument('--runs', type=int, default=5, help='Timed runs per version (best is reported)')
+    parser.add_argument('--samples', type=int, default=5, help='Example slugs to show')
+    args = parser.parse_args()
+
+    titles, ids = load_corpus(args)
+    if args.save:
+        args.save.write_text('\n'.join(t.replace('\n', ' ') for t in titles) + '\n', encoding='utf-8')
+        print(f"Saved {len(titles)} titles to {args.save}")
+    if not titles:
+        print("No titles in corpus")
+        sys.exit(1)
+    titles, ids = titles * args.repeat, ids * args.repeat
+
+    print(f"Slugging {len(titles)} titles, best of {args.runs} runs\n")
+    print(f"  {'version':<8} {'us/title':>9} {'titles/s':>11} {'fallback':>9} {'distinct':>9}")
+    results = {}
+    for version in SLUG_VERSIONS:
+        seconds, slugs = bench_version(titles, ids, version, args.runs)
+        results[version] = slugs
+        fallback = sum(slug.startswith('article-') for slug in slugs) / len(slugs)
+        # Distinct over the unrepeated corpus
+        unique = len(set(slugs[:len(slugs) // args.repeat])) / (len(slugs) // args.repeat)
+        print(f"  {version:<8} {seconds / len(titles) * 1e6:9.2f} {len(titles) / seconds:11,.0f} "
+              f"{fallback:9.1%} {unique:9.1%}")
+
+    print("\nExamples:")
+    for i in range(min(args.samples, len(titles) // args.repeat)):
+        print(f"  {titles[i][:60]}")
+        for version in SLUG_VERSIONS:
+            print(f"    v{version}: {results[version][i]}")
+
+
+if __name__ == '__main__':
+    main()
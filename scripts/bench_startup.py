@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the sync scripts.
+
+Runs each script's no-work path (`--help`) under `python -X importtime`
+several times and reports the median wall time and the slowest imports.
+Fails (exit code 1) if a heavy dependency is imported on that path or the
+median exceeds the time budget, so it can guard startup regressions in CI.
+
+Usage:
+    python scripts/bench_startup.py
+    python scripts/bench_startup.py --runs 10 --budget-ms 200
+"""
+
+import re
+import sys
+import argparse
+import statistics
+import subprocess
+import time
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent
+
+# Scripts to check and the command line for their no-work path
+TARGETS = [
+    ('fetch_telegram.py', ['--help']),
+    ('fetch_news_headlines.py', ['--help']),
+]
+
+# Top-level packages that must not be imported before there is work to do
+HEAVY_MODULES = {'telethon', 'supabase', 'postgrest', 'gotrue', 'httpx', 'feedparser', 'requests'}
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def run_once(script: str, argv: list[str]) -> tuple[float, list[tuple[str, int]]]:
+    """Run a script once; return (wall seconds, [(module, cumulative_us), ...])."""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', script, *argv],
+        cwd=SCRIPTS_DIR, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{script} exited with {proc.returncode}:\n{proc.stderr[-2000:]}")
+
+    imports = []
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            imports.append((match.group(4), int(match.group(2))))
+    return elapsed, imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark sync script startup time')
+    parser.add_argument('--runs', type=int, default=5, help='Runs per script (median is reported)')
+    parser.add_argument('--budget-ms', type=float, default=300, help='Max median wall time per script')
+    parser.add_argument('--top', type=int, default=5, help='Slowest imports to show per script')
+    args = parser.parse_args()
+
+    failed = False
+    for script, argv in TARGETS:
+        timings = []
+        imports = []
+        for _ in range(args.runs):
+            elapsed, imports = run_once(script, argv)
+            timings.append(elapsed)
+
+        median_ms = statistics.median(timings) * 1000
+        heavy = sorted({name.split('.')[0] for name, _ in imports} & HEAVY_MODULES)
+        top_level = sorted(
+            ((name, us) for name, us in imports if '.' not in name),
+            key=lambda item: item[1], reverse=True,
+        )[:args.top]
+
+        print(f"{script} {' '.join(argv)}")
+        print(f"  median wall time: {median_ms:.0f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+        print("  slowest imports:")
+        for name, us in top_level:
+            print(f"    {name:<24} {us / 1000:7.1f} ms")
+
+        if heavy:
+            print(f"  FAIL: heavy modules imported on the no-work path: {', '.join(heavy)}")
+            failed = True
+        if median_ms > args.budget_ms:
+            print("  FAIL: over startup budget")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
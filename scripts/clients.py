@@ -0,0 +1,52 @@
+"""
+Lazy client factories shared by the sync scripts.
+
+supabase-py (with its gotrue/postgrest/httpx dependency tree) and Telethon
+add hundreds of milliseconds of import time. They are only imported here,
+when a client is actually built, so `--help`, argument errors and runs
+with nothing to do don't pay that cost.
+"""
+
+import os
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def get_supabase(url: str, key: str):
+    """Create (once per process) a Supabase client for the given credentials."""
+    from supabase import create_client
+    return create_client(url, key)
+
+
+async def connect_telegram(api_id: str, api_hash: str, session_string: str | None = None, session_dir: str | None = None):
+    """
+    Create and connect a TelegramClient.
+    Uses a StringSession when session_string is set (CI/CD), otherwise the
+    'observer_session' file in session_dir. Returns None if the session
+    is not authorized.
+    """
+    from telethon import TelegramClient
+
+    if session_string:
+        from telethon.sessions import StringSession
+        print("Using StringSession (CI/CD mode)")
+        client = TelegramClient(StringSession(session_string), int(api_id), api_hash)
+        await client.connect()
+        if not await client.is_user_authorized():
+            print("Error: StringSession is not authorized!")
+            await client.disconnect()
+            return None
+        return client
+
+    print("Using file session (local mode)")
+    session_path = os.path.join(session_dir or os.path.dirname(__file__), 'observer_session')
+    client = TelegramClient(session_path, int(api_id), api_hash)
+    await client.connect()
+
+    if not await client.is_user_authorized():
+        print("Session not authorized. Please run login_telegram.py first to authenticate.")
+        print("Or set TELEGRAM_SESSION_STRING in .env for non-interactive mode.")
+        await client.disconnect()
+        return None
+
+    return client
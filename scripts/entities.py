@@ -0,0 +1,118 @@
+"""
+Country and organization names shared by the sync's detection and the
+cross-language pairing.
+
+The keyword tables map English and Arabic keywords (normalized with
+arabic.normalize_keys) to one canonical English name. The sync uses them
+to detect entities in posts without COUNTRIES: / ORGS: headers; header
+values are stored as written, so an Arabic post lists إيران where the
+English one lists Iran. canonical_entities() maps such values back to the
+canonical names so the two channels can be compared.
+
+Header values too short or ambiguous to detect in free text ('US', 'KSA')
+are mapped by the *_ALIASES tables, which are only matched exactly.
+
+Usage:
+    python entities.py --check-fixtures
+"""
+
+import sys
+import json
+from pathlib import Path
+
+from arabic import normalize, normalize_keys
+
+FIXTURES_FILE = Path(__file__).parent.parent / 'tests' / 'fixtures' / 'entity-pairs.json'
+
+COUNTRY_KEYWORDS = normalize_keys({
+    'israel': 'Israel', 'israeli': 'Israel', 'إسرائيل': 'Israel',
+    'palestine': 'Palestine', 'palestinian': 'Palestine', 'gaza': 'Palestine', 'فلسطين': 'Palestine', 'غزة': 'Palestine',
+    'yemen': 'Yemen', 'yemeni': 'Yemen', 'يمن': 'Yemen',
+    'iran': 'Iran', 'iranian': 'Iran', 'إيران': 'Iran',
+    'saudi': 'Saudi Arabia', 'saudi arabia': 'Saudi Arabia', 'السعودية': 'Saudi Arabia',
+    'المملكة العربية السعودية': 'Saudi Arabia',
+    'uae': 'UAE', 'emirati': 'UAE', 'emirates': 'UAE', 'الإمارات': 'UAE',
+    'egypt': 'Egypt', 'egyptian': 'Egypt', 'مصر': 'Egypt',
+    'syria': 'Syria', 'syrian': 'Syria', 'سوريا': 'Syria',
+    'lebanon': 'Lebanon', 'lebanese': 'Lebanon', 'لبنان': 'Lebanon',
+    'iraq': 'Iraq', 'iraqi': 'Iraq', 'العراق': 'Iraq',
+    'jordan': 'Jordan', 'jordanian': 'Jordan', 'الأردن': 'Jordan',
+    'turkey': 'Turkey', 'turkish': 'Turkey', 'تركيا': 'Turkey',
+    'russia': 'Russia', 'russian': 'Russia', 'روسيا': 'Russia',
+    'usa': 'USA', 'america': 'USA', 'american': 'USA', 'أمريكا': 'USA',
+    'united states': 'USA', 'الولايات المتحدة': 'USA',
+    'china': 'China', 'chinese': 'China', 'الصين': 'China',
+})
+
+ORGANIZATION_KEYWORDS = normalize_keys({
+    'idf': 'IDF', 'israel defense': 'IDF', 'جيش الدفاع': 'IDF',
+    'hamas': 'Hamas', 'حماس': 'Hamas',
+    'hezbollah': 'Hezbollah', 'حزب الله': 'Hezbollah',
+    'houthi': 'Houthis', 'ansar allah': 'Houthis', 'الحوثي': 'Houthis', 'أنصار الله': 'Houthis',
+    'irgc': 'IRGC', 'revolutionary guard': 'IRGC', 'الحرس الثوري': 'IRGC',
+    'mossad': 'Mossad', 'الموساد': 'Mossad',
+    'cia': 'CIA',
+    'un ': 'UN', 'united nations': 'UN', 'الأمم المتحدة': 'UN',
+    'nato': 'NATO', 'الناتو': 'NATO',
+    'plo': 'PLO', 'منظمة التحرير': 'PLO',
+    'fatah': 'Fatah', 'فتح': 'Fatah',
+    'islamic jihad': 'Islamic Jihad', 'الجهاد الإسلامي': 'Islamic Jihad',
+})
+
+# Exact header values only (as keywords they would match inside other words)
+COUNTRY_ALIASES = normalize_keys({
+    'us': 'USA', 'u.s.': 'USA', 'u.s': 'USA', 'u.s.a.': 'USA',
+    'ksa': 'Saudi Arabia',
+})
+
+ORGANIZATION_ALIASES = normalize_keys({
+    'u.n.': 'UN',
+})
+
+
+def canonical_name(value: str, table: dict, aliases: dict | None = None) -> str:
+    """
+    Canonical name of a header value: the table or aliases entry for the
+    value, else the only name whose keyword it contains, else the
+    normalized value.
+    """
+    text = normalize(value.strip())
+    if text in table:
+        return table[text]
+    if aliases and text in aliases:
+        return aliases[text]
+    # Trailing space so keywords ending in one ('un ') match a bare value
+    names = {name for keyword, name in table.items() if keyword in f'{text} '}
+    return names.pop() if len(names) == 1 else text
+
+
+def canonical_entities(values, table: dict, aliases: dict | None = None) -> frozenset:
+    """Canonical names of a countries / organizations list."""
+    return frozenset(canonical_name(value, table, aliases) for value in values or [] if value.strip())
+
+
+def check_fixtures(path: Path = FIXTURES_FILE) -> bool:
+    """Check that the EN and AR headers of each fixture pair have the same canonical names."""
+    cases = json.loads(path.read_text(encoding='utf-8'))
+    tables = {
+        'countries': (COUNTRY_KEYWORDS, COUNTRY_ALIASES),
+        'organizations': (ORGANIZATION_KEYWORDS, ORGANIZATION_ALIASES),
+    }
+    failures = 0
+    for case in cases:
+        for field, (table, aliases) in tables.items():
+            en = canonical_entities(case['en'].get(field), table, aliases)
+            ar = canonical_entities(case['ar'].get(field), table, aliases)
+            if en != ar:
+                failures += 1
+                print(f"  FAIL {field} {case['en'].get(field)} / {case['ar'].get(field)}: "
+                      f"{sorted(en)} != {sorted(ar)}")
+    print(f"{len(cases) * len(tables) - failures}/{len(cases) * len(tables)} entity pair fixtures match")
+    return not failures
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] != ['--check-fixtures']:
+        print("Usage: python entities.py --check-fixtures")
+        sys.exit(2)
+    sys.exit(0 if check_fixtures() else 1)
@@ -2,16 +2,32 @@
 """
 Fetch news headlines from international news sources via RSS feeds.
 Stores headlines in Supabase for the breaking news ticker.
+
+Usage:
+    python fetch_news_headlines.py                          # Live feeds -> Supabase
+    python fetch_news_headlines.py --record fixtures/rss    # Also save raw feed payloads
+    python fetch_news_headlines.py --offline fixtures/rss   # Replay payloads -> local SQLite store
+    python fetch_news_headlines.py --offline fixtures/rss --store :memory:
 """
 
 import os
+import json
 import hashlib
-import feedparser
-import requests
-from datetime import datetime, timezone
-from typing import Optional
+import argparse
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional, TYPE_CHECKING
 from dotenv import load_dotenv
-from supabase import create_client, Client
+from headline_clusters import HeadlineClusterIndex, WINDOW_HOURS
+from clients import get_supabase
+from instrumentation import Metrics, add_metrics_arguments
+from profiling import add_profile_arguments, profile_run
+
+# feedparser, requests and supabase are imported lazily so that --help and
+# offline replays don't pay their import cost
+if TYPE_CHECKING:
+    import feedparser
+    from supabase import Client
 
 # Load environment variables
 load_dotenv()
@@ -19,10 +35,26 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
 
-if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
-    raise ValueError("Missing SUPABASE_URL or SUPABASE_SERVICE_KEY environment variables")
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+# Default local store used by --offline
+LOCAL_STORE_PATH = Path(__file__).parent / ".headlines_local.db"
+
+# Retention settings (override via environment)
+# HEADLINE_ACTIVE_HOURS: hide headlines from the ticker this many hours after
+#   they were first fetched (fetched_at is not refreshed), unless they are
+#   still in the current feeds (0 = deactivate at midnight UTC)
+# HEADLINE_RETENTION_DAYS: permanently remove inactive headlines after this many days
+# HEADLINE_ARCHIVE_DIR: if set, purged rows are appended there as JSONL first
+HEADLINE_ACTIVE_HOURS = int(os.getenv("HEADLINE_ACTIVE_HOURS", "0"))
+HEADLINE_RETENTION_DAYS = int(os.getenv("HEADLINE_RETENTION_DAYS", "14"))
+HEADLINE_ARCHIVE_DIR = os.getenv("HEADLINE_ARCHIVE_DIR")
+
+# Rows deleted per request, and max batches per run (bounds run time)
+RETENTION_BATCH_SIZE = 500
+RETENTION_MAX_BATCHES = 20
+# Rows per request when loading the clustering window (PostgREST caps pages at 1000)
+CLUSTER_LOAD_BATCH_SIZE = 1000
+# Row ids per deactivation update (keeps the request URL short)
+DEACTIVATE_BATCH_SIZE = 100
 
 # News sources with their RSS feeds
 # Format: (name, country, rss_url, language, category)
@@ -81,6 +113,19 @@ HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 }
 
+# Stage timers and counters for this job
+METRICS = Metrics('headlines')
+
+def create_supabase_client() -> "Client":
+    """Create the Supabase client (only needed for live runs)."""
+    if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
+        raise ValueError("Missing SUPABASE_URL or SUPABASE_SERVICE_KEY environment variables")
+    return get_supabase(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+
+def fixture_filename(source_name: str) -> str:
+    """File name used to record/replay a source's RSS payload."""
+    return hashlib.md5(source_name.encode()).hexdigest()[:12] + ".xml"
+
 def generate_headline_id(source: str, title: str) -> str:
     """Generate a unique ID for a headline."""
     content = f"{source}:{title}"
@@ -100,15 +145,37 @@ def parse_date(entry) -> Optional[datetime]:
             pass
     return None
 
-def fetch_rss_feed(url: str) -> Optional[feedparser.FeedParserDict]:
-    """Fetch and parse an RSS feed."""
+def fetch_feed_payload(name: str, url: str, replay_dir: Path = None, record_dir: Path = None) -> Optional[bytes]:
+    """
+    Get the raw RSS payload for a source.
+    Reads the recorded fixture when replay_dir is set, otherwise downloads it
+    (and saves a copy to record_dir if given).
+    """
+    if replay_dir:
+        path = replay_dir / fixture_filename(name)
+        if not path.exists():
+            print(f"  No recorded payload for {name} ({path.name})")
+            return None
+        return path.read_bytes()
+
+    import requests
     try:
         response = requests.get(url, headers=HEADERS, timeout=15)
         response.raise_for_status()
-        return feedparser.parse(response.content)
     except requests.RequestException as e:
         print(f"  Error fetching {url}: {e}")
         return None
+
+    if record_dir:
+        record_dir.mkdir(parents=True, exist_ok=True)
+        (record_dir / fixture_filename(name)).write_bytes(response.content)
+    return response.content
+
+def parse_rss_feed(payload: bytes, url: str) -> Optional["feedparser.FeedParserDict"]:
+    """Parse an RSS payload."""
+    import feedparser
+    try:
+        return feedparser.parse(payload)
     except Exception as e:
         print(f"  Error parsing {url}: {e}")
         return None
@@ -125,11 +192,28 @@ def clean_title(title: str) -> str:
         title = title[:147] + "..."
     return title
 
-def fetch_headlines_from_source(name: str, country: str, rss_url: str, language: str, category: str) -> list:
+def fetch_headlines_from_source(
+    name: str, country: str, rss_url: str, language: str, category: str,
+    replay_dir: Path = None, record_dir: Path = None,
+) -> list:
     """Fetch headlines from a single source."""
     print(f"Fetching from {name} ({country})...")
 
-    feed = fetch_rss_feed(rss_url)
+    with METRICS.stage("fetch"):
+        payload = fetch_feed_payload(name, rss_url, replay_dir, record_dir)
+    if payload is None:
+        METRICS.count("sources_failed")
+        return []
+
+    with METRICS.stage("parse"):
+        headlines = parse_headlines(payload, name, country, rss_url, language, category)
+
+    print(f"  Found {len(headlines)} headlines from {name}")
+    return headlines
+
+def parse_headlines(payload: bytes, name: str, country: str, rss_url: str, language: str, category: str) -> list:
+    """Parse the top entries of an RSS payload into headline rows."""
+    feed = parse_rss_feed(payload, rss_url)
     if not feed or not feed.entries:
         print(f"  No entries found for {name}")
         return []
@@ -159,65 +243,291 @@ def fetch_headlines_from_source(name: str, country: str, rss_url: str, language:
             "is_active": True,
         })
 
-    print(f"  Found {len(headlines)} headlines from {name}")
     return headlines
 
-def deactivate_old_headlines():
-    """Deactivate headlines older than 24 hours."""
+def load_known_headlines(supabase: "Client", headline_ids: list) -> Optional[dict]:
+    """
+    Look up which headline IDs are already stored, with their active state.
+    Returns {headline_id: is_active}, or None if the lookup failed.
+    """
+    known = {}
     try:
-        cutoff = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
-        supabase.table("news_headlines").update({"is_active": False}).lt("fetched_at", cutoff.isoformat()).execute()
-        print("Deactivated old headlines")
+        # Check in batches of 100 to keep the request URL short
+        for i in range(0, len(headline_ids), 100):
+            batch = headline_ids[i:i+100]
+            result = supabase.table("news_headlines").select("headline_id, is_active").in_(
+                "headline_id", batch
+            ).execute()
+            known.update({row["headline_id"]: row["is_active"] for row in result.data})
     except Exception as e:
-        print(f"Error deactivating old headlines: {e}")
-
-def save_headlines(headlines: list):
-    """Save headlines to Supabase using upsert."""
-    if not headlines:
+        print(f"Warning: Could not load existing headlines: {e}")
+        return None
+    return known
+
+def deactivation_cutoff() -> datetime:
+    """Headlines first fetched before this time are removed from the ticker."""
+    now = datetime.now(timezone.utc)
+    if HEADLINE_ACTIVE_HOURS > 0:
+        return now - timedelta(hours=HEADLINE_ACTIVE_HOURS)
+    return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def deactivate_old_headlines(supabase: "Client", keep_ids: list = None):
+    """
+    Deactivate headlines older than the active TTL.
+    Rows that are already inactive, or still present in the current feeds
+    (keep_ids), are left untouched. The expired active rows are listed
+    first and the current feeds are excluded here, then the rest are
+    updated by id in batches, so no request carries every feed ID.
+    """
+    keep = set(keep_ids or [])
+    deactivated = 0
+    try:
+        cutoff = deactivation_cutoff().isoformat()
+        expired = []
+        last_id = 0
+        while True:
+            result = supabase.table("news_headlines").select("id, headline_id").eq(
+                "is_active", True
+            ).lt("fetched_at", cutoff).gt("id", last_id).order("id").limit(CLUSTER_LOAD_BATCH_SIZE).execute()
+            if not result.data:
+                break
+            expired.extend(row["id"] for row in result.data if row["headline_id"] not in keep)
+            last_id = result.data[-1]["id"]
+
+        for i in range(0, len(expired), DEACTIVATE_BATCH_SIZE):
+            batch = expired[i:i + DEACTIVATE_BATCH_SIZE]
+            supabase.table("news_headlines").update({"is_active": False}).in_("id", batch).execute()
+            deactivated += len(batch)
+        print(f"Deactivated {deactivated} old headlines")
+    except Exception as e:
+        print(f"Error deactivating old headlines: {e} ({deactivated} deactivated before error)")
+
+def archive_headlines(rows: list):
+    """Append purged headlines to a dated JSONL file in HEADLINE_ARCHIVE_DIR."""
+    archive_dir = Path(HEADLINE_ARCHIVE_DIR)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    path = archive_dir / f"news_headlines_{datetime.now(timezone.utc):%Y%m%d}.jsonl"
+    with open(path, "a", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+def purge_expired_headlines(supabase: "Client"):
+    """
+    Delete inactive headlines older than HEADLINE_RETENTION_DAYS in batches.
+    Each batch selects the oldest expired IDs, optionally archives the rows,
+    then deletes them by primary key.
+    """
+    if HEADLINE_RETENTION_DAYS <= 0:
         return
 
-    # Deduplicate by headline_id (keep first occurrence)
+    cutoff = datetime.now(timezone.utc) - timedelta(days=HEADLINE_RETENTION_DAYS)
+    columns = "*" if HEADLINE_ARCHIVE_DIR else "id"
+    purged = 0
+
+    try:
+        for _ in range(RETENTION_MAX_BATCHES):
+            result = supabase.table("news_headlines").select(columns).eq(
+                "is_active", False
+            ).lt("fetched_at", cutoff.isoformat()).order("fetched_at").limit(
+                RETENTION_BATCH_SIZE
+            ).execute()
+            rows = result.data
+            if not rows:
+                break
+
+            if HEADLINE_ARCHIVE_DIR:
+                archive_headlines(rows)
+
+            ids = [row["id"] for row in rows]
+            supabase.table("news_headlines").delete().in_("id", ids).execute()
+            purged += len(ids)
+
+            if len(rows) < RETENTION_BATCH_SIZE:
+                break
+
+        if purged:
+            action = "Archived and purged" if HEADLINE_ARCHIVE_DIR else "Purged"
+            print(f"{action} {purged} headlines older than {HEADLINE_RETENTION_DAYS} days")
+    except Exception as e:
+        print(f"Error purging old headlines: {e} ({purged} purged before error)")
+
+def load_cluster_index(supabase: "Client") -> HeadlineClusterIndex:
+    """
+    Rebuild the near-duplicate index from headlines fetched in the last 48h,
+    read in id order with keyset pagination so no page hits the row cap.
+    """
+    index = HeadlineClusterIndex()
+    since = datetime.now(timezone.utc) - timedelta(hours=WINDOW_HOURS)
+    last_id = 0
+    try:
+        while True:
+            result = supabase.table("news_headlines").select(
+                "id, headline_id, title, cluster_id"
+            ).gte("fetched_at", since.isoformat()).gt("id", last_id).order("id").limit(
+                CLUSTER_LOAD_BATCH_SIZE
+            ).execute()
+            for row in result.data:
+                index.add(row["headline_id"], row["title"], row.get("cluster_id"))
+            if not result.data:
+                break
+            last_id = result.data[-1]["id"]
+    except Exception as e:
+        print(f"Warning: Could not load recent headlines for clustering: {e}")
+    return index
+
+def assign_clusters(supabase: "Client", headlines: list, known: Optional[dict]):
+    """Set cluster_id on headlines that are not stored yet."""
+    index = load_cluster_index(supabase)
+    clustered = 0
+    for h in headlines:
+        if known is not None and h["headline_id"] in known:
+            continue
+        h["cluster_id"] = index.add(h["headline_id"], h["title"])
+        if h["cluster_id"] != h["headline_id"]:
+            clustered += 1
+    print(f"Clustering: {clustered} new headlines matched an existing story ({len(index)} in window)")
+
+def dedupe_headlines(headlines: list) -> list:
+    """Deduplicate by headline_id (keep first occurrence)."""
     seen = set()
     unique_headlines = []
     for h in headlines:
         if h["headline_id"] not in seen:
             seen.add(h["headline_id"])
             unique_headlines.append(h)
+    return unique_headlines
+
+def save_headlines(supabase: "Client", headlines: list, known: Optional[dict] = None):
+    """
+    Save only the delta to Supabase.
+
+    New headlines are inserted, and stored headlines are only touched when
+    they were deactivated and have reappeared in a feed. Headlines that are
+    already stored and active are skipped. If the known-state lookup failed
+    (known is None), falls back to upserting everything.
+    """
+    if not headlines:
+        return
+
+    if known is None:
+        try:
+            supabase.table("news_headlines").upsert(
+                headlines,
+                on_conflict="headline_id"
+            ).execute()
+            print(f"Saved {len(headlines)} unique headlines to database (full upsert)")
+        except Exception as e:
+            print(f"Error saving headlines: {e}")
+        return
+
+    new_headlines = [h for h in headlines if h["headline_id"] not in known]
+    reactivated_ids = [
+        h["headline_id"] for h in headlines
+        if h["headline_id"] in known and not known[h["headline_id"]]
+    ]
+    unchanged = len(headlines) - len(new_headlines) - len(reactivated_ids)
 
     try:
-        result = supabase.table("news_headlines").upsert(
-            unique_headlines,
-            on_conflict="headline_id"
-        ).execute()
-        print(f"Saved {len(unique_headlines)} unique headlines to database")
+        if new_headlines:
+            supabase.table("news_headlines").insert(new_headlines).execute()
+        if reactivated_ids:
+            supabase.table("news_headlines").update({
+                "is_active": True,
+                "fetched_at": datetime.now(timezone.utc).isoformat(),
+            }).in_("headline_id", reactivated_ids).execute()
+        print(f"Headlines: {len(new_headlines)} new, {len(reactivated_ids)} reactivated, {unchanged} unchanged")
+        METRICS.count("headlines_new", len(new_headlines))
+        METRICS.count("headlines_reactivated", len(reactivated_ids))
+        METRICS.count("headlines_unchanged", unchanged)
     except Exception as e:
         print(f"Error saving headlines: {e}")
 
-def main():
-    """Main function to fetch all headlines."""
-    print("=" * 60)
-    print("Fetching News Headlines")
-    print("=" * 60)
-
+def fetch_all_headlines(replay_dir: Path = None, record_dir: Path = None) -> list:
+    """Fetch (or replay) headlines from every source. Makes no database calls."""
     all_headlines = []
 
     for source in NEWS_SOURCES:
         name, country, rss_url, language, category = source
         try:
-            headlines = fetch_headlines_from_source(name, country, rss_url, language, category)
+            headlines = fetch_headlines_from_source(
+                name, country, rss_url, language, category,
+                replay_dir=replay_dir, record_dir=record_dir,
+            )
             all_headlines.extend(headlines)
         except Exception as e:
             print(f"  Error processing {name}: {e}")
+            METRICS.count("sources_failed")
+
+    METRICS.count("headlines_fetched", len(all_headlines))
 
     print("-" * 60)
     print(f"Total headlines fetched: {len(all_headlines)}")
+    return all_headlines
 
-    # Deactivate old headlines
-    deactivate_old_headlines()
+def store_headlines(supabase: "Client", all_headlines: list):
+    """Diff fetched headlines against the store, save the delta and apply retention."""
+    with METRICS.stage("dedupe"):
+        unique_headlines = dedupe_headlines(all_headlines)
+        current_ids = [h["headline_id"] for h in unique_headlines]
 
-    # Save to database
-    save_headlines(all_headlines)
+    with METRICS.stage("known_lookup"):
+        # Look up stored state before deactivating so the diff sees the previous run
+        known = load_known_headlines(supabase, current_ids)
 
+    with METRICS.stage("cluster"):
+        # Group near-duplicate stories so the ticker can collapse them
+        assign_clusters(supabase, unique_headlines, known)
+
+    with METRICS.stage("save"):
+        # Deactivate old headlines (except those still in the feeds)
+        deactivate_old_headlines(supabase, keep_ids=current_ids)
+
+        # Save only new or reactivated headlines
+        save_headlines(supabase, unique_headlines, known)
+
+        # Drop expired inactive headlines so the table stays bounded
+        purge_expired_headlines(supabase)
+
+# Functions timed by --profile async
+PROFILE_IO_FUNCTIONS = (
+    "fetch_feed_payload", "load_known_headlines", "load_cluster_index",
+    "deactivate_old_headlines", "save_headlines", "purge_expired_headlines",
+)
+PROFILE_CPU_FUNCTIONS = ("parse_headlines", "assign_clusters", "dedupe_headlines")
+
+def main():
+    """Main function to fetch all headlines."""
+    parser = argparse.ArgumentParser(description='Fetch news headlines for the breaking news ticker')
+    parser.add_argument('--offline', metavar='DIR', type=Path,
+                        help='Replay recorded RSS payloads from DIR and write to a local store')
+    parser.add_argument('--record', metavar='DIR', type=Path,
+                        help='Save fetched RSS payloads to DIR for later --offline replays')
+    parser.add_argument('--store', default=None,
+                        help=f'Local SQLite store for --offline (default: {LOCAL_STORE_PATH.name}, or :memory:)')
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    METRICS.configure(jsonl=args.metrics_jsonl, prometheus=args.metrics_prom)
+
+    print("=" * 60)
+    print("Fetching News Headlines")
+    if args.offline:
+        print(f"OFFLINE: replaying payloads from {args.offline}")
+    print("=" * 60)
+
+    if args.offline:
+        from local_store import LocalClient
+        supabase = LocalClient(args.store or str(LOCAL_STORE_PATH))
+    else:
+        supabase = create_supabase_client()
+
+    with profile_run(args, "fetch_news_headlines", globals(),
+                     cpu_functions=PROFILE_CPU_FUNCTIONS, io_functions=PROFILE_IO_FUNCTIONS):
+        all_headlines = fetch_all_headlines(replay_dir=args.offline, record_dir=args.record)
+        store_headlines(supabase, all_headlines)
+
+    print("-" * 60)
+    METRICS.report()
     print("=" * 60)
     print("Done!")
 
@@ -7,6 +7,7 @@ OPTIMIZED VERSION:
 - Smart upsert: Only updates articles that have actually changed
 - Tracks sync state per channel
 - Use --full flag to force complete re-sync
+- Use --check-deleted to remove articles deleted on Telegram without one
 
 Supports structured post format:
 ---
@@ -21,22 +22,40 @@ Falls back to auto-detection for older posts without headers.
 Also downloads and uploads images/videos to Supabase Storage.
 """
 
+from __future__ import annotations
+
 import os
 import re
 import sys
 import json
 import asyncio
 import hashlib
+import time
 import argparse
 from datetime import datetime, timezone
 from pathlib import Path
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
-from telethon import TelegramClient
-from telethon.sessions import StringSession
-from telethon.tl.types import Message, MessageMediaPhoto, MessageMediaDocument, MessageService, MessageEntityBold
-from telethon.tl.functions.channels import GetFullChannelRequest
-from telethon.errors import FloodWaitError
-from supabase import create_client, Client
+from article_record import ArticleRecord
+from clients import get_supabase, connect_telegram
+from slugs import generate_slug
+from sentiment import score
+from arabic import normalize, normalize_keys
+from entities import COUNTRY_KEYWORDS, ORGANIZATION_KEYWORDS
+from slug_allocator import SlugAllocator, MAX_CONFLICT_RETRIES, is_slug_conflict
+from instrumentation import Metrics, add_metrics_arguments
+from metrics_snapshot import SnapshotEngine
+from related_articles import update_related_articles
+from translations import update_translation_links
+from profiling import add_profile_arguments, profile_run
+
+# Telethon and supabase are imported lazily (see clients.py); these are
+# only needed for type annotations.
+if TYPE_CHECKING:
+    from telethon import TelegramClient
+    from telethon.tl.types import Message
+    from supabase import Client
 
 # Fix Windows console encoding for Arabic/emoji
 if sys.platform == 'win32':
@@ -64,6 +83,12 @@ CHANNELS = {
 # Sync state file (tracks last synced message ID per channel)
 SYNC_STATE_FILE = Path(__file__).parent / '.sync_state.json'
 
+# Stage timers and counters for this job
+METRICS = Metrics('telegram')
+
+# Article deltas for the dashboard metrics snapshot
+SNAPSHOT = SnapshotEngine()
+
 # Valid categories (English and Arabic)
 VALID_CATEGORIES = {
     # English
@@ -166,31 +191,9 @@ def hash_article_content(article: dict) -> str:
     return hashlib.md5(content_str.encode()).hexdigest()
 
 
-# =============================================================================
-# SLUG GENERATION (mirrors src/lib/slugify.ts)
-# =============================================================================
-
-def generate_slug(title: str, fallback_id: str = '') -> str:
-    """Generate a URL-friendly slug from an article title."""
-    import unicodedata
-    text = re.sub(r'<[^>]*>', '', title)
-    text = unicodedata.normalize('NFKD', text)
-    # Remove combining marks (diacritics)
-    text = ''.join(c for c in text if unicodedata.category(c) != 'Mn')
-    text = text.lower()
-    # Keep only latin alphanumeric, spaces, hyphens
-    slug = re.sub(r'[^a-z0-9\s-]', '', text)
-    slug = re.sub(r'[\s-]+', '-', slug).strip('-')
-    slug = slug[:80].rstrip('-')
-
-    if len(slug) < 5:
-        source = fallback_id or title
-        h = 0
-        for ch in source:
-            h = ((h << 5) - h + ord(ch)) & 0xFFFFFFFF
-        slug = f"article-{h:08x}"
-
-    return slug
+def hash_media(data: bytes) -> str:
+    """Hash of downloaded media bytes (articles.media_hash), for cross-channel pairing."""
+    return hashlib.sha256(data).hexdigest()[:32]
 
 
 # =============================================================================
@@ -205,7 +208,26 @@ def clean_text(text: str) -> str:
     return text.strip()
 
 
-def parse_structured_header(text: str) -> dict | None:
+@dataclass(slots=True)
+class StructuredHeader:
+    """Header fields parsed from the top of a post."""
+    title: str | None = None
+    category: str | None = None
+    countries: list[str] = field(default_factory=list)
+    organizations: list[str] = field(default_factory=list)
+    content_start: int = 0
+
+
+# Header category values in matching form (arabic.normalize)
+CATEGORY_LOOKUP = normalize_keys(VALID_CATEGORIES)
+
+
+def header_category(value: str) -> str | None:
+    """Category named by a header value (only the part before any '|'), if valid."""
+    return CATEGORY_LOOKUP.get(normalize(value).split('|')[0].strip())
+
+
+def parse_structured_header(text: str) -> StructuredHeader | None:
     """
     Parse structured headers from post - supports multiple formats.
 
@@ -216,13 +238,7 @@ def parse_structured_header(text: str) -> dict | None:
 
     Also parses Category, Countries, and Organizations.
     """
-    result = {
-        'title': None,
-        'category': None,
-        'countries': [],
-        'organizations': [],
-        'content_start': 0,
-    }
+    result = StructuredHeader()
 
     lines = text.split('\n')
 
@@ -240,9 +256,9 @@ def parse_structured_header(text: str) -> dict | None:
                     # Extract from **value** if present
                     title_match = re.match(r'^\*\*(.+?)\*\*$', next_line)
                     if title_match:
-                        result['title'] = clean_text(title_match.group(1))[:150]
+                        result.title = clean_text(title_match.group(1))[:150]
                     else:
-                        result['title'] = clean_text(next_line)[:150]
+                        result.title = clean_text(next_line)[:150]
                     break
             continue
 
@@ -252,7 +268,7 @@ def parse_structured_header(text: str) -> dict | None:
             line_clean, re.IGNORECASE
         )
         if title_inline:
-            result['title'] = clean_text(title_inline.group(1))[:150]
+            result.title = clean_text(title_inline.group(1))[:150]
             continue
 
         # Check for **Title: Value without closing ** (some posts have this format)
@@ -261,7 +277,7 @@ def parse_structured_header(text: str) -> dict | None:
             line_clean, re.IGNORECASE
         )
         if title_inline_noclose and not line_clean.endswith('**'):
-            result['title'] = clean_text(title_inline_noclose.group(1))[:150]
+            result.title = clean_text(title_inline_noclose.group(1))[:150]
             continue
 
         # Check for standard TITLE: Value (original format)
@@ -270,7 +286,7 @@ def parse_structured_header(text: str) -> dict | None:
             line_clean, re.IGNORECASE
         )
         if title_standard:
-            result['title'] = clean_text(title_standard.group(1))[:150]
+            result.title = clean_text(title_standard.group(1))[:150]
             continue
 
         # Parse Category (multiple formats)
@@ -279,11 +295,7 @@ def parse_structured_header(text: str) -> dict | None:
             for j in range(i+1, min(i+3, len(lines))):
                 next_line = lines[j].strip()
                 if next_line:
-                    cat_value = clean_text(next_line).lower()
-                    # Only use first part before pipe
-                    cat_value = cat_value.split('|')[0].strip()
-                    if cat_value in VALID_CATEGORIES:
-                        result['category'] = VALID_CATEGORIES[cat_value]
+                    result.category = header_category(clean_text(next_line)) or result.category
                     break
             continue
 
@@ -292,9 +304,7 @@ def parse_structured_header(text: str) -> dict | None:
             line_clean, re.IGNORECASE
         )
         if cat_inline:
-            cat_value = cat_inline.group(1).strip().lower().split('|')[0].strip()
-            if cat_value in VALID_CATEGORIES:
-                result['category'] = VALID_CATEGORIES[cat_value]
+            result.category = header_category(cat_inline.group(1)) or result.category
             continue
 
         # Standard Category: Value format
@@ -303,9 +313,7 @@ def parse_structured_header(text: str) -> dict | None:
             line_clean, re.IGNORECASE
         )
         if cat_standard:
-            cat_value = cat_standard.group(1).strip().lower().split('|')[0].strip()
-            if cat_value in VALID_CATEGORIES:
-                result['category'] = VALID_CATEGORIES[cat_value]
+            result.category = header_category(cat_standard.group(1)) or result.category
             continue
 
         # Countries - **Countries Involved** or **Countries**
@@ -315,7 +323,7 @@ def parse_structured_header(text: str) -> dict | None:
                 if next_line and not next_line.startswith('**'):
                     # Split by | or comma, remove flags
                     countries = re.split(r'[|,،]', next_line)
-                    result['countries'] = [
+                    result.countries = [
                         clean_text(re.sub(r'[\U0001F1E0-\U0001F1FF]+', '', c)).strip()
                         for c in countries if clean_text(c).strip()
                     ][:5]
@@ -326,7 +334,7 @@ def parse_structured_header(text: str) -> dict | None:
         countries_match = re.match(r'^(?:COUNTRIES|COUNTRY|الدول)\s*[:\-]\s*(.+)$', line_clean, re.IGNORECASE)
         if countries_match:
             countries_str = countries_match.group(1)
-            result['countries'] = [c.strip() for c in re.split(r'[,،]', countries_str) if c.strip()]
+            result.countries = [c.strip() for c in re.split(r'[,،]', countries_str) if c.strip()]
             continue
 
         # Organizations - **Orgs** or standard format
@@ -335,18 +343,18 @@ def parse_structured_header(text: str) -> dict | None:
                 next_line = lines[j].strip()
                 if next_line and not next_line.startswith('**'):
                     orgs = re.split(r'[|,،]', next_line)
-                    result['organizations'] = [clean_text(o).strip() for o in orgs if clean_text(o).strip()][:5]
+                    result.organizations = [clean_text(o).strip() for o in orgs if clean_text(o).strip()][:5]
                     break
             continue
 
         orgs_match = re.match(r'^(?:ORGS?|ORGANIZATIONS?|المنظمات)\s*[:\-]\s*(.+)$', line_clean, re.IGNORECASE)
         if orgs_match:
             orgs_str = orgs_match.group(1)
-            result['organizations'] = [o.strip() for o in re.split(r'[,،]', orgs_str) if o.strip()]
+            result.organizations = [o.strip() for o in re.split(r'[,،]', orgs_str) if o.strip()]
             continue
 
     # Return if we found at least a title
-    if result['title']:
+    if result.title:
         return result
 
     return None
@@ -480,112 +488,58 @@ def extract_excerpt(text: str, title: str, content_start: int = 0) -> str:
     return excerpt if excerpt else title
 
 
-def detect_category_legacy(text: str) -> str:
-    """Legacy category detection for posts without structured headers."""
-    lower_text = text.lower()
-
-    breaking_keywords = ['breaking', 'urgent', 'عاجل', 'خبر عاجل', 'طارئ']
-    if any(word in lower_text for word in breaking_keywords):
-        return 'Breaking'
-
-    military_keywords = [
+# Keyword tables, normalized once (arabic.normalize_keys) so each word needs
+# one entry whatever its hamza / ta marbuta / alef maqsura spelling; the
+# country and organization tables are in entities.py.
+# Checked in order; the first category with a keyword in the text wins.
+_CATEGORY_WORDS = [
+    ('Breaking', ['breaking', 'urgent', 'عاجل', 'خبر عاجل', 'طارئ']),
+    ('Military', [
         'military', 'weapon', 'army', 'forces', 'troops', 'battlefield', 'missile',
         'drone', 'strike', 'attack', 'defense', 'war', 'combat', 'artillery',
         'عسكري', 'جيش', 'قوات', 'صاروخ', 'طائرة مسيرة', 'ضربة', 'هجوم', 'دفاع',
         'حرب', 'معركة', 'سلاح', 'انسحاب'
-    ]
-    if any(word in lower_text for word in military_keywords):
-        return 'Military'
-
-    intel_keywords = [
+    ]),
+    ('Intelligence', [
         'intelligence', 'leaked', 'exposed', 'covert', 'secret', 'spy', 'agent',
         'استخبارات', 'تسريب', 'كشف', 'سري', 'جاسوس', 'عميل'
-    ]
-    if any(word in lower_text for word in intel_keywords):
-        return 'Intelligence'
-
-    economic_keywords = [
+    ]),
+    ('Economic', [
         'economic', 'economy', 'sanction', 'dollar', 'trade', 'oil', 'gas',
         'market', 'financial', 'bank', 'currency',
         'اقتصاد', 'اقتصادي', 'عقوبات', 'دولار', 'تجارة', 'نفط', 'غاز', 'سوق', 'بنك'
-    ]
-    if any(word in lower_text for word in economic_keywords):
-        return 'Economic'
-
-    political_keywords = [
+    ]),
+    ('Political', [
         'saudi', 'emirati', 'yemen', 'gaza', 'israel', 'iran', 'coalition',
         'government', 'president', 'minister', 'parliament', 'election', 'vote',
         'سعودي', 'إماراتي', 'يمن', 'غزة', 'إسرائيل', 'إيران', 'تحالف',
         'حكومة', 'رئيس', 'وزير', 'برلمان', 'انتخاب', 'سياسي', 'سياسة'
-    ]
-    if any(word in lower_text for word in political_keywords):
-        return 'Political'
-
-    diplomatic_keywords = [
+    ]),
+    ('Diplomatic', [
         'diplomatic', 'diplomacy', 'negotiation', 'summit', 'treaty', 'agreement',
         'ambassador', 'embassy', 'talks',
         'دبلوماسي', 'دبلوماسية', 'مفاوضات', 'قمة', 'معاهدة', 'اتفاق', 'سفير', 'سفارة'
-    ]
-    if any(word in lower_text for word in diplomatic_keywords):
-        return 'Diplomatic'
+    ]),
+]
+CATEGORY_KEYWORDS = [(category, [normalize(k) for k in keywords]) for category, keywords in _CATEGORY_WORDS]
 
+def detect_category_legacy(text: str) -> str:
+    """Legacy category detection for posts without structured headers (text from arabic.normalize)."""
+    for category, keywords in CATEGORY_KEYWORDS:
+        if any(word in text for word in keywords):
+            return category
     return 'Analysis'
 
 
 def detect_countries_legacy(text: str) -> list[str]:
-    """Detect countries mentioned in text."""
-    countries_map = {
-        'israel': 'Israel', 'israeli': 'Israel', 'اسرائيل': 'Israel', 'إسرائيل': 'Israel',
-        'palestine': 'Palestine', 'palestinian': 'Palestine', 'gaza': 'Palestine', 'فلسطين': 'Palestine', 'غزة': 'Palestine',
-        'yemen': 'Yemen', 'yemeni': 'Yemen', 'اليمن': 'Yemen', 'يمن': 'Yemen',
-        'iran': 'Iran', 'iranian': 'Iran', 'إيران': 'Iran', 'ايران': 'Iran',
-        'saudi': 'Saudi Arabia', 'saudi arabia': 'Saudi Arabia', 'السعودية': 'Saudi Arabia',
-        'uae': 'UAE', 'emirati': 'UAE', 'emirates': 'UAE', 'الإمارات': 'UAE',
-        'egypt': 'Egypt', 'egyptian': 'Egypt', 'مصر': 'Egypt',
-        'syria': 'Syria', 'syrian': 'Syria', 'سوريا': 'Syria',
-        'lebanon': 'Lebanon', 'lebanese': 'Lebanon', 'لبنان': 'Lebanon',
-        'iraq': 'Iraq', 'iraqi': 'Iraq', 'العراق': 'Iraq',
-        'jordan': 'Jordan', 'jordanian': 'Jordan', 'الأردن': 'Jordan',
-        'turkey': 'Turkey', 'turkish': 'Turkey', 'تركيا': 'Turkey',
-        'russia': 'Russia', 'russian': 'Russia', 'روسيا': 'Russia',
-        'usa': 'USA', 'america': 'USA', 'american': 'USA', 'أمريكا': 'USA',
-        'china': 'China', 'chinese': 'China', 'الصين': 'China',
-    }
-
-    lower_text = text.lower()
-    found = set()
-
-    for keyword, country in countries_map.items():
-        if keyword in lower_text:
-            found.add(country)
-
+    """Detect countries mentioned in text (from arabic.normalize)."""
+    found = {country for keyword, country in COUNTRY_KEYWORDS.items() if keyword in text}
     return list(found)[:5]  # Limit to 5 countries
 
 
 def detect_organizations_legacy(text: str) -> list[str]:
-    """Detect organizations mentioned in text."""
-    orgs_map = {
-        'idf': 'IDF', 'israel defense': 'IDF', 'جيش الدفاع': 'IDF',
-        'hamas': 'Hamas', 'حماس': 'Hamas',
-        'hezbollah': 'Hezbollah', 'حزب الله': 'Hezbollah',
-        'houthi': 'Houthis', 'ansar allah': 'Houthis', 'الحوثي': 'Houthis', 'أنصار الله': 'Houthis',
-        'irgc': 'IRGC', 'revolutionary guard': 'IRGC', 'الحرس الثوري': 'IRGC',
-        'mossad': 'Mossad', 'الموساد': 'Mossad',
-        'cia': 'CIA',
-        'un ': 'UN', 'united nations': 'UN', 'الأمم المتحدة': 'UN',
-        'nato': 'NATO', 'الناتو': 'NATO',
-        'plo': 'PLO', 'منظمة التحرير': 'PLO',
-        'fatah': 'Fatah', 'فتح': 'Fatah',
-        'islamic jihad': 'Islamic Jihad', 'الجهاد الإسلامي': 'Islamic Jihad',
-    }
-
-    lower_text = text.lower()
-    found = set()
-
-    for keyword, org in orgs_map.items():
-        if keyword in lower_text:
-            found.add(org)
-
+    """Detect organizations mentioned in text (from arabic.normalize)."""
+    found = {org for keyword, org in ORGANIZATION_KEYWORDS.items() if keyword in text}
     return list(found)[:5]
 
 
@@ -616,36 +570,43 @@ async def upload_media_to_storage(
     supabase: Client,
     message: Message,
     article_id: str
-) -> tuple[str | None, str | None]:
+) -> tuple[str | None, str | None, str | None]:
     """
     Download media from Telegram message and upload to Supabase Storage.
-    Returns (image_url, video_url) tuple.
+    Returns (image_url, video_url, media_hash) tuple.
     """
+    from telethon.tl.types import MessageMediaPhoto, MessageMediaDocument
+
     image_url = None
     video_url = None
+    media_hash = None
 
     if not message.media:
-        return image_url, video_url
+        return image_url, video_url, media_hash
 
     try:
         # Handle photos
         if isinstance(message.media, MessageMediaPhoto):
             # Download photo to bytes
-            photo_bytes = await client.download_media(message.media, file=bytes)
+            with METRICS.stage('media_download'):
+                photo_bytes = await client.download_media(message.media, file=bytes)
             if photo_bytes and len(photo_bytes) <= MAX_IMAGE_SIZE:
                 # Generate unique filename
                 filename = f"{article_id.replace('/', '_')}_photo.jpg"
 
                 # Upload to Supabase Storage
-                result = supabase.storage.from_(MEDIA_BUCKET).upload(
-                    path=filename,
-                    file=photo_bytes,
-                    file_options={"content-type": "image/jpeg", "upsert": "true"}
-                )
+                with METRICS.stage('media_upload'):
+                    result = supabase.storage.from_(MEDIA_BUCKET).upload(
+                        path=filename,
+                        file=photo_bytes,
+                        file_options={"content-type": "image/jpeg", "upsert": "true"}
+                    )
 
                 # Get public URL
                 image_url = supabase.storage.from_(MEDIA_BUCKET).get_public_url(filename)
+                media_hash = hash_media(photo_bytes)
                 print(f"      Uploaded image: {filename}")
+                METRICS.count('media_uploaded')
 
         # Handle videos/documents
         elif isinstance(message.media, MessageMediaDocument):
@@ -655,55 +616,63 @@ async def upload_media_to_storage(
                 if doc.mime_type.startswith('video/'):
                     if doc.size <= MAX_VIDEO_SIZE:
                         # Download video to bytes
-                        video_bytes = await client.download_media(message.media, file=bytes)
+                        with METRICS.stage('media_download'):
+                            video_bytes = await client.download_media(message.media, file=bytes)
                         if video_bytes:
                             # Determine extension from mime type
                             ext = 'mp4' if 'mp4' in doc.mime_type else 'webm'
                             filename = f"{article_id.replace('/', '_')}_video.{ext}"
 
                             # Upload to Supabase Storage
-                            result = supabase.storage.from_(MEDIA_BUCKET).upload(
-                                path=filename,
-                                file=video_bytes,
-                                file_options={"content-type": doc.mime_type, "upsert": "true"}
-                            )
+                            with METRICS.stage('media_upload'):
+                                result = supabase.storage.from_(MEDIA_BUCKET).upload(
+                                    path=filename,
+                                    file=video_bytes,
+                                    file_options={"content-type": doc.mime_type, "upsert": "true"}
+                                )
 
                             # Get public URL
                             video_url = supabase.storage.from_(MEDIA_BUCKET).get_public_url(filename)
+                            media_hash = hash_media(video_bytes)
                             print(f"      Uploaded video: {filename}")
+                            METRICS.count('media_uploaded')
                     else:
                         print(f"      Skipped video (too large): {doc.size / 1024 / 1024:.1f}MB > {MAX_VIDEO_SIZE / 1024 / 1024}MB")
 
                 # Check if it's an image (sometimes sent as document)
                 elif doc.mime_type.startswith('image/'):
                     if doc.size <= MAX_IMAGE_SIZE:
-                        photo_bytes = await client.download_media(message.media, file=bytes)
+                        with METRICS.stage('media_download'):
+                            photo_bytes = await client.download_media(message.media, file=bytes)
                         if photo_bytes:
                             ext = doc.mime_type.split('/')[-1]
                             if ext == 'jpeg':
                                 ext = 'jpg'
                             filename = f"{article_id.replace('/', '_')}_photo.{ext}"
 
-                            result = supabase.storage.from_(MEDIA_BUCKET).upload(
-                                path=filename,
-                                file=photo_bytes,
-                                file_options={"content-type": doc.mime_type, "upsert": "true"}
-                            )
+                            with METRICS.stage('media_upload'):
+                                result = supabase.storage.from_(MEDIA_BUCKET).upload(
+                                    path=filename,
+                                    file=photo_bytes,
+                                    file_options={"content-type": doc.mime_type, "upsert": "true"}
+                                )
 
                             image_url = supabase.storage.from_(MEDIA_BUCKET).get_public_url(filename)
+                            media_hash = hash_media(photo_bytes)
                             print(f"      Uploaded image: {filename}")
+                            METRICS.count('media_uploaded')
 
     except Exception as e:
         print(f"      Error uploading media: {e}")
 
-    return image_url, video_url
+    return image_url, video_url, media_hash
 
 
 # =============================================================================
 # MESSAGE PARSING
 # =============================================================================
 
-def parse_message(message: Message, channel: str, channel_username: str) -> dict | None:
+def parse_message(message: Message, channel: str, channel_username: str) -> ArticleRecord | None:
     """Parse a Telegram message into an article."""
     text = message.text
 
@@ -712,42 +681,45 @@ def parse_message(message: Message, channel: str, channel_username: str) -> dict
 
     # Try to parse structured headers first
     structured = parse_structured_header(text)
+    # Matching form for keyword detection and sentiment, computed once
+    normalized = normalize(text)
 
-    if structured and structured['title']:
+    if structured and structured.title:
         # Use structured data
-        title = structured['title']
-        category = structured['category'] or detect_category_legacy(text)
-        countries = structured['countries'] or detect_countries_legacy(text)
-        organizations = structured['organizations'] or detect_organizations_legacy(text)
-        content_start = structured['content_start']
+        title = structured.title
+        category = structured.category or detect_category_legacy(normalized)
+        countries = structured.countries or detect_countries_legacy(normalized)
+        organizations = structured.organizations or detect_organizations_legacy(normalized)
+        content_start = structured.content_start
         is_structured = True
     else:
         # Fall back to legacy detection
         title = extract_title_legacy(text)
-        category = detect_category_legacy(text)
-        countries = detect_countries_legacy(text)
-        organizations = detect_organizations_legacy(text)
+        category = detect_category_legacy(normalized)
+        countries = detect_countries_legacy(normalized)
+        organizations = detect_organizations_legacy(normalized)
         content_start = 0
         is_structured = False
 
     excerpt = extract_excerpt(text, title, content_start)
 
     telegram_id = f"{channel_username}/{message.id}"
-    return {
-        'telegram_id': telegram_id,
-        'channel': channel,
-        'slug': generate_slug(title, telegram_id),
-        'title': title,
-        'excerpt': excerpt,
-        'content': text,
-        'category': category,
-        'countries': countries,
-        'organizations': organizations,
-        'is_structured': is_structured,
-        'telegram_link': f"https://t.me/{channel_username}/{message.id}",
-        'telegram_date': message.date.isoformat(),
-        'status': 'published',
-    }
+    return ArticleRecord(
+        telegram_id=telegram_id,
+        channel=channel,
+        slug=generate_slug(title, telegram_id),
+        title=title,
+        excerpt=excerpt,
+        content=text,
+        category=category,
+        countries=countries,
+        organizations=organizations,
+        is_structured=is_structured,
+        telegram_link=f"https://t.me/{channel_username}/{message.id}",
+        telegram_date=message.date.isoformat(),
+        sentiment_score=score(normalized),
+        message_id=message.id,
+    )
 
 
 def is_continuation_message(text: str) -> bool:
@@ -799,7 +771,7 @@ def has_article_header(text: str, entities=None) -> bool:
 
     # Check structured header (TITLE:, **Title : Value**, etc.)
     parsed = parse_structured_header(text)
-    if parsed and parsed.get('title'):
+    if parsed and parsed.title:
         return True
 
     # Check for bold header using ** markdown
@@ -810,6 +782,7 @@ def has_article_header(text: str, entities=None) -> bool:
 
     # Check Telegram native bold formatting (entities) at the start of message
     if entities:
+        from telethon.tl.types import MessageEntityBold
         for entity in entities:
             if isinstance(entity, MessageEntityBold) and entity.offset < 10 and entity.length >= 15:
                 return True
@@ -817,13 +790,35 @@ def has_article_header(text: str, entities=None) -> bool:
     return False
 
 
-def group_multipart_messages(messages: list[Message], time_threshold_seconds: int = 600) -> list[list[Message]]:
+def starts_new_group(prev_msg: Message, current_msg: Message, time_threshold_seconds: int = 600) -> bool:
     """
-    Group consecutive messages that are likely parts of the same article.
+    Whether current_msg starts a new article rather than continuing prev_msg.
     - Messages with their own article header always start a new group.
     - Continuation messages (mid-sentence, numbered sections) grouped up to 1800s.
     - Other messages grouped within time_threshold_seconds.
     """
+    # Calculate time difference in seconds
+    time_diff = (current_msg.date - prev_msg.date).total_seconds()
+
+    msg_text = getattr(current_msg, 'text', '') or getattr(current_msg, 'message', '') or ''
+    msg_entities = getattr(current_msg, 'entities', None)
+    continuation = is_continuation_message(msg_text)
+
+    if has_article_header(msg_text, msg_entities) and not continuation:
+        # Message has its own article header - always start a new group
+        return True
+    if continuation and time_diff <= 1800:
+        # Clear mid-sentence continuation (up to 30 min)
+        return False
+    # Close in time - likely same article
+    return time_diff > time_threshold_seconds
+
+
+def group_multipart_messages(messages: list[Message], time_threshold_seconds: int = 600) -> list[list[Message]]:
+    """
+    Group consecutive messages that are likely parts of the same article
+    (see starts_new_group).
+    """
     if not messages:
         return []
 
@@ -834,30 +829,12 @@ def group_multipart_messages(messages: list[Message], time_threshold_seconds: in
     current_group = [sorted_messages[0]]
 
     for i in range(1, len(sorted_messages)):
-        current_msg = sorted_messages[i]
-        prev_msg = sorted_messages[i - 1]
-
-        # Calculate time difference in seconds
-        time_diff = (current_msg.date - prev_msg.date).total_seconds()
-
-        msg_text = getattr(current_msg, 'text', '') or getattr(current_msg, 'message', '') or ''
-        msg_entities = getattr(current_msg, 'entities', None)
-        continuation = is_continuation_message(msg_text)
-
-        if has_article_header(msg_text, msg_entities) and not continuation:
-            # Message has its own article header - always start a new group
-            groups.append(current_group)
-            current_group = [current_msg]
-        elif continuation and time_diff <= 1800:
-            # Clear mid-sentence continuation (up to 30 min)
-            current_group.append(current_msg)
-        elif time_diff <= time_threshold_seconds:
-            # Close in time - likely same article
-            current_group.append(current_msg)
-        else:
+        if starts_new_group(sorted_messages[i - 1], sorted_messages[i], time_threshold_seconds):
             # New group - save current and start new
             groups.append(current_group)
-            current_group = [current_msg]
+            current_group = [sorted_messages[i]]
+        else:
+            current_group.append(sorted_messages[i])
 
     # Don't forget the last group
     groups.append(current_group)
@@ -865,7 +842,7 @@ def group_multipart_messages(messages: list[Message], time_threshold_seconds: in
     return groups
 
 
-def combine_message_group(messages: list[Message], channel: str, channel_username: str) -> dict | None:
+def combine_message_group(messages: list[Message], channel: str, channel_username: str) -> ArticleRecord | None:
     """
     Combine a group of messages into a single article.
     The first message (oldest) is treated as the main article with the title.
@@ -886,43 +863,45 @@ def combine_message_group(messages: list[Message], channel: str, channel_usernam
 
     # Try to parse structured headers from the first message
     structured = parse_structured_header(first_message.text)
-
-    if structured and structured['title']:
-        title = structured['title']
-        category = structured['category'] or detect_category_legacy(combined_text)
-        countries = structured['countries'] or detect_countries_legacy(combined_text)
-        organizations = structured['organizations'] or detect_organizations_legacy(combined_text)
-        content_start = structured['content_start']
+    # Matching form for keyword detection and sentiment, computed once
+    normalized = normalize(combined_text)
+
+    if structured and structured.title:
+        title = structured.title
+        category = structured.category or detect_category_legacy(normalized)
+        countries = structured.countries or detect_countries_legacy(normalized)
+        organizations = structured.organizations or detect_organizations_legacy(normalized)
+        content_start = structured.content_start
         is_structured = True
     else:
         # Fall back to legacy detection on first message only
         title = extract_title_legacy(first_message.text)
-        category = detect_category_legacy(combined_text)
-        countries = detect_countries_legacy(combined_text)
-        organizations = detect_organizations_legacy(combined_text)
+        category = detect_category_legacy(normalized)
+        countries = detect_countries_legacy(normalized)
+        organizations = detect_organizations_legacy(normalized)
         content_start = 0
         is_structured = False
 
     excerpt = extract_excerpt(combined_text, title, content_start)
 
     telegram_id = f"{channel_username}/{first_message.id}"
-    return {
-        'telegram_id': telegram_id,
-        'channel': channel,
-        'slug': generate_slug(title, telegram_id),
-        'title': title,
-        'excerpt': excerpt,
-        'content': combined_text,
-        'category': category,
-        'countries': countries,
-        'organizations': organizations,
-        'is_structured': is_structured,
-        'telegram_link': f"https://t.me/{channel_username}/{first_message.id}",
-        'telegram_date': first_message.date.isoformat(),
-        'status': 'published',
-        '_part_count': len(sorted_messages),  # For logging
-        '_message_id': first_message.id,  # For tracking
-    }
+    return ArticleRecord(
+        telegram_id=telegram_id,
+        channel=channel,
+        slug=generate_slug(title, telegram_id),
+        title=title,
+        excerpt=excerpt,
+        content=combined_text,
+        category=category,
+        countries=countries,
+        organizations=organizations,
+        is_structured=is_structured,
+        telegram_link=f"https://t.me/{channel_username}/{first_message.id}",
+        telegram_date=first_message.date.isoformat(),
+        sentiment_score=score(normalized),
+        part_count=len(sorted_messages),  # For logging
+        message_id=first_message.id,  # For tracking
+    )
 
 
 # =============================================================================
@@ -934,6 +913,8 @@ async def discover_discussion_group(client: TelegramClient, channel_username: st
     Discover the linked discussion group for a channel.
     Returns the discussion group entity, or None if no linked group.
     """
+    from telethon.tl.functions.channels import GetFullChannelRequest
+
     try:
         channel = await client.get_entity(channel_username)
         full = await client(GetFullChannelRequest(channel))
@@ -956,6 +937,8 @@ async def resolve_channel_post_id(client: TelegramClient, discussion_group, mess
     Comments in discussion groups reply to an auto-forwarded copy of the channel post.
     We walk up the reply chain (max 10 hops) to find the root forwarded post.
     """
+    from telethon.tl.types import MessageService
+
     current = message
     for _ in range(10):
         reply_to_id = getattr(current.reply_to, 'reply_to_msg_id', None) if current.reply_to else None
@@ -983,6 +966,77 @@ async def resolve_channel_post_id(client: TelegramClient, discussion_group, mess
     return None
 
 
+def is_candidate_comment(message) -> bool:
+    """Whether a discussion group message looks like a user comment."""
+    from telethon.tl.types import MessageService
+
+    # Skip service messages
+    if isinstance(message, MessageService):
+        return False
+
+    # Must have text content
+    if not message.text or len(message.text.strip()) < 3:
+        return False
+
+    # Must be a reply (comments always reply to something)
+    if not message.reply_to:
+        return False
+
+    # Skip forwarded messages (these are the auto-forwarded channel posts)
+    if message.fwd_from:
+        return False
+
+    return True
+
+
+async def build_comment_record(
+    client: TelegramClient,
+    discussion_group,
+    channel_username: str,
+    message,
+    article_cache: dict,
+) -> dict | None:
+    """
+    Build an article_comments row for a discussion group message.
+    article_cache maps telegram_id -> article DB id. Returns None if the
+    comment can't be matched to a synced article.
+    """
+    # Resolve which channel post this comment belongs to
+    channel_post_id = await resolve_channel_post_id(client, discussion_group, message)
+    if not channel_post_id:
+        return None
+
+    # Look up the article
+    telegram_id = f"{channel_username}/{channel_post_id}"
+    article_db_id = article_cache.get(telegram_id)
+    if not article_db_id:
+        return None
+
+    # Get sender info
+    sender = await message.get_sender()
+    if sender:
+        guest_name = getattr(sender, 'first_name', '') or getattr(sender, 'username', '') or 'Telegram User'
+        guest_name = guest_name[:50]
+        sender_id = sender.id
+    else:
+        guest_name = 'Telegram User'
+        sender_id = 0
+
+    # Truncate comment text to 2000 chars
+    content = message.text.strip()[:2000]
+
+    return {
+        'article_id': article_db_id,
+        'guest_name': guest_name,
+        'session_id': f"tg_{sender_id}",
+        'content': content,
+        'telegram_message_id': f"{discussion_group.id}/{message.id}",
+        'source': 'telegram',
+        'is_approved': True,
+        'created_at': message.date.isoformat(),
+    }
+
+
 async def fetch_and_sync_comments(
     client: TelegramClient,
     supabase: Client,
@@ -996,6 +1050,8 @@ async def fetch_and_sync_comments(
 
     Returns (synced_count, skipped_count, max_message_id).
     """
+    from telethon.errors import FloodWaitError
+
     synced = 0
     skipped = 0
     max_id = min_id
@@ -1007,28 +1063,14 @@ async def fetch_and_sync_comments(
     candidates = []
     fetch_count = 0
     try:
-        async for message in client.iter_messages(discussion_group, min_id=min_id, limit=2000):
-            fetch_count += 1
-            if message.id > max_id:
-                max_id = message.id
-
-            # Skip service messages
-            if isinstance(message, MessageService):
-                continue
-
-            # Must have text content
-            if not message.text or len(message.text.strip()) < 3:
-                continue
-
-            # Must be a reply (comments always reply to something)
-            if not message.reply_to:
-                continue
-
-            # Skip forwarded messages (these are the auto-forwarded channel posts)
-            if message.fwd_from:
-                continue
+        with METRICS.stage('comment_fetch'):
+            async for message in client.iter_messages(discussion_group, min_id=min_id, limit=2000):
+                fetch_count += 1
+                if message.id > max_id:
+                    max_id = message.id
 
-            candidates.append(message)
+                if is_candidate_comment(message):
+                    candidates.append(message)
     except FloodWaitError as e:
         print(f"  Rate limited, need to wait {e.seconds}s. Skipping comment sync.")
         return 0, 0, max_id
@@ -1074,42 +1116,12 @@ async def fetch_and_sync_comments(
             skipped += 1
             continue
 
-        # Resolve which channel post this comment belongs to
-        channel_post_id = await resolve_channel_post_id(client, discussion_group, message)
-        if not channel_post_id:
-            continue
-
-        # Look up the article
-        telegram_id = f"{channel_username}/{channel_post_id}"
-        article_db_id = article_cache.get(telegram_id)
-        if not article_db_id:
-            continue
-
-        # Get sender info
-        sender = await message.get_sender()
-        if sender:
-            guest_name = getattr(sender, 'first_name', '') or getattr(sender, 'username', '') or 'Telegram User'
-            guest_name = guest_name[:50]
-            sender_id = sender.id
-        else:
-            guest_name = 'Telegram User'
-            sender_id = 0
-
-        # Truncate comment text to 2000 chars
-        content = message.text.strip()[:2000]
-
-        comment_record = {
-            'article_id': article_db_id,
-            'guest_name': guest_name,
-            'session_id': f"tg_{sender_id}",
-            'content': content,
-            'telegram_message_id': tg_msg_id,
-            'source': 'telegram',
-            'is_approved': True,
-            'created_at': message.date.isoformat(),
-        }
-
-        comments_to_insert.append(comment_record)
+        with METRICS.stage('comment_resolve'):
+            comment_record = await build_comment_record(
+                client, discussion_group, channel_username, message, article_cache
+            )
+        if comment_record:
+            comments_to_insert.append(comment_record)
 
     print(f"  Resolved {len(comments_to_insert)} new comments, {skipped} already synced")
 
@@ -1127,9 +1139,11 @@ async def fetch_and_sync_comments(
             # Insert in batches of 50
             for i in range(0, len(comments_to_insert), 50):
                 batch = comments_to_insert[i:i+50]
-                supabase.table('article_comments').insert(batch).execute()
+                with METRICS.stage('comment_insert'):
+                    supabase.table('article_comments').insert(batch).execute()
                 synced += len(batch)
             print(f"  Inserted {synced} Telegram comments")
+            METRICS.count('comments_inserted', synced)
         except Exception as e:
             print(f"  Error inserting comments: {e}")
 
@@ -1186,150 +1200,234 @@ async def sync_comments_for_channel(
 # MAIN FETCH LOGIC
 # =============================================================================
 
-async def fetch_channel_messages(
+# Columns loaded for existing articles (media reuse, change detection and
+# metrics snapshot deltas)
+EXISTING_COLUMNS = 'telegram_id, title, content, category, countries, organizations, image_url, video_url, media_hash, slug, telegram_date, sentiment_score'
+# Rows per request when loading existing articles (content included)
+EXISTING_BATCH_SIZE = 500
+
+
+def load_existing_articles(supabase: Client, channel: str) -> dict | None:
+    """
+    Load existing articles for a channel, keyed by telegram_id, in
+    telegram_id order with keyset pagination (a single request would be
+    cut at the server's max-rows). Returns None if a query failed.
+    """
+    existing = {}
+    last_id = ''
+    try:
+        with METRICS.stage('existing_load'):
+            while True:
+                result = supabase.table('articles').select(EXISTING_COLUMNS).eq('channel', channel).gt(
+                    'telegram_id', last_id
+                ).order('telegram_id').limit(EXISTING_BATCH_SIZE).execute()
+                if not result.data:
+                    break
+                existing.update((row['telegram_id'], row) for row in result.data)
+                last_id = result.data[-1]['telegram_id']
+        return existing
+    except Exception as e:
+        print(f"  Warning: Could not fetch existing data: {e}")
+        return None
+
+
+def is_candidate_message(message: Message) -> bool:
+    """
+    Accept if has enough text OR has media with some text.
+    Lower threshold (20 chars) to include short header messages for multi-part articles.
+    """
+    has_text = message.text and len(message.text.strip()) >= 20
+    has_media_with_caption = message.media and message.text and len(message.text.strip()) >= 10
+    return bool(has_text or has_media_with_caption)
+
+
+async def build_group_article(
     client: TelegramClient,
     supabase: Client,
-    channel_username: str,
+    group: list[Message],
     channel: str,
-    min_id: int = 0,
-    limit: int = 2000,
-    full_sync: bool = False
-) -> tuple[list[dict], int]:
+    channel_username: str,
+    existing_data: dict,
+) -> ArticleRecord | None:
+    """
+    Combine a message group into an article and attach its media URLs and
+    the hash of its first media. Media already stored for the article is
+    reused instead of re-uploaded.
     """
-    Fetch messages from a Telegram channel.
+    with METRICS.stage('parse'):
+        article = combine_message_group(group, channel, channel_username)
+    if not article:
+        return None
 
-    Args:
-        min_id: Only fetch messages with ID > min_id (for incremental sync)
-        full_sync: If True, ignore min_id and fetch all messages
+    telegram_id = article.telegram_id
+    existing_article = existing_data.get(telegram_id, {})
 
-    Returns:
-        (articles, max_message_id)
-    """
-    articles = []
-    structured_count = 0
-    multipart_count = 0
-    media_count = 0
-    max_id = min_id
+    # Check if article already has media in DB
+    existing_img = existing_article.get('image_url')
+    existing_vid = existing_article.get('video_url')
 
-    try:
-        entity = await client.get_entity(channel_username)
+    if existing_img or existing_vid:
+        # Use existing media URLs - skip download/upload
+        image_url = existing_img
+        video_url = existing_vid
+        media_hash = existing_article.get('media_hash')
+    else:
+        # Find and upload media from the group (new article or missing media)
+        image_url = None
+        video_url = None
+        media_hash = None
+        for msg in group:
+            if msg.media and (image_url is None or video_url is None):
+                img, vid, digest = await upload_media_to_storage(
+                    client, supabase, msg, telegram_id
+                )
+                if img and image_url is None:
+                    image_url = img
+                if vid and video_url is None:
+                    video_url = vid
+                if digest and media_hash is None:
+                    media_hash = digest
+                # Stop if we found both
+                if image_url and video_url:
+                    break
 
-        if full_sync:
-            print(f"\n[FULL SYNC] Fetching ALL messages from @{channel_username} ({channel})...")
-        else:
-            print(f"\n[INCREMENTAL] Fetching messages from @{channel_username} ({channel}) since ID {min_id}...")
+    # Add media URLs to article
+    article.image_url = image_url
+    article.video_url = video_url
+    article.media_hash = media_hash
+    return article
 
-        # Collect all valid messages first
-        raw_messages = []
-        fetch_count = 0
 
-        async for message in client.iter_messages(entity, limit=limit, min_id=min_id if not full_sync else 0):
-            fetch_count += 1
+# =============================================================================
+# STREAMING PIPELINE
+# =============================================================================
+
+# Upper bound on messages held for one article group while streaming
+MAX_GROUP_MESSAGES = 50
+
+# Articles per batched upsert
+UPSERT_BATCH_SIZE = 50
+
+
+async def find_window_start(client: TelegramClient, entity, min_id: int, limit: int, max_id_filter: int = 0) -> int:
+    """
+    Return the ID to scan upward from so an oldest-first scan covers the
+    same window as the newest `limit` messages after min_id.
+    """
+    if not limit:
+        return min_id
+    async for message in client.iter_messages(
+        entity, limit=1, add_offset=limit - 1, min_id=min_id, max_id=max_id_filter
+    ):
+        return message.id - 1
+    # Fewer than `limit` messages after min_id - take them all
+    return min_id
+
+
+async def iter_channel_messages(
+    client: TelegramClient,
+    entity,
+    min_id: int,
+    limit: int,
+    progress: dict,
+    max_id_filter: int = 0,
+):
+    """
+    Yield candidate article messages oldest first.
+    progress['fetched'] and progress['max_id'] are updated as messages arrive.
+    """
+    from telethon.tl.types import Message
+
+    start_id = await find_window_start(client, entity, min_id, limit, max_id_filter)
+    messages = client.iter_messages(entity, min_id=start_id, max_id=max_id_filter, reverse=True).__aiter__()
+    # Only the pulls count as 'fetch': the consumer parses, uploads and
+    # upserts between yields, which have stages of their own
+    fetch_seconds = 0.0
+    try:
+        while True:
+            started = time.perf_counter()
+            try:
+                message = await messages.__anext__()
+            except StopAsyncIteration:
+                break
+            finally:
+                fetch_seconds += time.perf_counter() - started
+            progress['fetched'] += 1
             if isinstance(message, Message):
                 # Track max ID
-                if message.id > max_id:
-                    max_id = message.id
+                if message.id > progress['max_id']:
+                    progress['max_id'] = message.id
 
-                # Accept if has enough text OR has media with some text
-                # Lower threshold (20 chars) to include short header messages for multi-part articles
-                has_text = message.text and len(message.text.strip()) >= 20
-                has_media_with_caption = message.media and message.text and len(message.text.strip()) >= 10
-                if has_text or has_media_with_caption:
-                    raw_messages.append(message)
+                if is_candidate_message(message):
+                    yield message
+    finally:
+        METRICS.record('fetch', fetch_seconds)
 
-        print(f"  Fetched {fetch_count} messages, {len(raw_messages)} valid articles")
 
-        if not raw_messages:
-            print(f"  No new messages to process")
-            return [], max_id
+async def stream_message_groups(messages, time_threshold_seconds: int = 600):
+    """
+    Streaming group_multipart_messages for messages arriving oldest first.
+    A group is yielded as soon as the next message starts a new one, so only
+    the current group (at most MAX_GROUP_MESSAGES) is held in memory.
+    """
+    current_group = []
+    async for message in messages:
+        with METRICS.stage('group'):
+            if current_group and (
+                len(current_group) >= MAX_GROUP_MESSAGES
+                or starts_new_group(current_group[-1], message, time_threshold_seconds)
+            ):
+                group, current_group = current_group, [message]
+            else:
+                current_group.append(message)
+                continue
+        yield group
 
-        # Group multi-part messages (within 10 minutes, or longer for continuations)
-        message_groups = group_multipart_messages(raw_messages)
-        print(f"  Grouped into {len(message_groups)} article groups")
+    if current_group:
+        yield current_group
 
-        # Get existing articles with their media URLs to avoid re-uploading
-        existing_data = {}
-        try:
-            existing = supabase.table('articles').select('telegram_id, image_url, video_url, content').eq('channel', channel).execute()
-            existing_data = {
-                row['telegram_id']: {
-                    'image_url': row.get('image_url'),
-                    'video_url': row.get('video_url'),
-                    'content_hash': hashlib.md5(str(row.get('content', '')).encode()).hexdigest()
-                }
-                for row in existing.data
-            }
-            print(f"  Found {len(existing_data)} existing articles in DB")
-        except Exception as e:
-            print(f"  Warning: Could not fetch existing data: {e}")
-
-        # Process each group
-        for group in message_groups:
-            article = combine_message_group(group, channel, channel_username)
-            if article:
-                telegram_id = article['telegram_id']
-                existing_article = existing_data.get(telegram_id, {})
-
-                # Check if article already has media in DB
-                existing_img = existing_article.get('image_url')
-                existing_vid = existing_article.get('video_url')
-
-                if existing_img or existing_vid:
-                    # Use existing media URLs - skip download/upload
-                    image_url = existing_img
-                    video_url = existing_vid
-                    if existing_img or existing_vid:
-                        media_count += 1
-                else:
-                    # Find and upload media from the group (new article or missing media)
-                    image_url = None
-                    video_url = None
-                    for msg in group:
-                        if msg.media and (image_url is None or video_url is None):
-                            img, vid = await upload_media_to_storage(
-                                client, supabase, msg, telegram_id
-                            )
-                            if img and image_url is None:
-                                image_url = img
-                            if vid and video_url is None:
-                                video_url = vid
-                            # Stop if we found both
-                            if image_url and video_url:
-                                break
-
-                    if image_url or video_url:
-                        media_count += 1
-
-                # Add media URLs to article
-                article['image_url'] = image_url
-                article['video_url'] = video_url
-
-                articles.append(article)
-                if article.get('is_structured'):
-                    structured_count += 1
-                if article.get('_part_count', 1) > 1:
-                    multipart_count += 1
-
-        print(f"  Processed: {len(articles)} articles ({structured_count} structured, {multipart_count} multi-part, {media_count} with media)")
 
-    except Exception as e:
-        print(f"Error fetching @{channel_username}: {e}")
-        import traceback
-        traceback.print_exc()
-
-    return articles, max_id
+async def stream_channel_articles(
+    client: TelegramClient,
+    supabase: Client,
+    channel_username: str,
+    channel: str,
+    existing_data: dict,
+    progress: dict,
+    min_id: int = 0,
+    limit: int = 2000,
+    max_id_filter: int = 0,
+):
+    """
+    Fetch -> group -> parse -> media as a pipeline of async generators.
+    Yields (article, last_message_id) for each completed group, oldest first;
+    last_message_id is the newest message ID of the group.
+    """
+    entity = await client.get_entity(channel_username)
+    messages = iter_channel_messages(client, entity, min_id, limit, progress, max_id_filter)
+    async for group in stream_message_groups(messages):
+        progress['groups'] += 1
+        article = await build_group_article(client, supabase, group, channel, channel_username, existing_data)
+        if article:
+            yield article, max(m.id for m in group)
 
 
 def smart_upsert_articles(
     supabase: Client,
-    articles: list[dict],
+    articles: list[ArticleRecord],
     channel: str,
     existing_data: dict = None,
-    full_sync: bool = False
+    full_sync: bool = False,
+    slug_allocator: SlugAllocator | None = None,
 ) -> dict:
     """
     Smart upsert that only updates articles that have actually changed.
 
+    existing_data is updated in place with the rows written (and orphans
+    removed), so callers can keep it as a warm cache across runs.
+    New articles get their slug from slug_allocator (one is created if not
+    given); pass the same allocator across batches to reuse its index.
+
     Returns stats dict with counts.
     """
     stats = {
@@ -1347,30 +1445,39 @@ def smart_upsert_articles(
 
     # Fetch existing data if not provided
     if existing_data is None:
-        try:
-            existing = supabase.table('articles').select('telegram_id, content, title, category, image_url, video_url, slug').eq('channel', channel).execute()
-            existing_data = {row['telegram_id']: row for row in existing.data}
-        except Exception as e:
-            print(f"  Warning: Could not fetch existing data: {e}")
+        existing_data = load_existing_articles(supabase, channel)
+        if existing_data is None:
+            SNAPSHOT.invalidate('existing articles could not be loaded')
             existing_data = {}
 
-    # Build set of used slugs for collision detection
-    used_slugs = {row.get('slug') for row in existing_data.values() if row.get('slug')}
+    # Check the slugs of all new articles in one batched lookup
+    if slug_allocator is None:
+        slug_allocator = SlugAllocator(supabase, channel)
+    new_articles = [a for a in articles if a.telegram_id not in existing_data]
+    try:
+        slug_allocator.prepare(a.slug for a in new_articles)
+    except Exception as e:
+        print(f"  Warning: Could not check existing slugs: {e}")
+
+    # Changed or new rows, written in one request at the end
+    pending = []
+    # telegram_id -> base slug of new rows, for conflict retries
+    base_slugs = {}
 
     for article in articles:
         try:
-            telegram_id = article['telegram_id']
+            telegram_id = article.telegram_id
             existing = existing_data.get(telegram_id)
 
-            # Remove internal fields before saving
-            article_data = {k: v for k, v in article.items() if not k.startswith('_')}
+            article_data = article.to_row()
 
             if existing:
                 # Check if content has actually changed
                 new_hash = hash_article_content(article_data)
                 old_hash = hash_article_content(existing)
 
-                if new_hash == old_hash:
+                # Articles stored before scoring existed are rewritten once with a score
+                if new_hash == old_hash and existing.get('sentiment_score') is not None:
                     stats['skipped'] += 1
                     continue
                 else:
@@ -1378,54 +1485,305 @@ def smart_upsert_articles(
                     if existing.get('slug'):
                         article_data['slug'] = existing['slug']
                     # Content changed, update
-                    supabase.table('articles').upsert(
-                        article_data,
-                        on_conflict='telegram_id'
-                    ).execute()
-                    stats['updated'] += 1
+                    pending.append((article_data, 'updated'))
             else:
                 # New article — ensure slug uniqueness
                 base_slug = article_data.get('slug', '')
-                slug = base_slug
-                counter = 2
-                while slug in used_slugs:
-                    slug = f"{base_slug}-{counter}"
-                    counter += 1
-                article_data['slug'] = slug
-                used_slugs.add(slug)
-
-                supabase.table('articles').upsert(
-                    article_data,
-                    on_conflict='telegram_id'
-                ).execute()
-                stats['inserted'] += 1
+                article_data['slug'] = slug_allocator.allocate(base_slug)
+                base_slugs[telegram_id] = base_slug
+                pending.append((article_data, 'inserted'))
 
         except Exception as e:
             stats['errors'] += 1
-            print(f"    Error saving {article.get('telegram_id', 'unknown')}: {e}")
+            print(f"    Error saving {article.telegram_id}: {e}")
+
+    write_article_rows(supabase, pending, existing_data, stats, slug_allocator, base_slugs)
 
     print(f"  Results: {stats['inserted']} new, {stats['updated']} updated, {stats['skipped']} unchanged, {stats['errors']} errors")
+    for key in ('inserted', 'updated', 'skipped', 'errors'):
+        METRICS.count(f'articles_{key}', stats[key])
 
     # Clean up orphaned entries only on full sync
     if full_sync:
-        print(f"\n  Cleaning up orphaned entries...")
+        cleanup_orphaned_articles(supabase, {article.telegram_id for article in articles}, existing_data)
+
+    return stats
+
+
+def cleanup_orphaned_articles(supabase: Client, valid_ids: set, existing_data: dict):
+    """Delete stored articles that a full sync did not produce."""
+    print(f"\n  Cleaning up orphaned entries...")
+    try:
+        existing_ids = set(existing_data.keys())
+        orphaned_ids = existing_ids - valid_ids
+
+        if orphaned_ids:
+            print(f"  Found {len(orphaned_ids)} orphaned entries to remove")
+            removed = delete_articles(supabase, orphaned_ids, existing_data)
+            print(f"  Removed {removed} orphaned entries")
+        else:
+            print(f"  No orphaned entries found")
+    except Exception as e:
+        print(f"  Error during cleanup: {e}")
+
+
+def write_article_rows(
+    supabase: Client,
+    pending: list[tuple[dict, str]],
+    existing_data: dict,
+    stats: dict,
+    slug_allocator: SlugAllocator | None = None,
+    base_slugs: dict | None = None,
+):
+    """
+    Upsert (row, 'inserted' | 'updated') pairs in one request, falling back
+    to one request per row if the batch fails so one bad row doesn't block
+    the others. A new row whose slug was taken meanwhile gets a fresh slug
+    and is retried. Updates existing_data and stats for the rows written.
+    """
+    if not pending:
+        return
+
+    try:
+        with METRICS.stage('upsert'):
+            supabase.table('articles').upsert(
+                [row for row, _ in pending],
+                on_conflict='telegram_id'
+            ).execute()
+        written = pending
+    except Exception as e:
+        if len(pending) > 1:
+            print(f"    Batch upsert failed ({e}), retrying row by row")
+        written = []
+        for row, kind in pending:
+            base_slug = (base_slugs or {}).get(row['telegram_id'])
+            for attempt in range(MAX_CONFLICT_RETRIES + 1):
+                try:
+                    with METRICS.stage('upsert'):
+                        supabase.table('articles').upsert(row, on_conflict='telegram_id').execute()
+                    written.append((row, kind))
+                    break
+                except Exception as row_error:
+                    if (slug_allocator and base_slug is not None and attempt < MAX_CONFLICT_RETRIES
+                            and is_slug_conflict(row_error)):
+                        slug_allocator.conflict(row['slug'], base_slug)
+                        row['slug'] = slug_allocator.allocate(base_slug)
+                        continue
+                    stats['errors'] += 1
+                    print(f"    Error saving {row['telegram_id']}: {row_error}")
+                    break
+
+    for row, kind in written:
+        SNAPSHOT.record(existing_data.get(row['telegram_id']), row)
+        existing_data[row['telegram_id']] = row
+        stats[kind] += 1
+
+
+def delete_articles(supabase: Client, telegram_ids, existing_data: dict | None = None) -> int:
+    """
+    Delete articles by telegram_id (e.g. posts deleted on Telegram).
+    Removes them from existing_data too. Returns the number deleted.
+    """
+    deleted = 0
+    for telegram_id in telegram_ids:
         try:
-            valid_ids = {article['telegram_id'] for article in articles}
-            existing_ids = set(existing_data.keys())
-            orphaned_ids = existing_ids - valid_ids
-
-            if orphaned_ids:
-                print(f"  Found {len(orphaned_ids)} orphaned entries to remove")
-                for orphan_id in orphaned_ids:
-                    try:
-                        supabase.table('articles').delete().eq('telegram_id', orphan_id).execute()
-                    except Exception as e:
-                        print(f"    Error deleting {orphan_id}: {e}")
-                print(f"  Removed {len(orphaned_ids)} orphaned entries")
+            with METRICS.stage('delete'):
+                supabase.table('articles').delete().eq('telegram_id', telegram_id).execute()
+            old = existing_data.pop(telegram_id, None) if existing_data is not None else None
+            if old is not None:
+                SNAPSHOT.record(old, None)
             else:
-                print(f"  No orphaned entries found")
+                SNAPSHOT.invalidate('deleted an article missing from the cache')
+            deleted += 1
+            METRICS.count('articles_deleted')
         except Exception as e:
-            print(f"  Error during cleanup: {e}")
+            print(f"    Error deleting {telegram_id}: {e}")
+    return deleted
+
+
+# =============================================================================
+# DELETION DETECTION
+# =============================================================================
+
+# Message IDs per get_messages request
+DELETION_CHECK_BATCH = 100
+
+# Abort if more than this share of the checked articles looks deleted -
+# more likely an access problem than a mass deletion
+DELETION_SAFETY_RATIO = 0.5
+
+
+async def detect_deleted_articles(
+    client: TelegramClient,
+    supabase: Client,
+    channel: str,
+    username: str,
+    sync_state: dict,
+    existing_data: dict | None = None,
+    sample: int = 0,
+    dry_run: bool = False,
+) -> int:
+    """
+    Find articles whose Telegram post no longer exists and delete them,
+    without refetching the channel.
+
+    Looks up each article's first message with get_messages(ids=[...]) in
+    batches of DELETION_CHECK_BATCH; deleted messages come back as None.
+    With sample > 0 only that many articles are checked per run, newest
+    first, resuming where the previous run stopped (kept in sync_state).
+
+    Returns the number of articles deleted (or found, with dry_run).
+    """
+    if existing_data is None:
+        existing_data = load_existing_articles(supabase, channel)
+        if existing_data is None:
+            return 0
+
+    prefix = f"{username}/"
+    message_ids = sorted(
+        (int(tid[len(prefix):]) for tid in existing_data if tid.startswith(prefix) and tid[len(prefix):].isdigit()),
+        reverse=True,
+    )
+    if not message_ids:
+        return 0
+
+    if sample and sample < len(message_ids):
+        cursor = sync_state.get(channel, {}).get('deletion_check_cursor', 0)
+        start = next((i for i, mid in enumerate(message_ids) if cursor and mid < cursor), 0)
+        to_check = (message_ids[start:] + message_ids[:start])[:sample]
+    else:
+        to_check = message_ids
+
+    print(f"  Checking {len(to_check)} of {len(message_ids)} @{username} articles for deleted posts...")
+
+    entity = await client.get_entity(username)
+    missing = []
+    for i in range(0, len(to_check), DELETION_CHECK_BATCH):
+        batch = to_check[i:i + DELETION_CHECK_BATCH]
+        with METRICS.stage('deletion_check'):
+            messages = await client.get_messages(entity, ids=batch)
+        missing.extend(mid for mid, message in zip(batch, messages) if message is None)
+
+    if sample and sample < len(message_ids):
+        update_sync_state(sync_state, channel, deletion_check_cursor=to_check[-1])
+
+    if not missing:
+        print(f"  No deleted posts found")
+        return 0
+
+    if len(missing) > len(to_check) * DELETION_SAFETY_RATIO:
+        print(f"  Warning: {len(missing)} of {len(to_check)} posts look deleted - skipping deletion as a safety measure")
+        return 0
+
+    telegram_ids = [f"{prefix}{mid}" for mid in missing]
+    if dry_run:
+        for telegram_id in telegram_ids:
+            print(f"    [DRY RUN] would delete {telegram_id}")
+        return len(telegram_ids)
+
+    removed = delete_articles(supabase, telegram_ids, existing_data)
+    print(f"  Removed {removed} articles deleted on Telegram")
+    return removed
+
+
+async def sync_channel_articles(
+    client: TelegramClient,
+    supabase: Client,
+    channel: str,
+    username: str,
+    sync_state: dict,
+    full_sync: bool = False,
+    limit: int = 2000,
+    existing_data: dict | None = None,
+) -> dict:
+    """
+    Stream, parse and upsert new articles for one channel in batches of
+    UPSERT_BATCH_SIZE, advancing (and saving) the sync state after each
+    batch so a cancelled run keeps its progress. Pass existing_data to
+    reuse a warm cache of existing rows.
+
+    Returns stats dict with counts.
+    """
+    last_id = 0 if full_sync else get_last_synced_id(sync_state, channel)
+
+    if existing_data is None:
+        existing_data = load_existing_articles(supabase, channel)
+        if existing_data is None:
+            SNAPSHOT.invalidate('existing articles could not be loaded')
+            existing_data = {}
+
+    stats = {'total': 0, 'inserted': 0, 'updated': 0, 'skipped': 0, 'errors': 0}
+    progress = {'fetched': 0, 'max_id': last_id, 'groups': 0}
+    seen_ids = set()
+    structured_count = 0
+    multipart_count = 0
+    media_count = 0
+    completed = False
+
+    if full_sync:
+        print(f"\n[FULL SYNC] Fetching ALL messages from @{username} ({channel})...")
+    else:
+        print(f"\n[INCREMENTAL] Fetching messages from @{username} ({channel}) since ID {last_id}...")
+    print(f"  Found {len(existing_data)} existing articles in DB")
+
+    batch = []
+    batch_last_id = last_id
+    slug_allocator = SlugAllocator(supabase, channel)
+
+    def flush_batch():
+        batch_stats = smart_upsert_articles(
+            supabase, batch, channel, existing_data=existing_data, slug_allocator=slug_allocator,
+        )
+        for key in stats:
+            stats[key] += batch_stats[key]
+        # Every group up to batch_last_id is complete and written
+        committed = max(batch_last_id, get_last_synced_id(sync_state, channel))
+        update_sync_state(sync_state, channel, last_message_id=committed,
+                          articles_synced=len(seen_ids))
+        save_sync_state(sync_state)
+        batch.clear()
+
+    try:
+        async for article, group_last_id in stream_channel_articles(
+            client, supabase, username, channel, existing_data, progress,
+            min_id=last_id, limit=limit,
+        ):
+            seen_ids.add(article.telegram_id)
+            if article.image_url or article.video_url:
+                media_count += 1
+            if article.is_structured:
+                structured_count += 1
+            if article.part_count > 1:
+                multipart_count += 1
+
+            batch.append(article)
+            batch_last_id = group_last_id
+            if len(batch) >= UPSERT_BATCH_SIZE:
+                flush_batch()
+
+        if batch:
+            flush_batch()
+        completed = True
+    except Exception as e:
+        print(f"Error fetching @{username}: {e}")
+        import traceback
+        traceback.print_exc()
+
+    print(f"  Fetched {progress['fetched']} messages in {progress['groups']} article groups")
+    print(f"  Processed: {len(seen_ids)} articles ({structured_count} structured, {multipart_count} multi-part, {media_count} with media)")
+    METRICS.count('messages_fetched', progress['fetched'])
+
+    if not completed:
+        # Batches already written are kept; the next run resumes after them
+        return stats
+
+    if full_sync and seen_ids:
+        cleanup_orphaned_articles(supabase, seen_ids, existing_data)
+
+    # Skipped non-article messages still advance the sync position
+    if progress['max_id'] > get_last_synced_id(sync_state, channel):
+        update_sync_state(sync_state, channel, last_message_id=progress['max_id'],
+                          articles_synced=len(seen_ids))
 
     return stats
 
@@ -1434,6 +1792,17 @@ def smart_upsert_articles(
 # MAIN
 # =============================================================================
 
+# Functions timed by --profile async
+PROFILE_IO_FUNCTIONS = (
+    'load_existing_articles', 'upload_media_to_storage', 'smart_upsert_articles',
+    'delete_articles', 'resolve_channel_post_id',
+)
+PROFILE_CPU_FUNCTIONS = (
+    'stream_message_groups', 'starts_new_group', 'combine_message_group', 'parse_structured_header',
+    'hash_article_content', 'generate_slug',
+)
+
+
 async def main():
     """Main function to fetch and store articles."""
     # Parse command line arguments
@@ -1443,9 +1812,29 @@ async def main():
     parser.add_argument('--limit', type=int, default=2000, help='Maximum messages to fetch per channel')
     parser.add_argument('--comments', action='store_true', help='Also sync discussion group comments')
     parser.add_argument('--comments-only', action='store_true', help='Only sync comments (skip articles)')
+    parser.add_argument('--check-deleted', action='store_true',
+                        help='Remove articles whose Telegram post was deleted (no full resync needed)')
+    parser.add_argument('--check-sample', type=int, default=0,
+                        help='With --check-deleted, check at most this many articles per channel per run (0 = all)')
     parser.add_argument('--dry-run', action='store_true', help='Print what would be synced without writing')
+    parser.add_argument('--rebuild-snapshot', action='store_true',
+                        help='Rebuild the dashboard metrics snapshot from the whole articles table')
+    parser.add_argument('--rebuild-related', action='store_true',
+                        help='Recompute the related-article list of every article')
+    parser.add_argument('--rebuild-translations', action='store_true',
+                        help='Re-pair English and Arabic articles across the whole archive')
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
     args = parser.parse_args()
+    METRICS.configure(jsonl=args.metrics_jsonl, prometheus=args.metrics_prom)
+
+    with profile_run(args, 'fetch_telegram', globals(),
+                     cpu_functions=PROFILE_CPU_FUNCTIONS, io_functions=PROFILE_IO_FUNCTIONS):
+        await run_sync(args)
+
 
+async def run_sync(args):
+    """Run the article/comment sync described by the parsed arguments."""
     print("=" * 60)
     print("The Observer - Telegram Article Fetcher")
     print("OPTIMIZED: Incremental sync with change detection")
@@ -1472,28 +1861,12 @@ async def main():
             print(f"  {ch}: last_id={state.get('last_message_id', 0)}, last_sync={state.get('last_sync', 'never')}")
 
     print("\nConnecting to Supabase...")
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    supabase = get_supabase(SUPABASE_URL, SUPABASE_KEY)
 
     print("Connecting to Telegram...")
-
-    if SESSION_STRING:
-        print("Using StringSession (CI/CD mode)")
-        client = TelegramClient(StringSession(SESSION_STRING), int(API_ID), API_HASH)
-        await client.connect()
-        if not await client.is_user_authorized():
-            print("Error: StringSession is not authorized!")
-            return
-    else:
-        print("Using file session (local mode)")
-        session_path = os.path.join(os.path.dirname(__file__), 'observer_session')
-        client = TelegramClient(session_path, int(API_ID), API_HASH)
-        await client.connect()
-
-        if not await client.is_user_authorized():
-            print("Session not authorized. Please run login_telegram.py first to authenticate.")
-            print("Or set TELEGRAM_SESSION_STRING in .env for non-interactive mode.")
-            await client.disconnect()
-            return
+    client = await connect_telegram(API_ID, API_HASH, SESSION_STRING, os.path.dirname(__file__))
+    if client is None:
+        return
 
     print("Connected to Telegram!")
 
@@ -1513,31 +1886,29 @@ async def main():
     # --- Article sync (skip if --comments-only) ---
     if not args.comments_only:
         for channel, username in channels_to_sync:
-            # Get last synced ID for this channel
-            last_id = 0 if args.full else get_last_synced_id(sync_state, channel)
-
-            # Fetch messages
-            articles, max_id = await fetch_channel_messages(
-                client, supabase, username, channel,
-                min_id=last_id,
-                limit=args.limit,
-                full_sync=args.full
+            stats = await sync_channel_articles(
+                client, supabase, channel, username, sync_state,
+                full_sync=args.full, limit=args.limit,
             )
 
-            if articles:
-                # Smart upsert with change detection
-                stats = smart_upsert_articles(supabase, articles, channel, full_sync=args.full)
+            # Update totals
+            for key in total_stats:
+                total_stats[key] += stats[key]
 
-                # Update totals
-                for key in total_stats:
-                    total_stats[key] += stats[key]
-
-                # Update sync state with new max ID
-                update_sync_state(sync_state, channel, last_message_id=max_id, articles_synced=len(articles))
-            else:
-                # Even if no articles, update the max_id if we got one
-                if max_id > last_id:
-                    update_sync_state(sync_state, channel, last_message_id=max_id, articles_synced=0)
+    # --- Deletion check (if --check-deleted) ---
+    total_deleted = 0
+    if args.check_deleted and not args.comments_only:
+        print("\n" + "=" * 60)
+        print("DELETION CHECK")
+        print("=" * 60)
+        for channel, username in channels_to_sync:
+            try:
+                total_deleted += await detect_deleted_articles(
+                    client, supabase, channel, username, sync_state,
+                    sample=args.check_sample, dry_run=args.dry_run,
+                )
+            except Exception as e:
+                print(f"  Error checking deleted posts for @{username}: {e}")
 
     # --- Comment sync (if --comments or --comments-only) ---
     if args.comments or args.comments_only:
@@ -1563,6 +1934,17 @@ async def main():
 
     await client.disconnect()
 
+    # --- Dashboard metrics snapshot from this run's article changes ---
+    if not args.comments_only and not args.dry_run:
+        with METRICS.stage('snapshot'):
+            SNAPSHOT.publish(supabase, rebuild=args.rebuild_snapshot)
+        # --- Related-article lists of the articles this run changed ---
+        with METRICS.stage('related'):
+            update_related_articles(supabase, rebuild=args.rebuild_related)
+        # --- EN/AR translation links of recent articles ---
+        with METRICS.stage('translations'):
+            update_translation_links(supabase, rebuild=args.rebuild_translations)
+
     print("\n" + "=" * 60)
     print("SYNC COMPLETE")
     print("=" * 60)
@@ -1572,9 +1954,12 @@ async def main():
         print(f"  Updated:       {total_stats['updated']}")
         print(f"  Unchanged:     {total_stats['skipped']}")
         print(f"  Errors:        {total_stats['errors']}")
+    if args.check_deleted and not args.comments_only:
+        print(f"  Deleted:       {total_deleted}")
     if args.comments or args.comments_only:
         print("Comment sync completed (see per-channel stats above)")
     print("=" * 60)
+    METRICS.report()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,124 @@
+"""
+Near-duplicate headline clustering for the news ticker.
+
+Each title is reduced to a set of normalized word tokens and a MinHash
+signature. Signatures are split into bands and stored in an LSH bucket
+index, so finding candidate duplicates costs one dict probe per band
+regardless of how many headlines are in the window. Candidates are then
+confirmed with exact Jaccard similarity on the token sets.
+
+Every headline gets a cluster_id: the headline_id of the first headline
+seen in its cluster. The index covers a rolling window: it is rebuilt from
+the news_headlines rows of the last WINDOW_HOURS at the start of each run.
+"""
+
+import re
+import zlib
+import random
+
+from arabic import normalize
+
+# MinHash parameters: 16 bands x 2 rows. A pair with Jaccard 0.6 becomes a
+# candidate with probability ~99.9%; unrelated titles (J < 0.2) rarely do.
+NUM_PERM = 32
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+
+# Minimum exact Jaccard similarity to join an existing cluster
+SIMILARITY_THRESHOLD = 0.6
+
+# Titles with fewer tokens than this are too short to cluster reliably
+MIN_TOKENS = 3
+
+WINDOW_HOURS = 48
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed seed so signatures are identical across runs and processes
+_rng = random.Random(0x0B5E)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERM)
+]
+
+_TOKEN = re.compile(r'\w+')
+
+
+def title_tokens(title: str) -> frozenset:
+    """Normalize a title (arabic.normalize) into its set of word tokens."""
+    return frozenset(_TOKEN.findall(normalize(title)))
+
+
+def minhash_signature(tokens: frozenset) -> tuple:
+    """Compute the MinHash signature of a token set."""
+    hashes = [zlib.crc32(t.encode('utf-8')) for t in tokens]
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    """Exact Jaccard similarity between two token sets."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class HeadlineClusterIndex:
+    """LSH index of recent headlines, keyed by headline_id."""
+
+    def __init__(self):
+        # headline_id -> (tokens, cluster_id)
+        self._entries = {}
+        # (band_index, band_values) -> set of headline_ids
+        self._buckets = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _band_keys(self, signature: tuple) -> list:
+        return [
+            (band, signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND])
+            for band in range(BANDS)
+        ]
+
+    def find_cluster(self, tokens: frozenset, band_keys: list) -> str | None:
+        """Return the cluster_id of the most similar indexed headline, if any."""
+        candidates = set()
+        for key in band_keys:
+            bucket = self._buckets.get(key)
+            if bucket:
+                candidates.update(bucket)
+
+        best_id, best_score = None, SIMILARITY_THRESHOLD
+        for headline_id in candidates:
+            other_tokens, cluster_id = self._entries[headline_id]
+            score = jaccard(tokens, other_tokens)
+            if score >= best_score:
+                best_id, best_score = cluster_id, score
+        return best_id
+
+    def add(self, headline_id: str, title: str, cluster_id: str | None = None) -> str:
+        """
+        Index a headline and return its cluster_id.
+        If cluster_id is given (e.g. loaded from the database) it is kept,
+        otherwise the headline joins the closest cluster or starts its own.
+        """
+        if headline_id in self._entries:
+            return self._entries[headline_id][1]
+
+        tokens = title_tokens(title)
+        if len(tokens) < MIN_TOKENS:
+            # Too short to compare - index nothing, keep it as its own cluster
+            return cluster_id or headline_id
+
+        band_keys = self._band_keys(minhash_signature(tokens))
+        if cluster_id is None:
+            cluster_id = self.find_cluster(tokens, band_keys) or headline_id
+
+        self._entries[headline_id] = (tokens, cluster_id)
+        for key in band_keys:
+            self._buckets.setdefault(key, set()).add(headline_id)
+        return cluster_id
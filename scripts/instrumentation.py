@@ -0,0 +1,180 @@
+"""
+Stage timers and counters for the sync scripts.
+
+Each script keeps one Metrics instance and wraps its pipeline stages in
+`with metrics.stage('fetch'):` blocks and counts items with
+`metrics.count('articles_inserted')`. At the end of a run it reports:
+
+- A human-readable summary table (always printed)
+- JSON lines, one per finished stage plus a final summary line, when a
+  JSON lines path is configured ('-' for stdout)
+- A Prometheus textfile (for node_exporter's textfile collector) when a
+  path is configured; written atomically
+
+Outputs are configured with --metrics-jsonl / --metrics-prom (see
+add_metrics_arguments) or the METRICS_JSONL / METRICS_PROM env vars.
+Stage times are wall time, so async stages include time spent awaiting.
+"""
+
+import os
+import sys
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROMETHEUS_PREFIX = 'observer_sync'
+
+
+def add_metrics_arguments(parser):
+    """Add the --metrics-jsonl / --metrics-prom options to an argparse parser."""
+    parser.add_argument('--metrics-jsonl', metavar='PATH', default=os.getenv('METRICS_JSONL'),
+                        help="Append stage timings as JSON lines to PATH ('-' for stdout)")
+    parser.add_argument('--metrics-prom', metavar='PATH', default=os.getenv('METRICS_PROM'),
+                        help='Write a Prometheus textfile with the run metrics to PATH')
+
+
+class Metrics:
+    """Accumulates per-stage wall time and named counters for one job."""
+
+    def __init__(self, job: str):
+        self.job = job
+        self.jsonl_path = None
+        self.prom_path = None
+        self.reset()
+
+    def configure(self, jsonl: str | None = None, prometheus: str | None = None):
+        """Set the JSON lines and Prometheus outputs (None disables them)."""
+        self.jsonl_path = jsonl
+        self.prom_path = prometheus
+
+    def reset(self):
+        """Start a new run: clear all timings and counters."""
+        self.started = time.time()
+        # stage -> [calls, seconds]
+        self.stages = {}
+        self.counters = {}
+        self._events = []
+
+    # --- recording ---
+
+    @contextmanager
+    def stage(self, name: str):
+        """Add the wall time of the enclosed block to the named stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float):
+        """Add one call of measured time to the named stage (for time a block can't wrap)."""
+        entry = self.stages.setdefault(name, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+        if self.jsonl_path:
+            self._events.append({
+                'ts': datetime.now(timezone.utc).isoformat(),
+                'job': self.job,
+                'type': 'stage',
+                'stage': name,
+                'seconds': round(seconds, 6),
+            })
+
+    def count(self, name: str, value: int = 1):
+        """Increment a named counter."""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    # --- reporting ---
+
+    def summary(self) -> dict:
+        """Run summary as a JSON-serializable dict."""
+        return {
+            'ts': datetime.now(timezone.utc).isoformat(),
+            'job': self.job,
+            'type': 'summary',
+            'duration_seconds': round(time.time() - self.started, 3),
+            'stages': {
+                name: {'calls': calls, 'seconds': round(seconds, 6)}
+                for name, (calls, seconds) in self.stages.items()
+            },
+            'counters': dict(self.counters),
+        }
+
+    def print_summary(self):
+        """Print per-stage timings and counters collected during the run."""
+        total = sum(seconds for _, seconds in self.stages.values())
+        print("Stage timings:")
+        for name, (calls, seconds) in self.stages.items():
+            share = (seconds / total * 100) if total else 0
+            print(f"  {name:<16} {seconds * 1000:10.1f} ms  ({share:4.1f}%)  x{calls}")
+        if self.counters:
+            print("Counters:")
+            for name, value in self.counters.items():
+                print(f"  {name:<24} {value}")
+
+    def write_jsonl(self):
+        """Append the buffered stage events and the run summary as JSON lines."""
+        if not self.jsonl_path:
+            return
+        lines = [json.dumps(event, ensure_ascii=False) for event in self._events + [self.summary()]]
+        self._events = []
+        if self.jsonl_path == '-':
+            print('\n'.join(lines), flush=True)
+            return
+        try:
+            with open(self.jsonl_path, 'a', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+        except OSError as e:
+            print(f"  Warning: Could not write metrics to {self.jsonl_path}: {e}", file=sys.stderr)
+
+    def prometheus_text(self) -> str:
+        """Render the run metrics in the Prometheus text exposition format."""
+        job = self.job
+        p = PROMETHEUS_PREFIX
+        lines = [
+            f'# HELP {p}_stage_seconds Wall time spent in each stage during the last run.',
+            f'# TYPE {p}_stage_seconds gauge',
+        ]
+        lines += [f'{p}_stage_seconds{{job="{job}",stage="{name}"}} {seconds:.6f}'
+                  for name, (_, seconds) in self.stages.items()]
+        lines += [
+            f'# HELP {p}_stage_calls Times each stage ran during the last run.',
+            f'# TYPE {p}_stage_calls gauge',
+        ]
+        lines += [f'{p}_stage_calls{{job="{job}",stage="{name}"}} {calls}'
+                  for name, (calls, _) in self.stages.items()]
+        lines += [
+            f'# HELP {p}_items Items counted during the last run.',
+            f'# TYPE {p}_items gauge',
+        ]
+        lines += [f'{p}_items{{job="{job}",counter="{name}"}} {value}'
+                  for name, value in self.counters.items()]
+        lines += [
+            f'# HELP {p}_duration_seconds Wall time of the last run.',
+            f'# TYPE {p}_duration_seconds gauge',
+            f'{p}_duration_seconds{{job="{job}"}} {time.time() - self.started:.3f}',
+            f'# HELP {p}_last_run_timestamp_seconds When the last run finished.',
+            f'# TYPE {p}_last_run_timestamp_seconds gauge',
+            f'{p}_last_run_timestamp_seconds{{job="{job}"}} {time.time():.0f}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self):
+        """Write the Prometheus textfile atomically (temp file + rename)."""
+        if not self.prom_path:
+            return
+        path = Path(self.prom_path)
+        tmp = path.with_name(path.name + '.tmp')
+        try:
+            tmp.write_text(self.prometheus_text(), encoding='utf-8')
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"  Warning: Could not write metrics to {path}: {e}", file=sys.stderr)
+
+    def report(self):
+        """Print the summary and write the configured outputs."""
+        self.print_summary()
+        self.write_jsonl()
+        self.write_prometheus()
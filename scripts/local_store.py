@@ -0,0 +1,360 @@
+"""
+Local stand-in for the Supabase client, backed by SQLite.
+
+Implements the subset of the supabase-py / postgrest query builder used by
+the sync scripts (table, select, insert, upsert, update, delete, the common
+filters and array contains / overlaps, order, limit, range), so they can run offline for replays,
+profiling and benchmarks without a live database.
+
+Tables and columns are created on first use. Lists and dicts are stored
+as JSON and booleans as integers; both are converted back on read.
+
+Usage:
+    from local_store import LocalClient
+    supabase = LocalClient('headlines.db')   # or ':memory:'
+    supabase.table('news_headlines').select('*').eq('is_active', True).execute()
+"""
+
+import json
+import sqlite3
+from dataclasses import dataclass, field
+
+
+def like_to_glob(pattern: str) -> str:
+    """
+    Translate a LIKE pattern to SQLite GLOB: % -> *, _ -> ?, backslash
+    escapes a wildcard, and GLOB's own metacharacters match literally.
+    """
+    glob = []
+    chars = iter(pattern)
+    for char in chars:
+        if char == '\\':
+            char = next(chars, '\\')
+        elif char == '%':
+            glob.append('*')
+            continue
+        elif char == '_':
+            glob.append('?')
+            continue
+        glob.append(f'[{char}]' if char in '*?[' else char)
+    return ''.join(glob)
+
+
+@dataclass
+class LocalResponse:
+    """Mirrors the fields of postgrest's APIResponse that the scripts read."""
+    data: list = field(default_factory=list)
+    count: int | None = None
+
+
+class LocalQuery:
+    """A single query against one table, built up by chained calls."""
+
+    def __init__(self, client: 'LocalClient', table: str):
+        self._client = client
+        self._table = table
+        self._action = 'select'
+        self._columns = '*'
+        self._count = None
+        self._payload = None
+        self._on_conflict = None
+        self._filters = []
+        self._negate_next = False
+        self._order = []
+        self._limit = None
+        self._offset = None
+
+    # --- actions ---
+
+    def select(self, columns: str = '*', count: str | None = None) -> 'LocalQuery':
+        self._action = 'select'
+        self._columns = columns
+        self._count = count
+        return self
+
+    def insert(self, rows) -> 'LocalQuery':
+        self._action = 'insert'
+        self._payload = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def upsert(self, rows, on_conflict: str = 'id') -> 'LocalQuery':
+        self._action = 'upsert'
+        self._payload = rows if isinstance(rows, list) else [rows]
+        self._on_conflict = on_conflict
+        return self
+
+    def update(self, values: dict) -> 'LocalQuery':
+        self._action = 'update'
+        self._payload = values
+        return self
+
+    def delete(self) -> 'LocalQuery':
+        self._action = 'delete'
+        return self
+
+    # --- filters ---
+
+    @property
+    def not_(self) -> 'LocalQuery':
+        self._negate_next = True
+        return self
+
+    def _filter(self, column: str, op: str, value) -> 'LocalQuery':
+        self._filters.append((column, op, value, self._negate_next))
+        self._negate_next = False
+        return self
+
+    def eq(self, column: str, value) -> 'LocalQuery':
+        return self._filter(column, '=', value)
+
+    def neq(self, column: str, value) -> 'LocalQuery':
+        return self._filter(column, '!=', value)
+
+    def lt(self, column: str, value) -> 'LocalQuery':
+        return self._filter(column, '<', value)
+
+    def lte(self, column: str, value) -> 'LocalQuery':
+        return self._filter(column, '<=', value)
+
+    def gt(self, column: str, value) -> 'LocalQuery':
+        return self._filter(column, '>', value)
+
+    def gte(self, column: str, value) -> 'LocalQuery':
+        return self._filter(column, '>=', value)
+
+    def like(self, column: str, pattern: str) -> 'LocalQuery':
+        # Case-sensitive like Postgres LIKE; SQLite's LIKE is not
+        return self._filter(column, 'GLOB', like_to_glob(pattern))
+
+    def ilike(self, column: str, pattern: str) -> 'LocalQuery':
+        return self._filter(column, 'LIKE', pattern)
+
+    def is_(self, column: str, value) -> 'LocalQuery':
+        return self._filter(column, 'IS', None if value in (None, 'null') else value)
+
+    def in_(self, column: str, values) -> 'LocalQuery':
+        return self._filter(column, 'IN', list(values))
+
+    def contains(self, column: str, values) -> 'LocalQuery':
+        """Array column holding every one of values (PostgREST cs)."""
+        return self._filter(column, 'CONTAINS', list(values))
+
+    def overlaps(self, column: str, values) -> 'LocalQuery':
+        """Array column holding at least one of values (PostgREST ov)."""
+        return self._filter(column, 'OVERLAPS', list(values))
+
+    # --- modifiers ---
+
+    def order(self, column: str, desc: bool = False) -> 'LocalQuery':
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, count: int) -> 'LocalQuery':
+        self._limit = count
+        return self
+
+    def range(self, start: int, end: int) -> 'LocalQuery':
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    # --- execution ---
+
+    def _where(self) -> tuple[str, list]:
+        clauses, params = [], []
+        for column, op, value, negate in self._filters:
+            self._client.ensure_columns(self._table, [column])
+            col = f'"{column}"'
+            if op == 'IN':
+                if not value:
+                    clause = '0'
+                else:
+                    clause = f"{col} IN ({', '.join('?' * len(value))})"
+                    params.extend(self._client.encode(v) for v in value)
+            elif op == 'CONTAINS':
+                # Lists are stored as JSON arrays
+                clause = ' AND '.join(
+                    [f"EXISTS (SELECT 1 FROM json_each({col}) WHERE value = ?)"] * len(value)
+                ) or '1'
+                params.extend(value)
+            elif op == 'OVERLAPS':
+                if not value:
+                    clause = '0'
+                else:
+                    clause = f"EXISTS (SELECT 1 FROM json_each({col}) WHERE value IN ({', '.join('?' * len(value))}))"
+                    params.extend(value)
+            elif op == 'LIKE':
+                # Postgres escapes LIKE wildcards with a backslash by default
+                clause = f"{col} LIKE ? ESCAPE '\\'"
+                params.append(value)
+            elif op == 'IS':
+                clause = f"{col} IS ?"
+                params.append(self._client.encode(value))
+            else:
+                clause = f"{col} {op} ?"
+                params.append(self._client.encode(value))
+            clauses.append(f"NOT ({clause})" if negate else clause)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def execute(self) -> LocalResponse:
+        client = self._client
+        client.ensure_table(self._table)
+
+        if self._action in ('insert', 'upsert'):
+            return LocalResponse(data=client.write_rows(self._table, self._payload, self._on_conflict))
+
+        where, params = self._where()
+
+        if self._action == 'update':
+            client.ensure_columns(self._table, self._payload.keys())
+            assignments = ', '.join(f'"{c}" = ?' for c in self._payload)
+            values = [client.encode(v) for v in self._payload.values()]
+            rows = client.query(self._table, '*', where, params)
+            client.conn.execute(f'UPDATE "{self._table}" SET {assignments}{where}', values + params)
+            client.conn.commit()
+            for row in rows:
+                row.update(self._payload)
+            return LocalResponse(data=rows)
+
+        if self._action == 'delete':
+            rows = client.query(self._table, '*', where, params)
+            client.conn.execute(f'DELETE FROM "{self._table}"{where}', params)
+            client.conn.commit()
+            return LocalResponse(data=rows)
+
+        suffix = ''
+        if self._order:
+            client.ensure_columns(self._table, [c for c, _ in self._order])
+            suffix += ' ORDER BY ' + ', '.join(f'"{c}" {"DESC" if d else "ASC"}' for c, d in self._order)
+        if self._limit is not None:
+            suffix += f' LIMIT {int(self._limit)}'
+            if self._offset:
+                suffix += f' OFFSET {int(self._offset)}'
+
+        count = None
+        if self._count:
+            count = client.conn.execute(f'SELECT COUNT(*) FROM "{self._table}"{where}', params).fetchone()[0]
+
+        rows = client.query(self._table, self._columns, where + suffix, params)
+        return LocalResponse(data=rows, count=count)
+
+
+class LocalClient:
+    """SQLite-backed drop-in for supabase.Client table access."""
+
+    def __init__(self, path: str = ':memory:'):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS _columns (tbl TEXT, col TEXT, kind TEXT, PRIMARY KEY (tbl, col))'
+        )
+        self._kinds = {}
+        self._ready = set()
+        for row in self.conn.execute('SELECT tbl, col, kind FROM _columns'):
+            self._kinds.setdefault(row['tbl'], {})[row['col']] = row['kind']
+
+    def table(self, name: str) -> LocalQuery:
+        return LocalQuery(self, name)
+
+    def close(self):
+        self.conn.close()
+
+    # --- schema ---
+
+    def ensure_table(self, table: str):
+        if table in self._ready:
+            return
+        self.conn.execute(f'CREATE TABLE IF NOT EXISTS "{table}" (id INTEGER PRIMARY KEY AUTOINCREMENT)')
+        kinds = self._kinds.setdefault(table, {})
+        for row in self.conn.execute(f'PRAGMA table_info("{table}")'):
+            kinds.setdefault(row['name'], 'unknown')
+        self._ready.add(table)
+
+    def ensure_columns(self, table: str, columns, sample: dict | None = None):
+        """
+        Add missing columns. A column first seen in a filter or select has an
+        'unknown' kind until a write provides a sample value to classify it.
+        """
+        self.ensure_table(table)
+        kinds = self._kinds[table]
+        for column in columns:
+            current = kinds.get(column)
+            if current is not None and current != 'unknown':
+                continue
+            value = (sample or {}).get(column)
+            if value is None:
+                kind = 'unknown'
+            elif isinstance(value, (list, dict)):
+                kind = 'json'
+            elif isinstance(value, bool):
+                kind = 'bool'
+            else:
+                kind = 'scalar'
+            if current is None:
+                self.conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{column}"')
+            elif kind == 'unknown':
+                continue
+            self.conn.execute('INSERT OR REPLACE INTO _columns VALUES (?, ?, ?)', (table, column, kind))
+            kinds[column] = kind
+
+    def _ensure_unique(self, table: str, column: str):
+        self.conn.execute(
+            f'CREATE UNIQUE INDEX IF NOT EXISTS "uq_{table}_{column}" ON "{table}"("{column}")'
+        )
+
+    # --- value encoding ---
+
+    @staticmethod
+    def encode(value):
+        if isinstance(value, bool):
+            return int(value)
+        if isinstance(value, (list, dict)):
+            return json.dumps(value, ensure_ascii=False)
+        return value
+
+    def _decode_row(self, table: str, row: sqlite3.Row) -> dict:
+        kinds = self._kinds[table]
+        out = {}
+        for key in row.keys():
+            value = row[key]
+            kind = kinds.get(key)
+            if value is not None and kind == 'json':
+                value = json.loads(value)
+            elif value is not None and kind == 'bool':
+                value = bool(value)
+            out[key] = value
+        return out
+
+    # --- reads and writes ---
+
+    def query(self, table: str, columns: str, where_suffix: str, params: list) -> list[dict]:
+        if columns.strip() == '*':
+            select = '*'
+        else:
+            names = [c.strip() for c in columns.split(',') if c.strip()]
+            self.ensure_columns(table, names)
+            select = ', '.join(f'"{c}"' for c in names)
+        cursor = self.conn.execute(f'SELECT {select} FROM "{table}"{where_suffix}', params)
+        return [self._decode_row(table, row) for row in cursor]
+
+    def write_rows(self, table: str, rows: list[dict], on_conflict: str | None) -> list[dict]:
+        if not rows:
+            return []
+        columns = list(dict.fromkeys(c for row in rows for c in row))
+        merged_sample = {}
+        for row in rows:
+            merged_sample.update({k: v for k, v in row.items() if v is not None})
+        self.ensure_columns(table, columns, merged_sample)
+
+        col_sql = ', '.join(f'"{c}"' for c in columns)
+        placeholders = ', '.join('?' * len(columns))
+        sql = f'INSERT INTO "{table}" ({col_sql}) VALUES ({placeholders})'
+        if on_conflict:
+            self._ensure_unique(table, on_conflict)
+            updates = ', '.join(f'"{c}" = excluded."{c}"' for c in columns if c != on_conflict)
+            sql += f' ON CONFLICT("{on_conflict}") DO ' + (f'UPDATE SET {updates}' if updates else 'NOTHING')
+
+        self.conn.executemany(sql, [[self.encode(row.get(c)) for c in columns] for row in rows])
+        self.conn.commit()
+        return rows
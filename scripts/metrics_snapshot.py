@@ -0,0 +1,307 @@
+"""
+Dashboard metrics snapshot, maintained incrementally by the Telegram sync.
+
+The dashboard (/api/metrics) reads the latest `metrics` row with
+metric_type 'full_snapshot': country/organization/category counts, a daily
+trend, sentiment percentages and trending topics (hourly mention counts
+ranked by burst score, see trending.py). Rather than rescanning
+the articles table, the sync records each article it inserts, updates or
+deletes (SnapshotEngine.record), and publish() applies those deltas to
+running aggregates kept in a 'snapshot_state' row of the same table, then
+writes a fresh snapshot from them - O(changed articles) per run.
+
+The aggregates are rebuilt from one paginated scan of the articles table
+when there is no state row yet, when the stored article count no longer
+matches the table (articles written outside the sync, e.g. from the
+admin), when a delta could not be recorded exactly (invalidate()), when
+the state is older than REBUILD_AFTER, or on request.
+
+Usage from a sync script:
+
+    SNAPSHOT = SnapshotEngine()
+    SNAPSHOT.record(old_row, new_row)   # old_row None = insert, new_row None = delete
+    SNAPSHOT.publish(supabase)
+"""
+
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+
+from sentiment import score_label
+from trending import HOUR_FORMAT, TRENDING_DAYS, hour_key, trending_topics, window_start
+
+SNAPSHOT_TYPE = 'full_snapshot'
+STATE_TYPE = 'snapshot_state'
+STATE_VERSION = 2
+
+# Days in the dashboard's daily trend
+TREND_DAYS = 30
+# Rebuild from a full scan at least this often, to pick up edits made outside the sync
+REBUILD_AFTER = timedelta(days=1)
+# Older snapshots are deleted when a new one is written
+SNAPSHOT_RETENTION = timedelta(days=7)
+
+SCAN_BATCH_SIZE = 1000
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def article_day(row: dict) -> str | None:
+    """UTC date (YYYY-MM-DD) of an article's telegram_date."""
+    value = row.get('telegram_date')
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).astimezone(timezone.utc).date().isoformat()
+    except ValueError:
+        return str(value)[:10]
+
+
+def sentiment_label(row: dict) -> str:
+    """Sentiment bucket of an article's stored score (neutral if unscored)."""
+    return score_label(row.get('sentiment_score'))
+
+
+def article_topics(row: dict) -> set[str]:
+    """Trending topics an article mentions."""
+    return set(row.get('countries') or []) | set(row.get('organizations') or [])
+
+
+class SnapshotAggregates:
+    """Running counts the snapshot is computed from."""
+
+    def __init__(self):
+        self.total = 0
+        self.countries = Counter()
+        self.organizations = Counter()
+        self.categories = Counter()
+        self.sentiment = Counter()
+        # day -> articles published that day
+        self.daily = Counter()
+        # hour (trending.hour_key) -> topic -> mentions, only for the last TRENDING_DAYS
+        self.topics = {}
+
+    def apply(self, row: dict, sign: int, today: date):
+        """Add (sign=1) or remove (sign=-1) one article."""
+        self.total += sign
+        self.countries.update({c: sign for c in set(row.get('countries') or [])})
+        self.organizations.update({o: sign for o in set(row.get('organizations') or [])})
+        self.categories[row.get('category') or 'Analysis'] += sign
+        self.sentiment[sentiment_label(row)] += sign
+        day = article_day(row)
+        if day:
+            self.daily[day] += sign
+        hour = hour_key(row.get('telegram_date'))
+        if hour and hour >= window_start(today):
+            self.topics.setdefault(hour, Counter()).update({t: sign for t in article_topics(row)})
+
+    def merge(self, other: 'SnapshotAggregates'):
+        """Add another set of (signed) aggregates, e.g. a run's deltas."""
+        self.total += other.total
+        for name in ('countries', 'organizations', 'categories', 'sentiment', 'daily'):
+            getattr(self, name).update(getattr(other, name))
+        for day, counts in other.topics.items():
+            self.topics.setdefault(day, Counter()).update(counts)
+
+    def prune(self, today: date):
+        """Drop zero counts and topic hours outside the trending window."""
+        for name in ('countries', 'organizations', 'categories', 'sentiment', 'daily'):
+            counter = getattr(self, name)
+            for key in [k for k, v in counter.items() if v == 0]:
+                del counter[key]
+        cutoff = window_start(today)
+        topics = {}
+        for hour, counts in self.topics.items():
+            counts = Counter({t: n for t, n in counts.items() if n})
+            if hour >= cutoff and counts:
+                topics[hour] = counts
+        self.topics = topics
+
+    # --- persistence ---
+
+    def to_state(self) -> dict:
+        return {
+            'version': STATE_VERSION,
+            'total': self.total,
+            'countries': dict(self.countries),
+            'organizations': dict(self.organizations),
+            'categories': dict(self.categories),
+            'sentiment': dict(self.sentiment),
+            'daily': dict(self.daily),
+            'topics': {day: dict(counts) for day, counts in self.topics.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'SnapshotAggregates':
+        aggregates = cls()
+        aggregates.total = state.get('total', 0)
+        for name in ('countries', 'organizations', 'categories', 'sentiment', 'daily'):
+            setattr(aggregates, name, Counter(state.get(name) or {}))
+        aggregates.topics = {day: Counter(counts) for day, counts in (state.get('topics') or {}).items()}
+        return aggregates
+
+    @classmethod
+    def from_index(cls, index, today: date) -> 'SnapshotAggregates':
+        """Aggregates of a whole article_index.ArticleIndex, from vectorized passes."""
+        aggregates = cls()
+        aggregates.total = len(index)
+        aggregates.countries = Counter(index.value_counts('countries'))
+        aggregates.organizations = Counter(index.value_counts('organizations'))
+        aggregates.categories = Counter(index.value_counts('category'))
+        aggregates.sentiment = Counter(index.value_counts('sentiment'))
+        days, counts = index.daily_counts()
+        aggregates.daily = Counter({
+            date.fromordinal(EPOCH_ORDINAL + int(day)).isoformat(): int(count)
+            for day, count in zip(days, counts) if count
+        })
+        since = ((today - timedelta(days=TRENDING_DAYS - 1)).toordinal() - EPOCH_ORDINAL) * 24
+        aggregates.topics = {
+            datetime.fromtimestamp(hour * 3600, timezone.utc).strftime(HOUR_FORMAT): Counter(topics)
+            for hour, topics in index.topic_counts(bucket_seconds=3600, since_bucket=since).items()
+        }
+        return aggregates
+
+    # --- dashboard snapshot ---
+
+    def snapshot(self, now: datetime) -> dict:
+        """The full_snapshot document read by the dashboard."""
+        today = now.date()
+
+        def ranked(counter: Counter) -> dict:
+            # Highest count first, ties by name so rebuilds and deltas agree
+            return dict(sorted(((k, v) for k, v in counter.items() if v > 0), key=lambda kv: (-kv[1], kv[0])))
+
+        trend = [
+            {'date': day, 'count': self.daily.get(day, 0)}
+            for day in ((today - timedelta(days=i)).isoformat() for i in range(TREND_DAYS - 1, -1, -1))
+        ]
+        week_start = (today - timedelta(days=6)).isoformat()
+        scored = sum(self.sentiment.values())
+        percentages = {
+            label: round(self.sentiment.get(label, 0) / scored * 100, 1) if scored else 0
+            for label in ('negative', 'neutral', 'positive')
+        }
+
+        return {
+            'computed_at': now.isoformat(),
+            'total_articles': self.total,
+            'countries': ranked(self.countries),
+            'organizations': ranked(self.organizations),
+            'categories': ranked(self.categories),
+            'temporal': {
+                'articles_today': self.daily.get(today.isoformat(), 0),
+                'articles_this_week': sum(n for day, n in self.daily.items() if week_start <= day <= today.isoformat()),
+                'daily_trend': trend,
+            },
+            'sentiment': {
+                'counts': {label: self.sentiment.get(label, 0) for label in percentages},
+                'percentages': percentages,
+            },
+            'trending': trending_topics(self.topics, now),
+        }
+
+
+class SnapshotEngine:
+    """Collects article deltas during a run and publishes the snapshot."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Forget the deltas recorded so far."""
+        self.deltas = SnapshotAggregates()
+        self.changes = 0
+        self.invalid_reason = None
+
+    def record(self, old: dict | None, new: dict | None):
+        """Record an insert (old=None), update or delete (new=None) of one article."""
+        today = datetime.now(timezone.utc).date()
+        if old is not None:
+            self.deltas.apply(old, -1, today)
+        if new is not None:
+            self.deltas.apply(new, 1, today)
+        self.changes += 1
+
+    def invalidate(self, reason: str):
+        """Deltas are incomplete; the next publish rebuilds from the table."""
+        self.invalid_reason = self.invalid_reason or reason
+
+    # --- database ---
+
+    def load_state(self, supabase) -> tuple[int | None, dict | None]:
+        """(row id, state) of the stored aggregates, or (None, None)."""
+        result = supabase.table('metrics').select('id, data').eq(
+            'metric_type', STATE_TYPE
+        ).order('computed_at', desc=True).limit(1).execute()
+        if not result.data:
+            return None, None
+        return result.data[0]['id'], result.data[0]['data']
+
+    def count_articles(self, supabase) -> int:
+        result = supabase.table('articles').select('id', count='exact').limit(1).execute()
+        return result.count or 0
+
+    def scan_articles(self, supabase, today: date) -> SnapshotAggregates:
+        """Aggregate the whole articles table via a columnar ArticleIndex."""
+        # NumPy is only needed for rebuilds
+        from article_index import ArticleIndex
+        index = ArticleIndex.from_supabase(supabase, SCAN_BATCH_SIZE)
+        return SnapshotAggregates.from_index(index, today)
+
+    def rebuild_reason(self, state: dict | None, article_count: int, now: datetime, force: bool) -> str | None:
+        if force:
+            return 'requested'
+        if state is None or state.get('version') != STATE_VERSION:
+            return 'no stored aggregates'
+        if self.invalid_reason:
+            return self.invalid_reason
+        rebuilt_at = state.get('rebuilt_at')
+        if not rebuilt_at or now - datetime.fromisoformat(rebuilt_at) > REBUILD_AFTER:
+            return 'periodic rebuild'
+        if state.get('total', 0) + self.deltas.total != article_count:
+            return 'article count changed outside the sync'
+        return None
+
+    def publish(self, supabase, rebuild: bool = False) -> dict | None:
+        """
+        Apply the recorded deltas (or rebuild) and write the state and a
+        fresh snapshot. Returns the snapshot, or None if it failed.
+        """
+        now = datetime.now(timezone.utc)
+        today = now.date()
+        try:
+            state_id, state = self.load_state(supabase)
+            article_count = self.count_articles(supabase)
+            reason = self.rebuild_reason(state, article_count, now, rebuild)
+
+            if reason:
+                print(f"  Rebuilding metrics aggregates ({reason})...")
+                aggregates = self.scan_articles(supabase, today)
+                rebuilt_at = now.isoformat()
+            else:
+                aggregates = SnapshotAggregates.from_state(state)
+                aggregates.merge(self.deltas)
+                rebuilt_at = state['rebuilt_at']
+            aggregates.prune(today)
+
+            state_data = {**aggregates.to_state(), 'rebuilt_at': rebuilt_at, 'updated_at': now.isoformat()}
+            state_row = {'metric_type': STATE_TYPE, 'data': state_data, 'computed_at': now.isoformat()}
+            if state_id is None:
+                supabase.table('metrics').insert(state_row).execute()
+            else:
+                supabase.table('metrics').update(state_row).eq('id', state_id).execute()
+
+            snapshot = aggregates.snapshot(now)
+            supabase.table('metrics').insert({
+                'metric_type': SNAPSHOT_TYPE, 'data': snapshot, 'computed_at': now.isoformat(),
+            }).execute()
+            supabase.table('metrics').delete().eq('metric_type', SNAPSHOT_TYPE).lt(
+                'computed_at', (now - SNAPSHOT_RETENTION).isoformat()
+            ).execute()
+        except Exception as e:
+            print(f"  Warning: Could not publish metrics snapshot: {e}")
+            return None
+
+        applied = 'full rebuild' if reason else f"{self.changes} changes applied"
+        print(f"  Metrics snapshot: {snapshot['total_articles']} articles ({applied})")
+        self.reset()
+        return snapshot
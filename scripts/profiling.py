@@ -0,0 +1,294 @@
+"""
+Built-in profiling for the sync scripts (--profile).
+
+Three modes, selected with --profile MODE:
+
+- cprofile: deterministic profile with cProfile; writes a .pstats file
+  (open with `python -m pstats` or snakeviz) and prints the top-N
+  functions by cumulative time.
+- sample: pure-Python stack sampler. A background thread snapshots the
+  profiled thread's stack every --profile-interval ms and writes the
+  samples in collapsed-stack format (one `frame;frame;frame count` line
+  per unique stack), ready for flamegraph.pl or speedscope. Low overhead,
+  so it is safe to use on real CI runs.
+- async: splits wall time into time the asyncio event loop sat idle
+  waiting for network I/O and time spent running code, and reports the
+  time spent in the script's network/DB functions and in its parser
+  functions (wrapped for the duration of the run).
+
+Usage from a script:
+
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    with profile_run(args, 'telegram', globals(), cpu_functions=..., io_functions=...):
+        ...
+"""
+
+import sys
+import time
+import inspect
+import threading
+import functools
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+PROFILE_MODES = ('cprofile', 'sample', 'async')
+
+DEFAULT_TOP = 25
+DEFAULT_INTERVAL_MS = 5
+
+
+def add_profile_arguments(parser):
+    """Add the --profile options to an argparse parser."""
+    parser.add_argument('--profile', choices=PROFILE_MODES,
+                        help='Profile the run: cprofile (pstats), sample (collapsed stacks) or async (I/O wait vs CPU)')
+    parser.add_argument('--profile-out', metavar='PATH',
+                        help='Where to write the profile (default: <job>.pstats or <job>.collapsed)')
+    parser.add_argument('--profile-top', type=int, default=DEFAULT_TOP, metavar='N',
+                        help=f'Hot functions to print (default: {DEFAULT_TOP})')
+    parser.add_argument('--profile-interval', type=float, default=DEFAULT_INTERVAL_MS, metavar='MS',
+                        help=f'Sampling interval for --profile sample (default: {DEFAULT_INTERVAL_MS} ms)')
+
+
+# =============================================================================
+# STACK SAMPLER
+# =============================================================================
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Samples one thread's Python stack at a fixed interval from a background thread."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def write_collapsed(self, path: Path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def print_top(self, top: int):
+        total = sum(self.stacks.values())
+        if not total:
+            print("  No samples collected")
+            return
+        own, inclusive = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')
+            own[frames[-1]] += count
+            for label in set(frames):
+                inclusive[label] += count
+
+        print(f"  {total} samples every {self.interval * 1000:.0f} ms")
+        print(f"  {'self %':>7} {'total %':>8}  function")
+        for label, count in own.most_common(top):
+            print(f"  {count / total * 100:6.1f}% {inclusive[label] / total * 100:7.1f}%  {label}")
+
+
+# =============================================================================
+# ASYNC PROFILER
+# =============================================================================
+
+class AsyncProfiler:
+    """
+    Measures event loop idle time (blocked in the selector waiting for
+    network I/O) and wall time inside the given I/O and parser functions.
+    Functions are looked up and replaced in namespace, so calls made
+    through module globals are timed.
+    """
+
+    def __init__(self, namespace: dict, cpu_functions=(), io_functions=()):
+        self.namespace = namespace
+        self.groups = {'network/DB': list(io_functions), 'parsers (CPU)': list(cpu_functions)}
+        # function name -> [calls, seconds]
+        self.timings = {}
+        self.idle = 0.0
+        self._originals = {}
+        self._selector = None
+        self._select = None
+
+    def _wrap(self, name: str, func):
+        entry = self.timings.setdefault(name, [0, 0.0])
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def timed_async(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    entry[0] += 1
+                    entry[1] += time.perf_counter() - start
+            return timed_async
+
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            async def timed_async_gen(*args, **kwargs):
+                # Time spent producing items (including what the generator
+                # awaits), not the consumer's work between them
+                entry[0] += 1
+                items = func(*args, **kwargs)
+                try:
+                    while True:
+                        start = time.perf_counter()
+                        try:
+                            item = await items.__anext__()
+                        except StopAsyncIteration:
+                            return
+                        finally:
+                            entry[1] += time.perf_counter() - start
+                        yield item
+                finally:
+                    await items.aclose()
+            return timed_async_gen
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                entry[0] += 1
+                entry[1] += time.perf_counter() - start
+        return timed
+
+    def start(self, loop=None):
+        for names in self.groups.values():
+            for name in names:
+                func = self.namespace.get(name)
+                if callable(func):
+                    self._originals[name] = func
+                    self.namespace[name] = self._wrap(name, func)
+
+        # Selector loops (Linux/macOS) block in selector.select() while idle;
+        # the proactor loop (Windows) blocks in proactor.select()
+        selector = getattr(loop, '_selector', None) or getattr(loop, '_proactor', None)
+        if selector is not None and hasattr(selector, 'select'):
+            self._selector = selector
+            self._select = selector.select
+
+            def select(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return self._select(*args, **kwargs)
+                finally:
+                    self.idle += time.perf_counter() - start
+
+            selector.select = select
+
+    def stop(self):
+        self.namespace.update(self._originals)
+        self._originals = {}
+        if self._selector is not None:
+            # Drop the instance attribute so the class method is used again
+            del self._selector.select
+            self._selector = None
+
+    def print_report(self, wall: float, top: int):
+        print(f"  Wall time: {wall:.2f}s")
+        if self._select is not None:
+            busy = max(wall - self.idle, 0.0)
+            print(f"  Event loop idle (awaiting network): {self.idle:8.2f}s  ({self.idle / wall * 100 if wall else 0:4.1f}%)")
+            print(f"  Event loop busy (running code):     {busy:8.2f}s  ({busy / wall * 100 if wall else 0:4.1f}%)")
+        else:
+            print("  No running event loop - idle time not measured")
+        print("  Time inside functions (inclusive; nested calls are counted in both):")
+        for group, names in self.groups.items():
+            rows = sorted(
+                ((name, *self.timings[name]) for name in names if self.timings.get(name, [0])[0]),
+                key=lambda row: row[2], reverse=True,
+            )[:top]
+            print(f"    {group}:")
+            for name, calls, seconds in rows:
+                print(f"      {name:<32} {seconds:8.3f}s  x{calls}")
+
+
+# =============================================================================
+# ENTRY POINT
+# =============================================================================
+
+@contextmanager
+def profile_run(args, job: str, namespace: dict, cpu_functions=(), io_functions=()):
+    """
+    Profile the enclosed block according to args.profile (no-op if unset).
+    namespace is the calling module's globals(), used by the async mode.
+    """
+    mode = getattr(args, 'profile', None)
+    if not mode:
+        yield
+        return
+
+    top = args.profile_top
+    start = time.perf_counter()
+
+    if mode == 'cprofile':
+        import cProfile
+        import pstats
+        out = Path(args.profile_out or f"{job}.pstats")
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(out)
+            print("\n" + "=" * 60)
+            print(f"PROFILE (cProfile) - written to {out}")
+            print("=" * 60)
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(top)
+
+    elif mode == 'sample':
+        out = Path(args.profile_out or f"{job}.collapsed")
+        sampler = StackSampler(threading.get_ident(), args.profile_interval / 1000)
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            sampler.write_collapsed(out)
+            print("\n" + "=" * 60)
+            print(f"PROFILE (sampled) - collapsed stacks written to {out}")
+            print("=" * 60)
+            sampler.print_top(top)
+
+    else:
+        import asyncio
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        profiler = AsyncProfiler(namespace, cpu_functions, io_functions)
+        profiler.start(loop)
+        try:
+            yield
+        finally:
+            profiler.stop()
+            print("\n" + "=" * 60)
+            print("PROFILE (async: network wait vs CPU)")
+            print("=" * 60)
+            profiler.print_report(time.perf_counter() - start, top)
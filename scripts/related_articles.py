@@ -0,0 +1,507 @@
+"""
+Related-articles precomputation, run after each Telegram sync.
+
+Every published article gets up to RELATED_LIMIT related articles from the
+same channel, stored in the related_articles table (one row per article:
+related_ids / scores, best first), so article pages read a precomputed
+list instead of computing it per request.
+
+Similarity is weighted Jaccard over an article's features - its countries,
+organizations and category:
+
+    score(a, b) = sum(w(f) for f in a & b) / sum(w(f) for f in a | b)
+
+with w(f) = FEATURE_WEIGHTS[kind] * log(1 + articles / articles with f),
+so a shared rare organization counts for more than a shared "Israel".
+Candidates come from an inverted index of countries and organizations:
+only articles sharing at least one entity are scored, rarest entity
+first, at most MAX_CANDIDATES per article.
+
+Each row stores a signature of the entities it was computed from. A run
+recomputes only:
+- articles that are new or whose signature changed (entities edited),
+- articles whose stored list holds one of those, or a deleted article,
+- articles for which a changed article now scores at least their weakest
+  related article.
+
+A run reads only what it needs: the articles updated since the watermark
+saved by the last run (articles.updated_at), the stored lists holding
+them (an overlaps query on related_ids), and the candidates of the
+articles to recompute, fetched per entity through the GIN indexes on
+countries / organizations. The entity frequencies behind the weights are
+saved with the watermark in a 'related_state' row of the metrics table
+and follow new and unpublished articles. Every article is loaded instead
+when there is no saved state, at least every FULL_LOAD_AFTER (refreshing
+the frequencies), and when the published count no longer adds up
+(deleted articles).
+
+Lists that no run touches keep the entity weights they were computed
+with, which drift slowly as the archive grows; --rebuild recomputes every
+list (also needed after changing the weights).
+
+Usage:
+    python related_articles.py
+    python related_articles.py --rebuild
+    python related_articles.py --dry-run
+"""
+
+import os
+import sys
+import math
+import hashlib
+import argparse
+from datetime import datetime, timedelta, timezone
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SUPABASE_URL = os.getenv('SUPABASE_URL', 'https://gbqvivmfivsuvvdkoiuc.supabase.co')
+SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_KEY')
+
+RELATED_LIMIT = 6
+# Weaker matches are not worth showing
+MIN_SCORE = 0.1
+# Candidates scored per article (the most recent articles of common entities)
+MAX_CANDIDATES = 500
+
+FEATURE_WEIGHTS = {'organizations': 1.5, 'countries': 1.0, 'category': 0.5}
+ENTITY_KINDS = ('countries', 'organizations')
+
+ARTICLE_COLUMNS = 'id, channel, category, countries, organizations, telegram_date'
+RELATED_COLUMNS = 'article_id, related_ids, scores, signature'
+BATCH_SIZE = 1000
+WRITE_BATCH_SIZE = 500
+# Ids per in / overlaps filter (bounds the request URL)
+IN_BATCH_SIZE = 200
+
+# Saved in the metrics table: watermark and entity frequencies of incremental runs
+STATE_TYPE = 'related_state'
+STATE_VERSION = 1
+# Load every article at least this often, to refresh the weights and catch deletions
+FULL_LOAD_AFTER = timedelta(days=1)
+
+
+def article_features(row: dict) -> frozenset:
+    """(kind, value) features of an article."""
+    features = {('category', row.get('category') or 'Analysis')}
+    for kind in ENTITY_KINDS:
+        features.update((kind, value) for value in row.get(kind) or [])
+    return frozenset(features)
+
+
+def article_signature(row: dict) -> str:
+    """Hash of the fields the related list depends on."""
+    parts = [row.get('channel') or '', row.get('category') or 'Analysis']
+    parts += [','.join(sorted(set(row.get(kind) or []))) for kind in ENTITY_KINDS]
+    return hashlib.md5('|'.join(parts).encode()).hexdigest()[:16]
+
+
+def article_timestamp(row: dict) -> float:
+    value = row.get('telegram_date')
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp() if value else 0.0
+    except ValueError:
+        return 0.0
+
+
+class RelatedIndex:
+    """
+    Feature sets, weights and the entity inverted index of a set of articles.
+
+    from_rows indexes every published article: document frequencies and
+    posting lists cover the whole set. An incremental run starts from the
+    frequencies saved by the last full run instead, adds the articles it
+    loads (add_rows) and fills postings with lists fetched from the
+    database (fetch_postings).
+    """
+
+    def __init__(self, sizes: dict, frequencies: dict):
+        self.channel = {}
+        self.features = {}
+        self.timestamp = {}
+        self.signature = {}
+        # channel -> articles; (channel, feature) -> articles with the feature
+        self.sizes = sizes
+        self.frequencies = frequencies
+        # (channel, feature) -> article ids, newest first
+        self.postings = {}
+        self._weights = {}
+        self._total_weight = {}
+
+    @classmethod
+    def from_rows(cls, rows: list[dict]) -> 'RelatedIndex':
+        index = cls({}, {})
+        # Newest first, so capped posting lists keep the most recent articles
+        rows = sorted(rows, key=lambda r: (-article_timestamp(r), r['id']))
+        index.add_rows(rows)
+        for row in rows:
+            article_id = row['id']
+            channel = index.channel[article_id]
+            index.sizes[channel] = index.sizes.get(channel, 0) + 1
+            for feature in index.features[article_id]:
+                index.postings.setdefault((channel, feature), []).append(article_id)
+        index.frequencies = {key: len(ids) for key, ids in index.postings.items()}
+        return index
+
+    def add_rows(self, rows: list[dict]):
+        for row in rows:
+            article_id = row['id']
+            self.channel[article_id] = row.get('channel') or ''
+            self.features[article_id] = article_features(row)
+            self.timestamp[article_id] = article_timestamp(row)
+            self.signature[article_id] = article_signature(row)
+            self._total_weight.pop(article_id, None)
+
+    def __contains__(self, article_id) -> bool:
+        return article_id in self.features
+
+    def __iter__(self):
+        return iter(self.features)
+
+    def weight(self, channel: str, feature: tuple) -> float:
+        key = (channel, feature)
+        if key not in self._weights:
+            self._weights[key] = FEATURE_WEIGHTS[feature[0]] * math.log(
+                1 + self.sizes.get(channel, 0) / max(self.frequencies.get(key, 0), 1)
+            )
+        return self._weights[key]
+
+    def total_weight(self, article_id) -> float:
+        if article_id not in self._total_weight:
+            channel = self.channel[article_id]
+            self._total_weight[article_id] = sum(self.weight(channel, f) for f in self.features[article_id])
+        return self._total_weight[article_id]
+
+    def entity_keys(self, article_id) -> list:
+        """(channel, feature) posting keys of an article's entities, rarest first."""
+        channel = self.channel[article_id]
+        return sorted(
+            ((channel, f) for f in self.features[article_id] if f[0] in ENTITY_KINDS),
+            key=lambda key: self.frequencies.get(key, 0),
+        )
+
+    def candidates(self, article_id) -> set:
+        """Same-channel articles sharing an entity, rarest entity first."""
+        found = set()
+        for key in self.entity_keys(article_id):
+            for other in self.postings.get(key, ()):
+                if len(found) >= MAX_CANDIDATES:
+                    break
+                found.add(other)
+        found.discard(article_id)
+        return found
+
+    def score(self, a, b) -> float:
+        """Weighted Jaccard similarity of two articles of the same channel."""
+        channel = self.channel[a]
+        shared = sum(self.weight(channel, f) for f in self.features[a] & self.features[b])
+        union = self.total_weight(a) + self.total_weight(b) - shared
+        return shared / union if union else 0.0
+
+    def related(self, article_id) -> list[tuple[int, float]]:
+        """Top RELATED_LIMIT (id, score), best first; ties go to the article closest in time."""
+        when = self.timestamp[article_id]
+        scored = [(other, self.score(article_id, other)) for other in self.candidates(article_id)]
+        scored = [(other, score) for other, score in scored if score >= MIN_SCORE]
+        scored.sort(key=lambda item: (-item[1], abs(self.timestamp[item[0]] - when), item[0]))
+        return [(other, round(score, 4)) for other, score in scored[:RELATED_LIMIT]]
+
+
+def load_rows(
+    supabase, table: str, columns: str, key: str, published_only: bool = False, since: str | None = None,
+    updated_since: str | None = None,
+) -> list[dict]:
+    """
+    All rows of a table (published articles only / articles posted since
+    an ISO timestamp / updated since one, if given), read in key order with
+    keyset pagination. Ends on an empty page: the server may cap pages
+    below BATCH_SIZE.
+    """
+    rows = []
+    last = 0
+    while True:
+        query = supabase.table(table).select(columns).gt(key, last)
+        if published_only:
+            query = query.eq('status', 'published')
+        if since:
+            query = query.gte('telegram_date', since)
+        if updated_since:
+            query = query.gte('updated_at', updated_since)
+        result = query.order(key).limit(BATCH_SIZE).execute()
+        if not result.data:
+            return rows
+        rows.extend(result.data)
+        last = result.data[-1][key]
+
+
+def load_by_ids(supabase, table: str, columns: str, key: str, ids, published_only: bool = False) -> list[dict]:
+    """Rows whose key is one of ids, IN_BATCH_SIZE ids per request."""
+    ids = sorted(ids)
+    rows = []
+    for i in range(0, len(ids), IN_BATCH_SIZE):
+        query = supabase.table(table).select(columns).in_(key, ids[i:i + IN_BATCH_SIZE])
+        if published_only:
+            query = query.eq('status', 'published')
+        rows.extend(query.execute().data)
+    return rows
+
+
+def fetch_postings(supabase, index: RelatedIndex, article_ids):
+    """
+    Fetch the posting lists of the articles' entities the index lacks: the
+    MAX_CANDIDATES newest published articles of the channel with the
+    entity, through the GIN indexes on countries / organizations.
+    """
+    keys = {key for article_id in article_ids for key in index.entity_keys(article_id)}
+    for key in keys - set(index.postings):
+        channel, (kind, value) = key
+        rows = supabase.table('articles').select(ARTICLE_COLUMNS).eq('status', 'published').eq(
+            'channel', channel
+        ).contains(kind, [value]).order('telegram_date', desc=True).order('id').limit(MAX_CANDIDATES).execute().data
+        index.add_rows(rows)
+        index.postings[key] = [row['id'] for row in rows]
+
+
+def entering_lists(index: RelatedIndex, stored: dict, changed: set, affected: set) -> set:
+    """Stored lists a changed article now scores at least the weakest entry of (or fills)."""
+    found = set()
+    for article_id in changed:
+        for other in index.candidates(article_id):
+            if other in affected or other in found:
+                continue
+            row = stored.get(other)
+            if row is None:
+                continue
+            score = index.score(other, article_id)
+            # A tie with the weakest entry can still win on time proximity
+            if score >= MIN_SCORE and (len(row['related_ids']) < RELATED_LIMIT or round(score, 4) >= min(row['scores'])):
+                found.add(other)
+    return found
+
+
+def affected_articles(index: RelatedIndex, stored: dict, rebuild: bool) -> tuple[set, set]:
+    """(changed articles, articles whose list must be recomputed), with every article indexed."""
+    if rebuild:
+        return set(index), set(index)
+
+    changed = {a for a in index if a not in stored or stored[a]['signature'] != index.signature[a]}
+    affected = set(changed)
+
+    # Lists holding a changed or deleted article
+    for article_id, row in stored.items():
+        if article_id in index and any(r in changed or r not in index for r in row['related_ids']):
+            affected.add(article_id)
+
+    affected |= entering_lists(index, stored, changed, affected)
+    return changed, affected
+
+
+def latest_update(rows: list[dict], current: str | None = None) -> str | None:
+    """The newest updated_at among rows (and current)."""
+    values = [row['updated_at'] for row in rows if row.get('updated_at')] + ([current] if current else [])
+    return max(values, key=lambda value: datetime.fromisoformat(str(value).replace('Z', '+00:00'))) if values else None
+
+
+def full_load(supabase, rebuild: bool) -> dict:
+    """Index every published article and load every stored list."""
+    rows = load_rows(supabase, 'articles', ARTICLE_COLUMNS + ', updated_at', 'id', published_only=True)
+    index = RelatedIndex.from_rows(rows)
+    stored = {
+        row['article_id']: row
+        for row in load_rows(supabase, 'related_articles', RELATED_COLUMNS, 'article_id')
+    }
+    changed, affected = affected_articles(index, stored, rebuild)
+    return {
+        'index': index, 'stored': stored, 'changed': changed, 'affected': affected,
+        # Rows of articles that were unpublished (deleted ones cascade)
+        'stale': [article_id for article_id in stored if article_id not in index],
+        'watermark': latest_update(rows),
+    }
+
+
+def incremental_load(supabase, state: dict) -> dict | None:
+    """
+    Load only the articles updated since the saved watermark, the lists
+    they touch and the candidates of both. None if the published count no
+    longer adds up (articles deleted), which needs a full load.
+    """
+    rows = load_rows(supabase, 'articles', ARTICLE_COLUMNS + ', status, updated_at', 'id',
+                     updated_since=state['watermark'])
+    stored = {
+        row['article_id']: row
+        for row in load_by_ids(supabase, 'related_articles', RELATED_COLUMNS, 'article_id', {r['id'] for r in rows})
+    }
+    published = [row for row in rows if row.get('status') == 'published']
+    removed = [row for row in rows if row.get('status') != 'published' and row['id'] in stored]
+    changed = {
+        row['id'] for row in published
+        if row['id'] not in stored or stored[row['id']]['signature'] != article_signature(row)
+    }
+
+    # Frequencies follow new and unpublished articles; edits are picked up by the next full load
+    sizes = dict(state['sizes'])
+    frequencies = {(channel, (kind, value)): count for channel, kind, value, count in state['frequencies']}
+    for row, delta in [(row, 1) for row in published if row['id'] not in stored] + [(row, -1) for row in removed]:
+        channel = row.get('channel') or ''
+        sizes[channel] = sizes.get(channel, 0) + delta
+        for feature in article_features(row):
+            frequencies[(channel, feature)] = frequencies.get((channel, feature), 0) + delta
+    count = supabase.table('articles').select('id', count='exact').eq('status', 'published').limit(1).execute().count
+    if sum(sizes.values()) != count:
+        return None
+
+    index = RelatedIndex(sizes, {key: n for key, n in frequencies.items() if n > 0})
+    index.add_rows(published)
+    affected = set(changed)
+
+    # Lists holding a changed or unpublished article
+    gone = {row['id'] for row in removed}
+    moved = sorted(changed | gone)
+    for i in range(0, len(moved), IN_BATCH_SIZE):
+        holders = supabase.table('related_articles').select(RELATED_COLUMNS).overlaps(
+            'related_ids', moved[i:i + IN_BATCH_SIZE]
+        ).execute().data
+        for row in holders:
+            stored.setdefault(row['article_id'], row)
+            if row['article_id'] not in gone:
+                affected.add(row['article_id'])
+
+    # Lists a changed article may now enter
+    fetch_postings(supabase, index, changed)
+    candidates = {other for article_id in changed for other in index.candidates(article_id)}
+    stored.update(
+        (row['article_id'], row)
+        for row in load_by_ids(supabase, 'related_articles', RELATED_COLUMNS, 'article_id', candidates - set(stored))
+    )
+    affected |= entering_lists(index, stored, changed, affected)
+
+    # Everything the recomputed lists are built from
+    index.add_rows(load_by_ids(supabase, 'articles', ARTICLE_COLUMNS, 'id', affected - set(index), published_only=True))
+    affected &= set(index)
+    fetch_postings(supabase, index, affected)
+    return {
+        'index': index, 'stored': stored, 'changed': changed, 'affected': affected,
+        'stale': sorted(gone), 'watermark': latest_update(rows, state['watermark']),
+    }
+
+
+def load_state(supabase) -> tuple[int | None, dict | None]:
+    """(row id, state) of the saved related-articles state, or (None, None)."""
+    result = supabase.table('metrics').select('id, data').eq(
+        'metric_type', STATE_TYPE
+    ).order('computed_at', desc=True).limit(1).execute()
+    if not result.data:
+        return None, None
+    return result.data[0]['id'], result.data[0]['data']
+
+
+def save_state(supabase, state_id: int | None, index: RelatedIndex, watermark: str | None, full_load_at: str):
+    now = datetime.now(timezone.utc).isoformat()
+    data = {
+        'version': STATE_VERSION,
+        'watermark': watermark,
+        'full_load_at': full_load_at,
+        'sizes': index.sizes,
+        'frequencies': [
+            [channel, kind, value, count] for (channel, (kind, value)), count in sorted(index.frequencies.items())
+        ],
+    }
+    row = {'metric_type': STATE_TYPE, 'data': data, 'computed_at': now}
+    if state_id is None:
+        supabase.table('metrics').insert(row).execute()
+    else:
+        supabase.table('metrics').update(row).eq('id', state_id).execute()
+
+
+def full_load_reason(state: dict | None, now: datetime, rebuild: bool) -> str | None:
+    if rebuild:
+        return 'requested'
+    if state is None or state.get('version') != STATE_VERSION or not state.get('watermark'):
+        return 'no saved state'
+    if now - datetime.fromisoformat(state['full_load_at']) > FULL_LOAD_AFTER:
+        return 'periodic full load'
+    return None
+
+
+def unchanged(old: dict | None, new: dict) -> bool:
+    """Whether a stored row already holds a computed list (scores are stored as REAL)."""
+    return (
+        old is not None
+        and old['signature'] == new['signature']
+        and old['related_ids'] == new['related_ids']
+        and all(abs(x - y) < 1e-4 for x, y in zip(old['scores'], new['scores']))
+    )
+
+
+def update_related_articles(supabase, rebuild: bool = False, dry_run: bool = False) -> dict:
+    """Recompute the related lists that changed and write them. Returns stats."""
+    stats = {'articles': 0, 'changed': 0, 'recomputed': 0, 'written': 0, 'removed': 0}
+    now = datetime.now(timezone.utc)
+    try:
+        state_id, state = load_state(supabase)
+        reason = full_load_reason(state, now, rebuild)
+        loaded = None if reason else incremental_load(supabase, state)
+        if loaded is None:
+            reason = reason or 'published count changed'
+            print(f"  Related articles: loading every article ({reason})")
+            loaded = full_load(supabase, rebuild)
+    except Exception as e:
+        print(f"  Warning: Could not load articles for related lists: {e}")
+        return stats
+
+    index, stored, affected, stale = loaded['index'], loaded['stored'], loaded['affected'], loaded['stale']
+    stats.update(articles=len(index.features), changed=len(loaded['changed']), recomputed=len(affected))
+
+    computed_at = now.isoformat()
+    pending = []
+    for article_id in affected:
+        related = index.related(article_id)
+        row = {
+            'article_id': article_id,
+            'related_ids': [other for other, _ in related],
+            'scores': [score for _, score in related],
+            'signature': index.signature[article_id],
+        }
+        if unchanged(stored.get(article_id), row):
+            continue
+        pending.append({**row, 'computed_at': computed_at})
+
+    if dry_run:
+        print(f"  Related articles (dry run): {len(pending)} lists to write, {len(stale)} to remove")
+        return stats
+
+    try:
+        for i in range(0, len(pending), WRITE_BATCH_SIZE):
+            supabase.table('related_articles').upsert(
+                pending[i:i + WRITE_BATCH_SIZE], on_conflict='article_id'
+            ).execute()
+            stats['written'] += len(pending[i:i + WRITE_BATCH_SIZE])
+        for i in range(0, len(stale), WRITE_BATCH_SIZE):
+            supabase.table('related_articles').delete().in_('article_id', stale[i:i + WRITE_BATCH_SIZE]).execute()
+            stats['removed'] += len(stale[i:i + WRITE_BATCH_SIZE])
+        save_state(supabase, state_id, index, loaded['watermark'],
+                   computed_at if reason else state['full_load_at'])
+    except Exception as e:
+        print(f"  Warning: Could not write related articles: {e}")
+
+    print(f"  Related articles: {stats['changed']} changed, {stats['recomputed']} recomputed, "
+          f"{stats['written']} written, {stats['removed']} removed")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute related articles')
+    parser.add_argument('--rebuild', action='store_true', help='Recompute every related list')
+    parser.add_argument('--dry-run', action='store_true', help='Compute without writing')
+    args = parser.parse_args()
+
+    if not SUPABASE_KEY:
+        print("Error: Missing SUPABASE_SERVICE_KEY in environment.")
+        sys.exit(1)
+    from clients import get_supabase
+
+    update_related_articles(get_supabase(SUPABASE_URL, SUPABASE_KEY), rebuild=args.rebuild, dry_run=args.dry_run)
+
+
+if __name__ == '__main__':
+    main()
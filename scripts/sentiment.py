@@ -0,0 +1,179 @@
+"""
+Lexicon-based sentiment scoring for English and Arabic articles.
+
+Offline and dependency-free: each article's text is normalized once with
+arabic.normalize (lowercase, Arabic diacritics/tatweel removed, letter
+variants folded), split into word tokens by one precompiled regex, and
+each token is looked up in a single word -> weight table built from both
+lexicons at import. A negator flips the weights of the next
+NEGATION_SCOPE tokens. Arabic tokens not in the table are retried once
+without a clitic prefix (و, ب, ال, ...).
+
+The summed weight is squashed into [-1, 1] (score / score_text) and bucketed
+into negative / neutral / positive (score_label). The sync stores the
+score in articles.sentiment_score when an article is written, so the
+dashboard aggregates only ever read stored scores.
+
+The lexicons are tuned for conflict and geopolitics reporting, where
+"strike" or "ceasefire" carry the tone of a story.
+"""
+
+import re
+import math
+from functools import lru_cache
+
+from arabic import normalize
+
+# Weights from -3 (strongly negative) to 3 (strongly positive)
+EN_LEXICON = {
+    # Violence and casualties
+    'killed': -3, 'killing': -3, 'kills': -3, 'dead': -3, 'deaths': -3, 'death': -3,
+    'massacre': -3, 'massacres': -3, 'genocide': -3, 'slaughter': -3, 'executed': -3,
+    'martyrs': -2, 'martyred': -2, 'casualties': -2, 'wounded': -2, 'injured': -2,
+    'injuries': -2, 'victims': -2, 'bodies': -2,
+    # Military action
+    'attack': -2, 'attacks': -2, 'attacked': -2, 'strike': -2, 'strikes': -2,
+    'airstrike': -2, 'airstrikes': -2, 'bombing': -2, 'bombed': -2, 'bombardment': -2,
+    'shelling': -2, 'explosion': -2, 'explosions': -2, 'blast': -2, 'raid': -2,
+    'raids': -2, 'invasion': -2, 'assault': -2, 'assassination': -3, 'assassinated': -3,
+    'war': -2, 'warfare': -2, 'clashes': -2, 'fighting': -2, 'combat': -1,
+    'missile': -1, 'missiles': -1, 'rockets': -1, 'drone': -1, 'drones': -1,
+    'escalation': -2, 'escalate': -2, 'escalates': -2, 'offensive': -1,
+    'siege': -2, 'blockade': -2, 'occupation': -2, 'incursion': -2,
+    # Harm and crisis
+    'destroyed': -2, 'destruction': -2, 'devastating': -3, 'collapse': -2,
+    'crisis': -2, 'famine': -3, 'starvation': -3, 'displaced': -2, 'displacement': -2,
+    'refugees': -1, 'hostage': -2, 'hostages': -2, 'kidnapped': -2, 'detained': -1,
+    'arrested': -1, 'arrests': -1, 'terror': -3, 'terrorist': -3, 'terrorism': -3,
+    'violence': -2, 'violent': -2, 'threat': -2, 'threats': -2, 'threatens': -2,
+    'threatened': -2, 'sanctions': -1, 'condemn': -2, 'condemns': -2, 'condemned': -2,
+    'accuse': -1, 'accused': -1, 'warns': -1, 'warning': -1, 'fear': -2, 'fears': -2,
+    'tension': -1, 'tensions': -1, 'failed': -2, 'failure': -2, 'crackdown': -2,
+    'aggression': -2, 'hostile': -2, 'catastrophe': -3, 'disaster': -3, 'tragedy': -3,
+    # De-escalation and relief
+    'ceasefire': 2, 'truce': 2, 'peace': 3, 'peaceful': 2, 'agreement': 2, 'agreed': 1,
+    'deal': 1, 'accord': 2, 'treaty': 2, 'negotiations': 1, 'talks': 1, 'dialogue': 2,
+    'diplomacy': 1, 'reconciliation': 3, 'cooperation': 2, 'cooperate': 2,
+    'aid': 1, 'relief': 2, 'humanitarian': 1, 'rescue': 2, 'rescued': 2,
+    'released': 2, 'release': 1, 'freed': 2, 'reconstruction': 2, 'recovery': 2,
+    'rebuild': 2, 'stability': 2, 'stable': 1, 'secure': 1, 'support': 1,
+    'welcome': 2, 'welcomed': 2, 'welcomes': 2, 'success': 2, 'successful': 2,
+    'progress': 2, 'breakthrough': 2, 'hope': 2, 'calm': 1, 'resolve': 1,
+    'resolved': 2, 'win': 2, 'victory': 2, 'improve': 2, 'improved': 2, 'growth': 1,
+}
+
+AR_LEXICON = {
+    # Violence and casualties
+    'قتل': -3, 'قتلى': -3, 'مقتل': -3, 'قتيل': -3, 'مجزرة': -3, 'مجازر': -3,
+    'إبادة': -3, 'إعدام': -3, 'شهيد': -2, 'شهداء': -2, 'استشهاد': -2,
+    'ضحايا': -2, 'جرحى': -2, 'جريح': -2, 'إصابة': -2, 'إصابات': -2, 'جثث': -2,
+    # Military action
+    'هجوم': -2, 'هجمات': -2, 'غارة': -2, 'غارات': -2, 'قصف': -2, 'انفجار': -2,
+    'انفجارات': -2, 'تفجير': -2, 'اقتحام': -2, 'غزو': -2, 'اغتيال': -3,
+    'حرب': -2, 'اشتباكات': -2, 'معارك': -2, 'قتال': -2, 'صاروخ': -1, 'صواريخ': -1,
+    'مسيرة': -1, 'مسيرات': -1, 'تصعيد': -2, 'حصار': -2, 'احتلال': -2, 'توغل': -2,
+    'عدوان': -2, 'عملية': -1,
+    # Harm and crisis
+    'دمار': -2, 'تدمير': -2, 'انهيار': -2, 'أزمة': -2, 'مجاعة': -3, 'تجويع': -3,
+    'نزوح': -2, 'نازحين': -2, 'لاجئين': -1, 'رهائن': -2, 'أسرى': -1, 'اختطاف': -2,
+    'اعتقال': -1, 'اعتقالات': -1, 'إرهاب': -3, 'إرهابي': -3, 'عنف': -2,
+    'تهديد': -2, 'تهديدات': -2, 'يهدد': -2, 'عقوبات': -1, 'إدانة': -2, 'يدين': -2,
+    'تدين': -2, 'اتهام': -1, 'تحذير': -1, 'يحذر': -1, 'تحذر': -1, 'مخاوف': -2,
+    'توتر': -1, 'توترات': -1, 'فشل': -2, 'قمع': -2, 'كارثة': -3, 'كارثي': -3,
+    'مأساة': -3,
+    # De-escalation and relief
+    'هدنة': 2, 'سلام': 3, 'سلمي': 2, 'اتفاق': 2, 'اتفاقية': 2, 'معاهدة': 2,
+    'مفاوضات': 1, 'محادثات': 1, 'حوار': 2, 'دبلوماسية': 1, 'مصالحة': 3,
+    'تعاون': 2, 'مساعدات': 1, 'إغاثة': 2, 'إنسانية': 1, 'إنقاذ': 2,
+    'الإفراج': 2, 'إفراج': 2, 'تحرير': 1, 'إعمار': 2, 'تعافي': 2, 'استقرار': 2,
+    'أمن': 1, 'دعم': 1, 'ترحيب': 2, 'يرحب': 2, 'ترحب': 2, 'نجاح': 2, 'تقدم': 2,
+    'أمل': 2, 'تهدئة': 2, 'انتصار': 2, 'نصر': 2, 'تحسن': 2, 'نمو': 1,
+}
+
+NEGATORS = {
+    'not', 'no', 'never', 'without', 'nor', "isn't", "wasn't", "didn't", "don't",
+    "doesn't", "won't", "can't", "aren't", "weren't", 'لا', 'لم', 'لن', 'ليس',
+    'ليست', 'غير', 'دون', 'بدون', 'عدم',
+}
+
+# Tokens after a negator whose weight is flipped
+NEGATION_SCOPE = 3
+
+# Squashing constant: a summed weight of 4 scores ~0.72
+SCORE_ALPHA = 15
+
+# Scores strictly inside (NEGATIVE_THRESHOLD, POSITIVE_THRESHOLD) are neutral
+NEGATIVE_THRESHOLD = -0.05
+POSITIVE_THRESHOLD = 0.05
+
+# Arabic clitic prefixes tried (longest first) when a token is not in the lexicon
+ARABIC_PREFIXES = ('وال', 'بال', 'فال', 'كال', 'لل', 'ال', 'و', 'ف', 'ب', 'ل')
+
+# Words, with an inner apostrophe (straight or typographic) kept: didn't, don’t
+_TOKEN = re.compile(r"\w+(?:['’]\w+)?")
+
+
+def _compile(*lexicons: dict) -> dict:
+    table = {}
+    for lexicon in lexicons:
+        for word, weight in lexicon.items():
+            table[normalize(word)] = weight
+    return table
+
+
+# Both lexicons in lookup form; English and Arabic words never collide
+LEXICON = _compile(EN_LEXICON, AR_LEXICON)
+_NEGATORS = frozenset(normalize(w) for word in NEGATORS for w in (word, word.replace("'", '’')))
+_PREFIXES = tuple(normalize(prefix) for prefix in ARABIC_PREFIXES)
+
+
+@lru_cache(maxsize=1 << 16)
+def token_weight(token: str) -> int:
+    """Lexicon weight of a normalized token (0 if unknown); cached, as most tokens repeat."""
+    weight = LEXICON.get(token)
+    if weight is not None:
+        return weight
+    for prefix in _PREFIXES:
+        if token.startswith(prefix) and len(token) - len(prefix) >= 2:
+            weight = LEXICON.get(token[len(prefix):])
+            if weight is not None:
+                return weight
+    return 0
+
+
+def raw_score(text: str) -> int:
+    """Summed lexicon weight of a normalized text, with negation."""
+    total = 0
+    negated = 0
+    for token in _TOKEN.findall(text):
+        if token in _NEGATORS:
+            negated = NEGATION_SCOPE
+            continue
+        weight = token_weight(token)
+        if negated:
+            weight = -weight
+            negated -= 1
+        total += weight
+    return total
+
+
+def score(text: str) -> float:
+    """Sentiment score in [-1, 1] of a normalized text (0 for empty or neutral text)."""
+    total = raw_score(text)
+    return round(total / math.sqrt(total * total + SCORE_ALPHA), 3)
+
+
+def score_text(text: str) -> float:
+    """Sentiment score in [-1, 1] of raw text."""
+    return score(normalize(text or ''))
+
+
+def score_label(score: float | None) -> str:
+    """negative / neutral / positive bucket of a score (neutral if unscored)."""
+    if score is None:
+        return 'neutral'
+    if score <= NEGATIVE_THRESHOLD:
+        return 'negative'
+    if score >= POSITIVE_THRESHOLD:
+        return 'positive'
+    return 'neutral'
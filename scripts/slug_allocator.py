@@ -0,0 +1,115 @@
+"""
+Slug allocation for new articles.
+
+Slugs are unique per channel (idx_articles_slug_channel on (slug, channel)),
+so EN and AR articles may share one. Instead of loading every slug of a
+channel and probing slug-2, slug-3, ... in Python, SlugAllocator keeps an
+in-process index of base slug -> highest suffix in use, filled on demand:
+
+- prepare(bases) checks all not-yet-known base slugs with one batched
+  `slug IN (...)` query, plus a paginated `slug LIKE 'base-%'` prefix
+  query for each base that turns out to be taken (rare).
+- allocate(base) then returns the base, or base-<max suffix + 1>, without
+  touching the database.
+- If an insert still hits the unique index (e.g. publish_article.py wrote
+  the same slug concurrently), conflict(slug) refreshes that base from the
+  database and the caller retries with a new allocate().
+
+Cost per run is O(new articles) instead of O(table).
+"""
+
+# Base slugs per existence query (keeps the request URL short)
+CHECK_BATCH_SIZE = 100
+
+# Slugs per page of a prefix query
+PREFIX_BATCH_SIZE = 1000
+
+# Insert retries after a slug conflict before giving up on a row
+MAX_CONFLICT_RETRIES = 3
+
+
+def split_suffix(slug: str, base: str) -> int | None:
+    """Return N if slug is base-N (N >= 2), 1 if slug is base, else None."""
+    if slug == base:
+        return 1
+    if slug.startswith(base + '-'):
+        tail = slug[len(base) + 1:]
+        if tail.isdigit() and int(tail) >= 2:
+            return int(tail)
+    return None
+
+
+def is_slug_conflict(error: Exception) -> bool:
+    """Whether an insert failed on the (slug, channel) unique index."""
+    code = getattr(error, 'code', None)
+    text = str(error)
+    return (code == '23505' or 'duplicate key' in text or 'UNIQUE constraint' in text) and 'slug' in text
+
+
+class SlugAllocator:
+    """Allocates collision-free slugs for one channel."""
+
+    def __init__(self, supabase, channel: str):
+        self.supabase = supabase
+        self.channel = channel
+        # base slug -> highest suffix in use (0 = free, 1 = base itself taken)
+        self._max_suffix = {}
+
+    def __contains__(self, base: str) -> bool:
+        return base in self._max_suffix
+
+    def _refresh(self, base: str):
+        """
+        Load the highest suffix in use for one base slug. The prefix query is
+        read in slug order with keyset pagination: suffixes sort as text
+        (base-9 after base-10) and the prefix also matches other bases
+        (base-strikes), so no single page is known to hold the highest.
+        """
+        highest = self._max_suffix.get(base, 0)
+        last = ''
+        while True:
+            result = self.supabase.table('articles').select('slug').eq(
+                'channel', self.channel
+            ).like('slug', f'{base}-%').gt('slug', last).order('slug').limit(PREFIX_BATCH_SIZE).execute()
+            if not result.data:
+                break
+            for row in result.data:
+                suffix = split_suffix(row['slug'], base)
+                if suffix:
+                    highest = max(highest, suffix)
+            last = result.data[-1]['slug']
+        # Reaching this point means the base itself is taken
+        self._max_suffix[base] = max(highest, 1)
+
+    def prepare(self, bases):
+        """Look up every base slug not in the index with batched queries."""
+        unknown = list(dict.fromkeys(b for b in bases if b and b not in self._max_suffix))
+        for i in range(0, len(unknown), CHECK_BATCH_SIZE):
+            batch = unknown[i:i + CHECK_BATCH_SIZE]
+            result = self.supabase.table('articles').select('slug').eq(
+                'channel', self.channel
+            ).in_('slug', batch).execute()
+            taken = {row['slug'] for row in result.data}
+            for base in batch:
+                if base in taken:
+                    self._refresh(base)
+                else:
+                    self._max_suffix[base] = 0
+
+    def allocate(self, base: str) -> str:
+        """Reserve and return a free slug for base (call prepare first)."""
+        if base not in self._max_suffix:
+            self.prepare([base])
+        used = self._max_suffix[base]
+        if used == 0:
+            self._max_suffix[base] = 1
+            return base
+        suffix = max(used + 1, 2)
+        self._max_suffix[base] = suffix
+        return f"{base}-{suffix}"
+
+    def conflict(self, slug: str, base: str):
+        """Record that slug turned out to be taken; refresh base from the database."""
+        suffix = split_suffix(slug, base) or 1
+        self._max_suffix[base] = max(self._max_suffix.get(base, 0), suffix)
+        self._refresh(base)
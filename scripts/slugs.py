@@ -0,0 +1,131 @@
+"""
+Article slug generation.
+
+Slugs are versioned. A stored slug is never rewritten (it is the article
+URL), so every version stays valid and only new articles get SLUG_VERSION:
+
+1. Latin letters and digits only, `article-<hash>` for titles with fewer
+   than 5 of them - a byte-identical port of src/lib/slugify.ts, which the
+   website uses for articles created in the admin.
+2. Like 1, but Arabic is transliterated to Latin first (transliteration.py),
+   so Arabic titles get readable slugs instead of `article-<hash>`.
+
+Version 1 and generateSlug() in TypeScript must agree on every title. The
+differences between the two runtimes are handled explicitly:
+
+- Whitespace is JavaScript's \\s set (which includes U+FEFF but not
+  U+001C-U+001F or U+0085, unlike Python's), not Python's.
+- The fallback hash iterates UTF-16 code units like String.charCodeAt,
+  so titles with emoji or other astral characters hash the same.
+
+Titles are processed with one precompiled str.translate table instead of
+a per-character category filter and three regex passes, and ASCII titles
+skip Unicode normalization. generate_slugs() slugs a whole batch; the
+fixture suite in tests/fixtures/slugify-cases.json is checked by both
+tests/lib/slugify.spec.ts and `python backfill_slugs.py --check-fixtures`.
+"""
+
+import re
+import struct
+import unicodedata
+from operator import mul
+from transliteration import has_arabic, transliterate
+
+SLUG_VERSIONS = (1, 2)
+# Version used for new slugs
+SLUG_VERSION = 2
+
+MAX_SLUG_LENGTH = 80
+MIN_SLUG_LENGTH = 5
+
+# JavaScript's \s (ECMAScript WhiteSpace + LineTerminator)
+JS_WHITESPACE = (
+    '\t\n\v\f\r \u00a0\u1680'
+    + ''.join(chr(c) for c in range(0x2000, 0x200b))
+    + '\u2028\u2029\u202f\u205f\u3000\ufeff'
+)
+
+HTML_TAG_PATTERN = re.compile(r'<[^>]*>')
+
+_HASH_MASK = 0xFFFFFFFF
+
+
+class _SlugTable(dict):
+    """
+    str.translate table for the lowercase/filter/separator steps: keeps
+    a-z and 0-9, lowercases A-Z, turns whitespace and '-' into '-' and
+    drops everything else (cached on first sight).
+    """
+
+    def __missing__(self, code: int):
+        self[code] = None
+        return None
+
+
+def _build_table() -> _SlugTable:
+    table = _SlugTable()
+    for c in 'abcdefghijklmnopqrstuvwxyz0123456789':
+        table[ord(c)] = c
+    for c in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ':
+        table[ord(c)] = c.lower()
+    for c in JS_WHITESPACE + '-':
+        table[ord(c)] = '-'
+    return table
+
+
+SLUG_TABLE = _build_table()
+
+# 31**k mod 2**32, extended on demand by js_string_hash
+_POWERS = [1]
+
+
+def js_string_hash(text: str) -> int:
+    """
+    The `h = ((h << 5) - h + charCodeAt(i)) | 0` hash from slugify.ts as
+    an unsigned 32-bit int: sum(unit_i * 31**(n-1-i)) mod 2**32 over the
+    UTF-16 code units, computed with map/sum instead of a Python loop.
+    """
+    if text.isascii():
+        units = text.encode('ascii')
+    else:
+        data = text.encode('utf-16-le')
+        units = struct.unpack(f'<{len(data) // 2}H', data)
+    while len(_POWERS) < len(units):
+        _POWERS.append((_POWERS[-1] * 31) & _HASH_MASK)
+    return sum(map(mul, reversed(units), _POWERS)) & _HASH_MASK
+
+
+def latin_slug(title: str) -> str:
+    """The Latin part of a slug (before the short-title fallback)."""
+    if '<' in title:
+        title = HTML_TAG_PATTERN.sub('', title)
+    if not title.isascii():
+        # Combining marks left by NFKD are dropped by the table like any
+        # other non-Latin character
+        title = unicodedata.normalize('NFKD', title)
+    text = title.translate(SLUG_TABLE)
+    if '--' in text or text.startswith('-') or text.endswith('-'):
+        text = '-'.join(part for part in text.split('-') if part)
+    return text[:MAX_SLUG_LENGTH].rstrip('-')
+
+
+def generate_slug(title: str, fallback_id: str = '', version: int | None = None) -> str:
+    """Generate a URL-friendly slug from an article title (default: SLUG_VERSION)."""
+    version = version or SLUG_VERSION
+    if version >= 2 and not title.isascii() and has_arabic(title):
+        slug = latin_slug(transliterate(title))
+    else:
+        slug = latin_slug(title)
+    if len(slug) < MIN_SLUG_LENGTH:
+        slug = f"article-{js_string_hash(fallback_id or title):08x}"
+    return slug
+
+
+def generate_slugs(titles, fallback_ids=None, version: int | None = None) -> list[str]:
+    """generate_slug for a batch of titles (fallback_ids aligned with titles)."""
+    if fallback_ids is None:
+        return [generate_slug(title, '', version) for title in titles]
+    return [
+        generate_slug(title, fallback_id, version)
+        for title, fallback_id in zip(titles, fallback_ids, strict=True)
+    ]
@@ -0,0 +1,229 @@
+"""
+Sync Daemon for The Observer
+Long-running replacement for the cron-launched fetch_telegram.py and
+fetch_news_headlines.py runs.
+
+Keeps one Telegram connection, one Supabase client and a warm in-memory
+cache of existing articles per channel for the lifetime of the process:
+- New, edited and deleted posts (and discussion comments with --comments)
+  are applied as they arrive by telegram_events.EventIngestor
+- Catch-up incremental article sync and deleted-post check every
+  ARTICLE_INTERVAL, for anything missed while disconnected (plus comments
+  if enabled)
+- Dashboard metrics snapshot after each catch-up, and every
+  SNAPSHOT_INTERVAL when live updates changed articles
+- Related-article lists and EN/AR translation links after each catch-up
+- Headline fetch every HEADLINE_INTERVAL
+
+Once it is deployed, set the repository variable SYNC_DAEMON_ENABLED=true
+so the scheduled GitHub Actions runs of both scripts stop: they can't
+share the Telegram session with the daemon.
+
+Usage:
+    python sync_daemon.py
+    python sync_daemon.py --comments
+    python sync_daemon.py --no-headlines --article-interval 1800
+"""
+
+import os
+import sys
+import signal
+import asyncio
+import argparse
+import traceback
+from pathlib import Path
+
+import fetch_news_headlines as headlines_job
+from clients import get_supabase, connect_telegram
+from fetch_telegram import (
+    METRICS as TELEGRAM_METRICS, SNAPSHOT, API_ID, API_HASH, SESSION_STRING, SUPABASE_URL, SUPABASE_KEY, CHANNELS,
+    load_sync_state, save_sync_state, load_existing_articles,
+    sync_channel_articles, sync_comments_for_channel, detect_deleted_articles,
+)
+from telegram_events import EventIngestor, log
+from instrumentation import add_metrics_arguments
+from related_articles import update_related_articles
+from translations import update_translation_links
+
+# Fix Windows console encoding for Arabic/emoji
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+# Default schedule (seconds). Pushes are handled live, so the article
+# sync only catches up on updates missed while disconnected.
+ARTICLE_INTERVAL = 6 * 60 * 60
+HEADLINE_INTERVAL = 30 * 60
+SNAPSHOT_INTERVAL = 15 * 60
+
+
+class SyncDaemon:
+    """Runs article, comment and headline sync on a schedule and on pushes."""
+
+    def __init__(self, client, supabase, args):
+        self.client = client
+        self.supabase = supabase
+        self.args = args
+        self.sync_state = load_sync_state()
+        # channel -> {telegram_id: row}, kept current by smart_upsert_articles
+        self.caches = {}
+        # Article syncs share the caches and sync state, so run one at a time
+        self.article_lock = asyncio.Lock()
+        self.ingestor = EventIngestor(client, supabase, self.caches, self.article_lock)
+        self.stop_event = asyncio.Event()
+
+    async def warm_caches(self):
+        """Load existing articles for every channel once."""
+        for channel in CHANNELS:
+            cache = load_existing_articles(self.supabase, channel)
+            self.caches[channel] = cache if cache is not None else {}
+            log(f"Cached {len(self.caches[channel])} existing {channel} articles")
+
+    # --- jobs ---
+
+    async def sync_articles(self, channel: str):
+        """Incremental sync of one channel using the warm cache."""
+        async with self.article_lock:
+            stats = await sync_channel_articles(
+                self.client, self.supabase, channel, CHANNELS[channel], self.sync_state,
+                limit=self.args.limit, existing_data=self.caches[channel],
+            )
+            save_sync_state(self.sync_state)
+        log(f"Articles @{CHANNELS[channel]}: {stats['inserted']} new, {stats['updated']} updated, "
+            f"{stats['skipped']} unchanged, {stats['errors']} errors")
+
+    async def check_deleted(self, channel: str):
+        """Remove articles whose post was deleted while no events were received."""
+        async with self.article_lock:
+            await detect_deleted_articles(
+                self.client, self.supabase, channel, CHANNELS[channel], self.sync_state,
+                existing_data=self.caches[channel],
+            )
+            save_sync_state(self.sync_state)
+
+    async def sync_all_articles(self):
+        # Metrics cover the catch-up run plus the live updates since the last one
+        for channel in CHANNELS:
+            await self.sync_articles(channel)
+            await self.check_deleted(channel)
+        if self.args.comments:
+            async with self.article_lock:
+                for channel, username in CHANNELS.items():
+                    await sync_comments_for_channel(
+                        self.client, self.supabase, username, channel, self.sync_state,
+                    )
+                save_sync_state(self.sync_state)
+        with TELEGRAM_METRICS.stage('snapshot'):
+            SNAPSHOT.publish(self.supabase)
+        with TELEGRAM_METRICS.stage('related'):
+            update_related_articles(self.supabase)
+        with TELEGRAM_METRICS.stage('translations'):
+            update_translation_links(self.supabase)
+        TELEGRAM_METRICS.report()
+        TELEGRAM_METRICS.reset()
+
+    async def publish_snapshot(self):
+        """Publish the dashboard metrics snapshot if live updates changed articles."""
+        if SNAPSHOT.changes or SNAPSHOT.invalid_reason:
+            SNAPSHOT.publish(self.supabase)
+
+    async def sync_headlines(self):
+        """Fetch RSS feeds and save the delta in worker threads, off the event loop."""
+        headlines_job.METRICS.reset()
+        fetched = await asyncio.to_thread(headlines_job.fetch_all_headlines)
+        await asyncio.to_thread(headlines_job.store_headlines, self.supabase, fetched)
+        headlines_job.METRICS.report()
+
+    # --- scheduling ---
+
+    async def run_job(self, name: str, job, *job_args):
+        """Run a job, logging (not raising) any error."""
+        try:
+            await job(*job_args)
+        except Exception as e:
+            log(f"Job {name} failed: {e}")
+            traceback.print_exc()
+
+    async def run_every(self, name: str, interval: int, job):
+        """Run a job now and then every interval seconds until stopped."""
+        while not self.stop_event.is_set():
+            log(f"Running {name}")
+            await self.run_job(name, job)
+            try:
+                await asyncio.wait_for(self.stop_event.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self):
+        await self.warm_caches()
+        await self.ingestor.start(comments=self.args.comments)
+
+        tasks = [
+            asyncio.create_task(self.run_every('articles', self.args.article_interval, self.sync_all_articles)),
+            asyncio.create_task(self.run_every('snapshot', SNAPSHOT_INTERVAL, self.publish_snapshot)),
+        ]
+        if not self.args.no_headlines:
+            tasks.append(asyncio.create_task(
+                self.run_every('headlines', self.args.headline_interval, self.sync_headlines)
+            ))
+
+        log("Daemon running (Ctrl+C to stop)")
+        await self.stop_event.wait()
+
+        log("Stopping...")
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.ingestor.stop()
+        save_sync_state(self.sync_state)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Run the Telegram and headline sync as a daemon')
+    parser.add_argument('--article-interval', type=int, default=ARTICLE_INTERVAL,
+                        help='Seconds between catch-up incremental article syncs')
+    parser.add_argument('--headline-interval', type=int, default=HEADLINE_INTERVAL,
+                        help='Seconds between headline fetches')
+    parser.add_argument('--limit', type=int, default=2000, help='Maximum messages to fetch per channel per sync')
+    parser.add_argument('--comments', action='store_true', help='Also sync discussion group comments (live and on catch-up)')
+    parser.add_argument('--no-headlines', action='store_true', help='Do not run the headline job')
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    # Both jobs append to the same JSON lines file; each gets its own textfile
+    for job_metrics in (TELEGRAM_METRICS, headlines_job.METRICS):
+        prom = None
+        if args.metrics_prom:
+            path = Path(args.metrics_prom)
+            prom = str(path.with_name(f"{path.stem}_{job_metrics.job}{path.suffix}"))
+        job_metrics.configure(jsonl=args.metrics_jsonl, prometheus=prom)
+
+    if not API_ID or not API_HASH:
+        print("Error: Missing Telegram API credentials.")
+        return
+    if not SUPABASE_KEY:
+        print("Error: Missing Supabase service key.")
+        return
+
+    supabase = get_supabase(SUPABASE_URL, SUPABASE_KEY)
+    client = await connect_telegram(API_ID, API_HASH, SESSION_STRING, os.path.dirname(__file__))
+    if client is None:
+        return
+
+    daemon = SyncDaemon(client, supabase, args)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, daemon.stop_event.set)
+        except (NotImplementedError, RuntimeError):
+            # Not supported on Windows; Ctrl+C raises KeyboardInterrupt instead
+            pass
+
+    try:
+        await daemon.run()
+    finally:
+        await client.disconnect()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,314 @@
+"""
+Push-based Telegram ingestion for The Observer.
+
+Subscribes to new, edited and deleted messages in the configured CHANNELS
+and their linked discussion groups, and feeds them through the same
+group -> combine -> media -> upsert path as fetch_telegram.py:
+
+- Channel posts are buffered per channel and flushed DEBOUNCE_SECONDS after
+  the last update (at most MAX_WAIT_SECONDS after the first), so all parts
+  of a multi-part post are grouped together. Each flush re-reads the
+  CONTEXT_MESSAGES before the buffered ones, so a late part is merged into
+  the article it belongs to instead of becoming an article of its own.
+  Updates far apart (an old edit flushed with a new post) are re-read as
+  separate small windows, never as the whole history between them.
+- A deleted channel post removes its article; a deleted later part
+  re-combines the article it belonged to.
+- Discussion group messages are inserted as comments straight away;
+  edited and deleted comments are updated or removed.
+
+Used by sync_daemon.py; the scheduled incremental sync stays as a catch-up
+for anything missed while disconnected.
+"""
+
+import asyncio
+import traceback
+from datetime import datetime, timezone
+
+from fetch_telegram import (
+    CHANNELS,
+    discover_discussion_group, group_multipart_messages, is_candidate_message,
+    is_candidate_comment, build_group_article, build_comment_record,
+    smart_upsert_articles, delete_articles,
+)
+
+# Wait this long after the last update of a channel before flushing it
+DEBOUNCE_SECONDS = 20
+# ...but never hold an update longer than this
+MAX_WAIT_SECONDS = 120
+
+# Earlier messages re-read on each flush to complete multi-part groups
+CONTEXT_MESSAGES = 10
+
+
+def id_windows(ids, context: int = CONTEXT_MESSAGES) -> list[tuple[int, list[int]]]:
+    """
+    Split message ids into clusters whose context windows overlap, so each
+    cluster is re-read with one bounded request. Returns (window start,
+    sorted ids) per cluster; the window covers window start + 1 to the
+    last id.
+    """
+    windows = []
+    for message_id in sorted(ids):
+        if windows and message_id - windows[-1][1][-1] <= 2 * context:
+            windows[-1][1].append(message_id)
+        else:
+            windows.append((max(message_id - context, 0), [message_id]))
+    return windows
+
+
+def log(message: str):
+    """Print a timestamped log line."""
+    print(f"[{datetime.now(timezone.utc):%Y-%m-%d %H:%M:%S}] {message}", flush=True)
+
+
+class ArticleIdLookup:
+    """
+    Maps telegram_id -> article DB id for build_comment_record, querying
+    the database on first use of each telegram_id.
+    """
+
+    def __init__(self, supabase):
+        self.supabase = supabase
+        self._ids = {}
+
+    def get(self, telegram_id: str):
+        if telegram_id not in self._ids:
+            result = self.supabase.table('articles').select('id').eq('telegram_id', telegram_id).execute()
+            if not result.data:
+                # Not synced (yet) - don't cache, the article may arrive later
+                return None
+            self._ids[telegram_id] = result.data[0]['id']
+        return self._ids[telegram_id]
+
+
+class EventIngestor:
+    """Applies Telegram update events to articles and article_comments."""
+
+    def __init__(self, client, supabase, caches: dict, lock: asyncio.Lock):
+        self.client = client
+        self.supabase = supabase
+        # channel -> {telegram_id: row}, shared with the scheduled sync
+        self.caches = caches
+        self.lock = lock
+        # Marked chat ID -> channel ('en' / 'ar')
+        self.channel_chats = {}
+        # Marked chat ID -> (channel, discussion group entity)
+        self.group_chats = {}
+        self.entities = {}
+        # channel -> {message_id: Message} waiting to be flushed
+        self.buffers = {channel: {} for channel in CHANNELS}
+        # channel -> message IDs whose neighbourhood must be re-parsed
+        self.anchors = {channel: set() for channel in CHANNELS}
+        self.first_pending = {}
+        self.pending = {}
+        self.article_ids = ArticleIdLookup(supabase)
+
+    async def start(self, comments: bool = True):
+        """Resolve the chats and register the update handlers."""
+        from telethon import events, utils
+
+        for channel, username in CHANNELS.items():
+            entity = await self.client.get_entity(username)
+            self.entities[channel] = entity
+            self.channel_chats[utils.get_peer_id(entity)] = channel
+            if comments:
+                group = await discover_discussion_group(self.client, username)
+                if group:
+                    self.group_chats[utils.get_peer_id(group)] = (channel, group)
+
+        chats = list(self.channel_chats) + list(self.group_chats)
+        self.client.add_event_handler(self.on_new_message, events.NewMessage(chats=chats))
+        self.client.add_event_handler(self.on_edited_message, events.MessageEdited(chats=chats))
+        # Channel deletions carry the chat ID; filter in the handler instead
+        self.client.add_event_handler(self.on_deleted_messages, events.MessageDeleted())
+        log(f"Listening to {len(self.channel_chats)} channels and {len(self.group_chats)} discussion groups")
+
+    async def stop(self):
+        """Cancel pending flushes and flush what is buffered."""
+        for task in self.pending.values():
+            task.cancel()
+        await asyncio.gather(*self.pending.values(), return_exceptions=True)
+        self.pending.clear()
+        for channel in CHANNELS:
+            if self.buffers[channel] or self.anchors[channel]:
+                await self.flush(channel)
+
+    # --- handlers ---
+
+    async def on_new_message(self, event):
+        await self.handle_message(event, edited=False)
+
+    async def on_edited_message(self, event):
+        await self.handle_message(event, edited=True)
+
+    async def handle_message(self, event, edited: bool):
+        try:
+            channel = self.channel_chats.get(event.chat_id)
+            if channel:
+                self.buffers[channel][event.message.id] = event.message
+                self.schedule_flush(channel)
+                return
+
+            if event.chat_id in self.group_chats:
+                if edited:
+                    await self.update_comment(event.chat_id, event.message)
+                else:
+                    await self.insert_comment(event.chat_id, event.message)
+        except Exception as e:
+            log(f"Error handling message {event.id}: {e}")
+            traceback.print_exc()
+
+    async def on_deleted_messages(self, event):
+        try:
+            channel = self.channel_chats.get(event.chat_id)
+            if channel:
+                await self.handle_deleted_posts(channel, event.deleted_ids)
+            elif event.chat_id in self.group_chats:
+                self.delete_comments(event.chat_id, event.deleted_ids)
+        except Exception as e:
+            log(f"Error handling deleted messages {event.deleted_ids}: {e}")
+            traceback.print_exc()
+
+    # --- channel posts ---
+
+    def schedule_flush(self, channel: str):
+        """(Re)start the debounce timer for a channel."""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        first = self.first_pending.setdefault(channel, now)
+        delay = min(DEBOUNCE_SECONDS, max(first + MAX_WAIT_SECONDS - now, 0))
+
+        previous = self.pending.get(channel)
+        if previous and not previous.done():
+            previous.cancel()
+
+        async def delayed():
+            await asyncio.sleep(delay)
+            self.pending.pop(channel, None)
+            try:
+                await self.flush(channel)
+            except Exception as e:
+                log(f"Flush of {channel} failed: {e}")
+                traceback.print_exc()
+
+        self.pending[channel] = asyncio.create_task(delayed())
+
+    async def handle_deleted_posts(self, channel: str, message_ids: list[int]):
+        """Delete articles whose first message is gone; re-parse the rest."""
+        username = CHANNELS[channel]
+        cache = self.caches[channel]
+        async with self.lock:
+            article_ids = [f"{username}/{mid}" for mid in message_ids if f"{username}/{mid}" in cache]
+            if article_ids:
+                removed = delete_articles(self.supabase, article_ids, cache)
+                log(f"Deleted {removed} articles from @{username}")
+
+        # Other IDs may have been later parts of an article
+        rest = [mid for mid in message_ids if f"{username}/{mid}" not in article_ids]
+        for mid in rest:
+            self.buffers[channel].pop(mid, None)
+        if rest:
+            self.anchors[channel].update(rest)
+            self.schedule_flush(channel)
+
+    async def flush(self, channel: str):
+        """Group the buffered messages with their context and upsert the articles they touch."""
+        buffered = self.buffers[channel]
+        anchors = self.anchors[channel]
+        self.buffers[channel] = {}
+        self.anchors[channel] = set()
+        self.first_pending.pop(channel, None)
+        if not buffered and not anchors:
+            return
+
+        username = CHANNELS[channel]
+        cache = self.caches[channel]
+        touched = []
+        for window_start, window_ids in id_windows(set(buffered) | anchors):
+            touched += await self.touched_groups(channel, buffered, anchors, window_start, window_ids[-1])
+
+        async with self.lock:
+            articles = []
+            for group in touched:
+                article = await build_group_article(
+                    self.client, self.supabase, group, channel, username, cache,
+                )
+                if article:
+                    articles.append(article)
+            if articles:
+                stats = smart_upsert_articles(self.supabase, articles, channel, existing_data=cache)
+                log(f"Live @{username}: {stats['inserted']} new, {stats['updated']} updated, "
+                    f"{stats['skipped']} unchanged, {stats['errors']} errors")
+
+    async def touched_groups(self, channel: str, buffered: dict, anchors: set, window_start: int, highest: int):
+        """
+        Re-read one window of the channel (the context before the update plus
+        anything up to highest) and return the groups that contain a buffered
+        message or a deleted anchor.
+        """
+        username = CHANNELS[channel]
+        messages = {}
+        async for message in self.client.iter_messages(
+            self.entities[channel], min_id=window_start, max_id=highest + 1,
+        ):
+            messages[message.id] = message
+        # Pushed versions are at least as new as what was just read
+        messages.update({mid: m for mid, m in buffered.items() if window_start < mid <= highest})
+        anchors = {mid for mid in anchors if window_start < mid <= highest}
+        candidates = [m for m in messages.values() if is_candidate_message(m)]
+
+        groups = group_multipart_messages(candidates)
+        if not groups:
+            return []
+
+        # A leading group that starts at the edge of the context window may
+        # be missing earlier parts, unless it is a known article's start
+        first_group = groups[0]
+        if (window_start > 0 and min(m.id for m in first_group) <= window_start + 1
+                and f"{username}/{min(m.id for m in first_group)}" not in self.caches[channel]):
+            touched_first = any(m.id in buffered for m in first_group)
+            groups = groups[1:]
+            if touched_first:
+                log(f"Deferring possibly incomplete group in @{username} to the catch-up sync")
+
+        touched = []
+        for index, group in enumerate(groups):
+            group_ids = {m.id for m in group}
+            next_start = min(m.id for m in groups[index + 1]) if index + 1 < len(groups) else None
+            # A deleted part leaves a gap: it belonged to the group before the next one
+            covers_anchor = any(
+                min(group_ids) <= mid and (next_start is None or mid < next_start) for mid in anchors
+            )
+            if group_ids & set(buffered) or covers_anchor:
+                touched.append(group)
+        return touched
+
+    # --- discussion group comments ---
+
+    async def insert_comment(self, chat_id: int, message):
+        if not is_candidate_comment(message):
+            return
+        channel, group = self.group_chats[chat_id]
+        record = await build_comment_record(
+            self.client, group, CHANNELS[channel], message, self.article_ids,
+        )
+        if record:
+            self.supabase.table('article_comments').insert(record).execute()
+            log(f"Live comment {record['telegram_message_id']} on article {record['article_id']}")
+
+    async def update_comment(self, chat_id: int, message):
+        if not is_candidate_comment(message):
+            return
+        _, group = self.group_chats[chat_id]
+        result = self.supabase.table('article_comments').update(
+            {'content': message.text.strip()[:2000]}
+        ).eq('telegram_message_id', f"{group.id}/{message.id}").execute()
+        if not result.data:
+            # Not synced before (e.g. it was too short) - treat as new
+            await self.insert_comment(chat_id, message)
+
+    def delete_comments(self, chat_id: int, message_ids: list[int]):
+        _, group = self.group_chats[chat_id]
+        tg_ids = [f"{group.id}/{mid}" for mid in message_ids]
+        self.supabase.table('article_comments').delete().in_('telegram_message_id', tg_ids).execute()
@@ -0,0 +1,218 @@
+"""
+Cross-language pairing of English and Arabic articles, run after each
+Telegram sync.
+
+observer_5 (en) and almuraqb (ar) often publish the same piece in both
+languages, but the two channels are synced independently. This stage
+links each such pair through articles.translation_of - both rows point
+at each other - so the site fetches the other-language version by key.
+
+Two articles are candidates when they were posted within
+PAIR_WINDOW_HOURS of each other. Candidates come from one sweep over both
+channels sorted by telegram_date: each article is compared only with the
+other channel's articles still inside the window, never with the whole
+archive. A candidate pair scores on:
+
+- the same media: articles.media_hash, the hash of the first photo/video
+  the sync downloaded for the post
+- the same countries / organizations, compared as canonical names
+  (entities.canonical_entities), so a الدول: إيران header matches
+  COUNTRIES: Iran
+- the numbers both texts contain (Jaccard; Arabic-Indic digits folded)
+- time proximity
+
+Pairs scoring at least MIN_PAIR_SCORE are matched one-to-one, best first.
+Entity sets alone never reach the threshold: a pair also needs the same
+media or shared numbers.
+
+Each run re-pairs the articles of the last PAIRING_DAYS and writes only
+links that changed; a link to an article outside that window is kept.
+--rebuild re-pairs the whole archive.
+
+Usage:
+    python translations.py
+    python translations.py --rebuild
+    python translations.py --dry-run
+"""
+
+import os
+import re
+import sys
+import argparse
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from dotenv import load_dotenv
+
+from entities import (
+    COUNTRY_KEYWORDS, ORGANIZATION_KEYWORDS, COUNTRY_ALIASES, ORGANIZATION_ALIASES, canonical_entities,
+)
+from related_articles import load_rows, article_timestamp
+
+load_dotenv()
+
+SUPABASE_URL = os.getenv('SUPABASE_URL', 'https://gbqvivmfivsuvvdkoiuc.supabase.co')
+SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_KEY')
+
+PAIR_CHANNELS = ('en', 'ar')
+# Largest gap between the two versions of a piece
+PAIR_WINDOW_HOURS = 6
+# Articles re-paired by a normal run
+PAIRING_DAYS = 3
+
+MEDIA_WEIGHT = 3.0
+ENTITY_WEIGHT = 1.0
+NUMBER_WEIGHT = 2.0
+TIME_WEIGHT = 1.0
+MIN_PAIR_SCORE = 3.0
+
+ARTICLE_COLUMNS = 'id, channel, content, countries, organizations, media_hash, telegram_date, translation_of'
+
+_URL = re.compile(r'\S*(?:https?://|t\.me/)\S*')
+# Digits with thousands / decimal separators (ASCII or Arabic); \d matches Arabic-Indic digits
+_NUMBER = re.compile(r'\d+(?:[.,٫٬]\d+)*')
+_DIGITS = str.maketrans({
+    **{chr(0x0660 + i): str(i) for i in range(10)},
+    **{chr(0x06F0 + i): str(i) for i in range(10)},
+    ',': None, '٬': None, '٫': '.',
+})
+
+
+def text_numbers(text: str) -> frozenset:
+    """Numbers in a text as ASCII strings (links and single digits ignored)."""
+    numbers = (match.translate(_DIGITS) for match in _NUMBER.findall(_URL.sub(' ', text or '')))
+    return frozenset(number for number in numbers if len(number) >= 2)
+
+
+@dataclass(slots=True)
+class PairFeatures:
+    """What pairing compares of one article."""
+    id: int
+    channel: str
+    timestamp: float
+    media_hash: str | None
+    countries: frozenset
+    organizations: frozenset
+    numbers: frozenset
+
+
+def pair_features(row: dict) -> PairFeatures:
+    return PairFeatures(
+        id=row['id'],
+        channel=row['channel'],
+        timestamp=article_timestamp(row),
+        media_hash=row.get('media_hash'),
+        countries=canonical_entities(row.get('countries'), COUNTRY_KEYWORDS, COUNTRY_ALIASES),
+        organizations=canonical_entities(row.get('organizations'), ORGANIZATION_KEYWORDS, ORGANIZATION_ALIASES),
+        numbers=text_numbers(row.get('content')),
+    )
+
+
+def pair_score(a: PairFeatures, b: PairFeatures) -> float:
+    """Likelihood score that a and b are the same piece (0 outside the window)."""
+    window = PAIR_WINDOW_HOURS * 3600
+    gap = abs(a.timestamp - b.timestamp)
+    if gap > window:
+        return 0.0
+    score = TIME_WEIGHT * (1 - gap / window)
+    if a.media_hash and a.media_hash == b.media_hash:
+        score += MEDIA_WEIGHT
+    if a.countries and a.countries == b.countries:
+        score += ENTITY_WEIGHT
+    if a.organizations and a.organizations == b.organizations:
+        score += ENTITY_WEIGHT
+    if a.numbers and b.numbers:
+        score += NUMBER_WEIGHT * len(a.numbers & b.numbers) / len(a.numbers | b.numbers)
+    return score
+
+
+def candidate_pairs(articles: list[PairFeatures]) -> list[tuple[float, float, int, int]]:
+    """
+    (score, gap, en id, ar id) of every cross-channel pair within the window
+    scoring at least MIN_PAIR_SCORE, found by one sweep in time order.
+    """
+    window = PAIR_WINDOW_HOURS * 3600
+    # Per channel, the articles of the last window, oldest first
+    recent = {channel: deque() for channel in PAIR_CHANNELS}
+    pairs = []
+    for article in sorted(articles, key=lambda a: (a.timestamp, a.id)):
+        other_channel = PAIR_CHANNELS[1] if article.channel == PAIR_CHANNELS[0] else PAIR_CHANNELS[0]
+        others = recent[other_channel]
+        while others and others[0].timestamp < article.timestamp - window:
+            others.popleft()
+        for other in others:
+            score = pair_score(article, other)
+            if score >= MIN_PAIR_SCORE:
+                en, ar = (article, other) if article.channel == PAIR_CHANNELS[0] else (other, article)
+                pairs.append((score, article.timestamp - other.timestamp, en.id, ar.id))
+        recent[article.channel].append(article)
+    return pairs
+
+
+def match_pairs(articles: list[PairFeatures]) -> dict[int, int]:
+    """One-to-one pairing, best score first: article id -> counterpart id (both ways)."""
+    pairs = candidate_pairs(articles)
+    # Ties go to the closer pair, then to the lower ids, so runs agree
+    pairs.sort(key=lambda pair: (-pair[0], pair[1], pair[2], pair[3]))
+    partner = {}
+    for _, _, en, ar in pairs:
+        if en in partner or ar in partner:
+            continue
+        partner[en] = ar
+        partner[ar] = en
+    return partner
+
+
+def update_translation_links(supabase, rebuild: bool = False, dry_run: bool = False) -> dict:
+    """Re-pair recent articles (all with rebuild) and write the links that changed. Returns stats."""
+    stats = {'articles': 0, 'pairs': 0, 'written': 0}
+    since = None if rebuild else (datetime.now(timezone.utc) - timedelta(days=PAIRING_DAYS)).isoformat()
+    try:
+        rows = load_rows(supabase, 'articles', ARTICLE_COLUMNS, 'id', published_only=True, since=since)
+    except Exception as e:
+        print(f"  Warning: Could not load articles for translation pairing: {e}")
+        return stats
+    rows = [row for row in rows if row.get('channel') in PAIR_CHANNELS]
+
+    loaded = {row['id'] for row in rows}
+    # Articles linked to one outside the window keep their link
+    kept = set() if rebuild else {
+        row['id'] for row in rows if row.get('translation_of') and row['translation_of'] not in loaded
+    }
+    rows = [row for row in rows if row['id'] not in kept]
+    partner = match_pairs([pair_features(row) for row in rows])
+    changes = [(row['id'], partner.get(row['id'])) for row in rows if row.get('translation_of') != partner.get(row['id'])]
+    stats.update(articles=len(rows), pairs=len(partner) // 2)
+
+    if dry_run:
+        print(f"  Translation pairs (dry run): {stats['pairs']} pairs, {len(changes)} links to write")
+        return stats
+
+    try:
+        for article_id, counterpart in changes:
+            supabase.table('articles').update({'translation_of': counterpart}).eq('id', article_id).execute()
+            stats['written'] += 1
+    except Exception as e:
+        print(f"  Warning: Could not write translation links: {e}")
+
+    print(f"  Translation pairs: {stats['pairs']} pairs among {stats['articles']} articles, "
+          f"{stats['written']} links written")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pair English and Arabic versions of the same article')
+    parser.add_argument('--rebuild', action='store_true', help='Re-pair the whole archive')
+    parser.add_argument('--dry-run', action='store_true', help='Pair without writing')
+    args = parser.parse_args()
+
+    if not SUPABASE_KEY:
+        print("Error: Missing SUPABASE_SERVICE_KEY in environment.")
+        sys.exit(1)
+    from clients import get_supabase
+
+    update_translation_links(get_supabase(SUPABASE_URL, SUPABASE_KEY), rebuild=args.rebuild, dry_run=args.dry_run)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Arabic -> Latin transliteration for article slugs.
+
+A simplified, URL-oriented scheme (no diacritics, no apostrophes): the aim
+is a readable slug such as `al-israiliya` rather than a faithful
+romanization. Arabic script usually omits short vowels, so undiacritized
+words come out as consonant skeletons with long vowels (تحليل -> thlil);
+harakat are transliterated when present.
+
+All tables are built once at import:
+
+- LETTERS: single-character mappings, applied with str.translate.
+- SEQUENCES: digraphs and short sequences that need context, matched by
+  one precompiled regex before the per-letter pass. Entries are keyed by
+  position: at the start of a word (the article ال, و/ي as consonants),
+  at the end of a word (the -iya ending), or anywhere (ligatures,
+  doubled consonants with shadda, الله).
+
+Both passes are single left-to-right scans, so transliteration is linear
+in the title length. Non-Arabic text passes through unchanged.
+"""
+
+import re
+import unicodedata
+
+# Arabic letters and marks
+_CONSONANTS = {
+    'ب': 'b', 'ت': 't', 'ث': 'th', 'ج': 'j', 'ح': 'h', 'خ': 'kh',
+    'د': 'd', 'ذ': 'dh', 'ر': 'r', 'ز': 'z', 'س': 's', 'ش': 'sh',
+    'ص': 's', 'ض': 'd', 'ط': 't', 'ظ': 'z', 'غ': 'gh', 'ف': 'f',
+    'ق': 'q', 'ك': 'k', 'ل': 'l', 'م': 'm', 'ن': 'n', 'ه': 'h',
+    # Persian / Urdu letters seen in names
+    'پ': 'p', 'چ': 'ch', 'ژ': 'zh', 'گ': 'g', 'ک': 'k',
+}
+
+LETTERS = {
+    **_CONSONANTS,
+    'ا': 'a', 'أ': 'a', 'إ': 'i', 'آ': 'a', 'ٱ': 'a',
+    'ع': 'a', 'ى': 'a', 'ة': 'a',
+    'و': 'u', 'ي': 'i', 'ی': 'i',
+    # Hamza carriers are silent in slugs
+    'ء': '', 'ؤ': '', 'ئ': '',
+    # Harakat
+    '\u064e': 'a', '\u0650': 'i', '\u064f': 'u',
+    '\u064b': 'an', '\u064d': 'in', '\u064c': 'un',
+    '\u0670': 'a', '\u0652': '', '\u0651': '',
+    # Tatweel
+    '\u0640': '',
+    # Punctuation
+    '،': ' ', '؛': ' ', '؟': ' ', '٪': ' ',
+    # Arabic-Indic and Persian digits
+    **{chr(0x0660 + d): str(d) for d in range(10)},
+    **{chr(0x06F0 + d): str(d) for d in range(10)},
+}
+
+_LETTER_TABLE = str.maketrans(LETTERS)
+
+# Sequences matched at the start of a word
+_WORD_START = {
+    'الله': 'allah',
+    'ال': 'al-', 'وال': 'wal-', 'بال': 'bil-', 'فال': 'fal-', 'كال': 'kal-', 'لل': 'lil-',
+    'الو': 'al-w', 'الي': 'al-y',
+    'و': 'w', 'ي': 'y',
+    'إي': 'i', 'أو': 'aw',
+}
+
+# Sequences matched at the end of a word
+_WORD_END = {
+    'ية': 'iya', 'يه': 'iya',
+}
+
+# Sequences matched anywhere
+_ANYWHERE = {
+    'الله': 'allah',
+    'لا': 'la', 'لأ': 'la', 'لإ': 'li', 'لآ': 'la',
+    'يا': 'ya', 'وا': 'wa', 'يو': 'yu', 'وي': 'wi',
+    'او': 'aw', 'اي': 'ay', 'ائي': 'ai', 'عا': 'a',
+    # Long vowels written with a haraka, and the silent alef after tanwin
+    '\u064eا': 'a', '\u0650ي': 'i', '\u064fو': 'u', '\u064bا': 'an', 'ا\u064b': 'an',
+    # Shadda doubles the consonant it sits on
+    **{c + '\u0651': t * 2 for c, t in _CONSONANTS.items()},
+    'و\u0651': 'ww', 'ي\u0651': 'yy',
+}
+
+
+def _alternation(sequences) -> str:
+    # Longest first, so e.g. 'وال' wins over 'و'
+    return '|'.join(re.escape(s) for s in sorted(sequences, key=len, reverse=True))
+
+
+SEQUENCE_PATTERN = re.compile(
+    rf'(?P<start>(?<!\w)(?:{_alternation(_WORD_START)}))'
+    rf'|(?P<end>(?:{_alternation(_WORD_END)})(?!\w))'
+    rf'|(?P<any>{_alternation(_ANYWHERE)})'
+)
+
+_SEQUENCE_TABLES = {'start': _WORD_START, 'end': _WORD_END, 'any': _ANYWHERE}
+
+# Any character transliterate() changes
+ARABIC_PATTERN = re.compile('[' + ''.join(re.escape(c) for c in LETTERS) + ']')
+
+
+def _replace_sequence(match: re.Match) -> str:
+    return _SEQUENCE_TABLES[match.lastgroup][match.group()]
+
+
+def has_arabic(text: str) -> bool:
+    """Whether transliterate() would change text."""
+    return ARABIC_PATTERN.search(text) is not None
+
+
+def transliterate(text: str) -> str:
+    """Transliterate the Arabic parts of text to Latin letters."""
+    # Presentation forms (e.g. the ﻻ ligature) -> base letters
+    text = unicodedata.normalize('NFKC', text)
+    text = SEQUENCE_PATTERN.sub(_replace_sequence, text)
+    return text.translate(_LETTER_TABLE)
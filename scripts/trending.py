@@ -0,0 +1,88 @@
+"""
+Trending-topic detection for the dashboard snapshot.
+
+Topics are the countries and organizations of each article - the parsed
+COUNTRIES: / ORGS: headers, or detect_countries_legacy() /
+detect_organizations_legacy() when a post has none. Mentions are counted
+exactly per UTC hour (SnapshotAggregates.topics, keyed by hour_key) over
+the last TRENDING_DAYS, so the counts are maintained by the sync's
+article deltas like the rest of the snapshot and memory is bounded by
+the window, not by history.
+
+A topic trends when its mentions over the last RECENT_HOURS burst above
+its own trailing baseline (the rest of the window, scaled to the same
+length):
+
+    score = (recent - expected) / sqrt(expected + 1)
+
+A Poisson-style z-score: a topic that is always mentioned needs a real
+spike to rank, while a topic that was silent ranks on a handful of
+mentions. Topics with fewer than MIN_MENTIONS recent mentions are ignored.
+"""
+
+import math
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+# Mentions are bucketed per hour and kept for this many days
+TRENDING_DAYS = 7
+# The recent window compared against the baseline
+RECENT_HOURS = 24
+TRENDING_LIMIT = 10
+MIN_MENTIONS = 2
+
+HOUR_FORMAT = '%Y-%m-%dT%H'
+
+
+def hour_key(value) -> str | None:
+    """UTC hour bucket ('YYYY-MM-DDTHH') of an ISO 8601 timestamp."""
+    if not value:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    return value.astimezone(timezone.utc).strftime(HOUR_FORMAT)
+
+
+def window_start(today) -> str:
+    """First hour bucket kept: midnight (UTC) TRENDING_DAYS - 1 days before today."""
+    return f"{(today - timedelta(days=TRENDING_DAYS - 1)).isoformat()}T00"
+
+
+def burst_score(recent: int, expected: float) -> float:
+    return (recent - expected) / math.sqrt(expected + 1)
+
+
+def trending_topics(hours: dict, now: datetime, limit: int = TRENDING_LIMIT) -> list[dict]:
+    """
+    Rank topics by burst score from {hour key: {topic: mentions}}.
+
+    Returns [{topic, mentions, baseline, score}], mentions being the
+    recent-window count and baseline the expected count from the trailing
+    hours.
+    """
+    now_hour = now.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    recent_start = (now_hour - timedelta(hours=RECENT_HOURS - 1)).strftime(HOUR_FORMAT)
+    first_hour = datetime.strptime(window_start(now_hour.date()), HOUR_FORMAT).replace(tzinfo=timezone.utc)
+    baseline_hours = (now_hour - first_hour) // timedelta(hours=1) + 1 - RECENT_HOURS
+
+    recent, baseline = Counter(), Counter()
+    for hour, counts in hours.items():
+        (recent if hour >= recent_start else baseline).update(counts)
+
+    ranked = []
+    for topic, mentions in recent.items():
+        if mentions < MIN_MENTIONS:
+            continue
+        expected = baseline[topic] * RECENT_HOURS / baseline_hours if baseline_hours > 0 else 0.0
+        ranked.append({
+            'topic': topic,
+            'mentions': mentions,
+            'baseline': round(expected, 1),
+            'score': round(burst_score(mentions, expected), 2),
+        })
+    # Highest score first, ties by mentions then name so rebuilds and deltas agree
+    ranked.sort(key=lambda t: (-t['score'], -t['mentions'], t['topic']))
+    return ranked[:limit]
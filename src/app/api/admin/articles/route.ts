@@ -2,6 +2,7 @@ import { NextRequest, NextResponse } from 'next/server';
 import { createClient } from '@/lib/supabase/server';
 import { logActivity } from '@/lib/admin/logActivity';
 import { generateSlug } from '@/lib/slugify';
+import { normalizeArabic } from '@/lib/arabic';
 
 export const preferredRegion = 'bom1';
 
@@ -52,7 +53,12 @@ export async function GET(request: NextRequest) {
       query = query.eq('category', category);
     }
     if (search) {
-      query = query.or(`title.ilike.%${search}%,content.ilike.%${search}%`);
+      // Full-text search on the GIN-indexed search_vector (Arabic-normalized, see src/lib/arabic.ts).
+      // The english config leaves Arabic words unstemmed, so it also serves 'all'.
+      query = query.textSearch('search_vector', normalizeArabic(search), {
+        type: 'websearch',
+        config: channel === 'ar' ? 'simple' : 'english',
+      });
     }
 
     // Pagination
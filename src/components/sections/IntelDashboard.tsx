@@ -168,6 +168,8 @@ export default function IntelDashboard({ locale, dict }: IntelDashboardProps) {
   }));
 
   const trendingTopics = metrics.trending.slice(0, 5);
+  // Ranked by burst score, so the top topic is not necessarily the most mentioned
+  const maxMentions = Math.max(1, ...trendingTopics.map((topic) => topic.mentions));
 
   return (
     <section
@@ -339,7 +341,6 @@ export default function IntelDashboard({ locale, dict }: IntelDashboardProps) {
             </div>
             <div className="space-y-3">
               {trendingTopics.map((topic, i) => {
-                const maxMentions = trendingTopics[0]?.mentions || 1;
                 const width = (topic.mentions / maxMentions) * 100;
                 return (
                   <div key={topic.topic} className="relative">
@@ -0,0 +1,25 @@
+/**
+ * Arabic search normalization.
+ * Must match public.normalize_arabic() in the database, which the
+ * search_vector trigger applies to article text (scripts/arabic.py has the
+ * same function): harakat, superscript alef and tatweel are removed, alef
+ * forms fold to ا, alef maqsura to ي and ta marbuta to ه. Queries are
+ * normalized the same way so that "إسرائيل" finds "اسرائيل" and "مدينة"
+ * finds "مدينه".
+ */
+
+// Harakat (U+064B-U+065F), superscript alef (U+0670), tatweel (U+0640)
+const ARABIC_MARKS = /[\u064B-\u065F\u0670\u0640]/g;
+
+// Alef forms -> ا, alef maqsura -> ي, ta marbuta -> ه
+const ARABIC_FOLDS: Record<string, string> = {
+  'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+  'ى': 'ي',
+  'ة': 'ه',
+};
+
+const ARABIC_FOLD_PATTERN = /[أإآٱىة]/g;
+
+export function normalizeArabic(text: string): string {
+  return text.replace(ARABIC_MARKS, '').replace(ARABIC_FOLD_PATTERN, (c) => ARABIC_FOLDS[c]);
+}
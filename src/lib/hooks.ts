@@ -125,7 +125,8 @@ export interface Metrics {
   sentiment: {
     percentages: Record<string, number>;
   };
-  trending: { topic: string; mentions: number }[];
+  // mentions over the last 24h; score = burst over the topic's trailing baseline
+  trending: { topic: string; mentions: number; baseline?: number; score?: number }[];
 }
 
 // Hook to fetch metrics for stats display
@@ -1,5 +1,6 @@
 import { createClient } from '@supabase/supabase-js';
 import { convertAllCapsToSentenceCase } from '@/lib/content';
+import { normalizeArabic } from '@/lib/arabic';
 
 const supabaseUrl = process.env.NEXT_PUBLIC_SUPABASE_URL!;
 const supabaseAnonKey = process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY!;
@@ -24,6 +25,7 @@ export interface DBArticle {
   telegram_date: string;
   image_url: string | null;
   video_url: string | null;
+  translation_of?: number | null;  // Same piece in the other channel (scripts/translations.py)
   created_at: string;
   updated_at: string;
   views: number;
@@ -172,13 +174,65 @@ export async function fetchArticleBySlug(slug: string, channel: 'en' | 'ar'): Pr
   return data;
 }
 
+// Fetch the other-language version of an article (EN <-> AR), if it has one
+export async function fetchArticleTranslation(article: DBArticle): Promise<DBArticle | null> {
+  if (!article.translation_of) return null;
+
+  const { data, error } = await supabase
+    .from('articles')
+    .select('id, telegram_id, slug, channel, title, excerpt, category, countries, organizations, is_structured, telegram_link, telegram_date, image_url, video_url, translation_of, created_at, updated_at, views, likes_count, dislikes_count')
+    .eq('id', article.translation_of)
+    .eq('status', 'published')
+    .maybeSingle();
+
+  if (error) {
+    console.error('Error fetching article translation:', error);
+    return null;
+  }
+
+  return data;
+}
+
+// Fetch the precomputed related articles of an article (scripts/related_articles.py), best first
+export async function fetchRelatedArticles(articleId: number): Promise<DBArticle[]> {
+  const { data: related, error } = await supabase
+    .from('related_articles')
+    .select('related_ids')
+    .eq('article_id', articleId)
+    .maybeSingle();
+
+  if (error) {
+    console.error('Error fetching related articles:', error);
+    return [];
+  }
+  const ids: number[] = related?.related_ids || [];
+  if (ids.length === 0) return [];
+
+  const { data, error: articlesError } = await supabase
+    .from('articles')
+    .select('id, telegram_id, slug, channel, title, excerpt, category, countries, organizations, is_structured, telegram_link, telegram_date, image_url, video_url, created_at, updated_at, views, likes_count, dislikes_count')
+    .in('id', ids)
+    .eq('status', 'published');
+
+  if (articlesError) {
+    console.error('Error fetching related articles:', articlesError);
+    return [];
+  }
+
+  // Keep the stored order; ids of articles deleted since the last sync are skipped
+  const byId = new Map((data || []).map((article) => [article.id, article]));
+  return ids.flatMap((id) => byId.get(id) ?? []) as DBArticle[];
+}
+
 // Full-text search articles (uses tsvector + GIN index)
+// The search_vector is built from Arabic-normalized text, so the query is normalized the same way
 export async function searchArticles(
   query: string,
   channel: 'en' | 'ar' = 'en',
   limit: number = 50
 ): Promise<DBArticle[]> {
   const config = channel === 'ar' ? 'simple' : 'english';
+  query = normalizeArabic(query);
   const { data, error } = await supabase
     .from('articles')
     .select('id, telegram_id, slug, channel, title, excerpt, category, countries, organizations, is_structured, telegram_link, telegram_date, image_url, video_url, created_at, updated_at, views, likes_count, dislikes_count')
@@ -292,28 +346,49 @@ export interface DBNewsHeadline {
   published_at: string | null;
   fetched_at: string;
   is_active: boolean;
+  cluster_id: string | null;
   created_at: string;
 }
 
 // Fetch active news headlines from Supabase
+// Near-duplicate stories share a cluster_id; only the newest one is returned
 export async function fetchNewsHeadlines(
   language: 'en' | 'ar' = 'en',
   limit: number = 20
 ): Promise<DBNewsHeadline[]> {
-  const { data, error } = await supabase
-    .from('news_headlines')
-    .select('*')
-    .eq('language', language)
-    .eq('is_active', true)
-    .order('fetched_at', { ascending: false })
-    .limit(limit);
+  // Several rows can share a cluster, so read newest-first pages until
+  // `limit` distinct clusters are found or the active headlines run out.
+  const pageSize = limit * 2;
+  const seenClusters = new Set<string>();
+  const headlines: DBNewsHeadline[] = [];
+
+  for (let from = 0; headlines.length < limit; from += pageSize) {
+    const { data, error } = await supabase
+      .from('news_headlines')
+      .select('*')
+      .eq('language', language)
+      .eq('is_active', true)
+      .order('fetched_at', { ascending: false })
+      .order('id', { ascending: false })
+      .range(from, from + pageSize - 1);
+
+    if (error) {
+      console.error('Error fetching news headlines from Supabase:', error);
+      return headlines;
+    }
 
-  if (error) {
-    console.error('Error fetching news headlines from Supabase:', error);
-    return [];
+    const page = (data || []) as DBNewsHeadline[];
+    for (const headline of page) {
+      const clusterId = headline.cluster_id || headline.headline_id;
+      if (seenClusters.has(clusterId)) continue;
+      seenClusters.add(clusterId);
+      headlines.push(headline);
+      if (headlines.length >= limit) break;
+    }
+    if (page.length < pageSize) break;
   }
 
-  return data || [];
+  return headlines;
 }
 
 // Convert DB headline to ticker format
@@ -0,0 +1,12 @@
+-- Indexes supporting the headline retention stage in fetch_news_headlines.py
+-- Deactivation and purge filter on (is_active, fetched_at); the ticker
+-- reads recent headlines per language.
+
+CREATE INDEX IF NOT EXISTS idx_news_headlines_active_fetched
+    ON news_headlines(is_active, fetched_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_news_headlines_language_published
+    ON news_headlines(language, published_at DESC);
+
+-- Covered by the leading column of idx_news_headlines_active_fetched
+DROP INDEX IF EXISTS idx_news_headlines_active;
@@ -0,0 +1,10 @@
+-- Near-duplicate clustering for news headlines
+-- cluster_id is the headline_id of the first headline seen in the story
+-- cluster (set by scripts/headline_clusters.py); the ticker shows one
+-- headline per cluster.
+
+ALTER TABLE news_headlines ADD COLUMN IF NOT EXISTS cluster_id TEXT;
+
+UPDATE news_headlines SET cluster_id = headline_id WHERE cluster_id IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_news_headlines_cluster ON news_headlines(cluster_id);
@@ -0,0 +1,8 @@
+-- Prefix index for slug allocation
+-- scripts/slug_allocator.py looks up taken suffixes of a base slug with
+-- `channel = ? AND slug LIKE 'base-%'`; text_pattern_ops lets that use an
+-- index regardless of the database collation. Exact lookups
+-- (`slug IN (...)`) use idx_articles_slug_channel.
+
+CREATE INDEX IF NOT EXISTS idx_articles_channel_slug_pattern
+    ON articles(channel, slug text_pattern_ops);
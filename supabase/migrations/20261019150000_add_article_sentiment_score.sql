@@ -0,0 +1,7 @@
+-- Per-article sentiment score
+-- scripts/sentiment.py scores each article's text when the Telegram sync
+-- writes it (-1 most negative .. 1 most positive; NULL = not scored yet).
+-- The dashboard snapshot buckets the stored scores into
+-- negative / neutral / positive, so old articles are never re-scored.
+
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS sentiment_score REAL;
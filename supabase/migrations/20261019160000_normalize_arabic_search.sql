@@ -0,0 +1,50 @@
+-- Arabic-normalized full-text search
+-- The search_vector of Arabic articles was built from the raw text, so a
+-- query only matched the exact spelling ("إسرائيل" missed "اسرائيل", any
+-- harakat broke a match). normalize_arabic() folds both sides the same
+-- way (src/lib/arabic.ts normalizes queries; shared fixtures in
+-- tests/fixtures/arabic-normalization-cases.json):
+--   - harakat U+064B-U+065F, superscript alef U+0670 and tatweel removed
+--   - alef forms أ إ آ ٱ -> ا, alef maqsura ى -> ي, ta marbuta ة -> ه
+-- idx_articles_search was dropped as unused in 20260215140000 while search
+-- still went through ilike; it is recreated so searches use the index.
+
+CREATE OR REPLACE FUNCTION public.normalize_arabic(input TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+PARALLEL SAFE
+SET search_path = public
+AS $$
+  -- translate() deletes the characters of the second argument that have
+  -- no counterpart in the third
+  SELECT translate(
+    input,
+    E'\u0623\u0625\u0622\u0671\u0649\u0629'
+      || E'\u064B\u064C\u064D\u064E\u064F\u0650\u0651\u0652\u0653\u0654\u0655\u0656\u0657\u0658\u0659\u065A\u065B\u065C\u065D\u065E\u065F'
+      || E'\u0670\u0640',
+    E'\u0627\u0627\u0627\u0627\u064A\u0647'
+  );
+$$;
+
+CREATE OR REPLACE FUNCTION public.articles_search_vector_update()
+RETURNS TRIGGER
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  cfg regconfig;
+BEGIN
+  cfg := CASE WHEN NEW.channel = 'ar' THEN 'simple'::regconfig ELSE 'english'::regconfig END;
+  NEW.search_vector :=
+    setweight(to_tsvector(cfg, normalize_arabic(coalesce(NEW.title, ''))), 'A') ||
+    setweight(to_tsvector(cfg, normalize_arabic(coalesce(NEW.excerpt, ''))), 'B') ||
+    setweight(to_tsvector(cfg, normalize_arabic(coalesce(NEW.content, ''))), 'C');
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Rebuild existing vectors (the trigger recomputes search_vector on update)
+UPDATE articles SET search_vector = NULL WHERE channel = 'ar' OR content ~ E'[\u0600-\u06FF]';
+
+CREATE INDEX IF NOT EXISTS idx_articles_search ON articles USING GIN(search_vector);
@@ -0,0 +1,25 @@
+-- Related articles, precomputed after each Telegram sync
+-- scripts/related_articles.py stores up to 6 related articles per published
+-- article (same channel, weighted Jaccard over countries / organizations /
+-- category), best first. signature identifies the entities a list was
+-- computed from, so a run only recomputes the lists that changed.
+-- related_ids is not a foreign key: lists pointing at a deleted article are
+-- recomputed by the next run, and readers skip ids that no longer exist.
+
+CREATE TABLE IF NOT EXISTS related_articles (
+    article_id BIGINT PRIMARY KEY REFERENCES articles(id) ON DELETE CASCADE,
+    related_ids BIGINT[] NOT NULL DEFAULT '{}',
+    scores REAL[] NOT NULL DEFAULT '{}',
+    signature TEXT NOT NULL,
+    computed_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+ALTER TABLE related_articles ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow public read access" ON related_articles
+    FOR SELECT
+    USING (true);
+
+GRANT SELECT ON related_articles TO anon;
+GRANT SELECT ON related_articles TO authenticated;
+GRANT ALL ON related_articles TO service_role;
@@ -0,0 +1,15 @@
+-- EN/AR translation links
+-- observer_5 and almuraqb often publish the same piece in both languages.
+-- scripts/translations.py pairs them after each Telegram sync and sets
+-- translation_of on both rows to the other one's id, so the site fetches
+-- the other-language version by key.
+-- media_hash is a hash of the first photo/video the sync downloads for a
+-- post, one of the pairing signals (NULL for posts without media and for
+-- articles synced before this column existed).
+
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS translation_of BIGINT REFERENCES articles(id) ON DELETE SET NULL;
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS media_hash TEXT;
+
+-- FK index (ON DELETE SET NULL looks up the rows pointing at a deleted article)
+CREATE INDEX IF NOT EXISTS idx_articles_translation_of ON articles(translation_of)
+    WHERE translation_of IS NOT NULL;
@@ -0,0 +1,12 @@
+-- Lookup indexes for incremental related-article runs
+-- scripts/related_articles.py no longer loads every article on each sync:
+-- - articles updated since the saved watermark: updated_at >= ?
+-- - candidates per entity, newest first: countries @> ARRAY[?] /
+--   organizations @> ARRAY[?] (these GIN indexes were dropped as unused in
+--   20260215140000_fix_missing_fk_indexes.sql)
+-- - stored lists holding a changed article: related_ids && ARRAY[...]
+
+CREATE INDEX IF NOT EXISTS idx_articles_updated_at ON articles(updated_at);
+CREATE INDEX IF NOT EXISTS idx_articles_countries ON articles USING GIN(countries);
+CREATE INDEX IF NOT EXISTS idx_articles_organizations ON articles USING GIN(organizations);
+CREATE INDEX IF NOT EXISTS idx_related_articles_related_ids ON related_articles USING GIN(related_ids);
@@ -0,0 +1,21 @@
+import { test, expect } from '@playwright/test';
+import { normalizeArabic } from '../../src/lib/arabic';
+import cases from '../fixtures/arabic-normalization-cases.json';
+
+/**
+ * Shared Arabic normalization fixtures - the expected output of
+ * public.normalize_arabic(), which builds the search_vector of articles.
+ */
+test.describe('Lib: normalizeArabic', () => {
+  for (const [index, { input, normalized }] of (cases as { input: string; normalized: string }[]).entries()) {
+    test(`case ${index + 1}: ${JSON.stringify(input).slice(0, 50)}`, () => {
+      expect(normalizeArabic(input)).toBe(normalized);
+    });
+  }
+
+  test('normalization is idempotent', () => {
+    for (const { normalized } of cases as { normalized: string }[]) {
+      expect(normalizeArabic(normalized)).toBe(normalized);
+    }
+  });
+});
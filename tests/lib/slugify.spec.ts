@@ -0,0 +1,21 @@
+import { test, expect } from '@playwright/test';
+import { generateSlug } from '../../src/lib/slugify';
+import cases from '../fixtures/slugify-cases.json';
+
+/**
+ * Shared slug fixtures - version 1 of scripts/slugs.py must produce the same slugs
+ * (checked with `python scripts/backfill_slugs.py --check-fixtures`).
+ */
+test.describe('Lib: generateSlug', () => {
+  for (const [index, { title, fallbackId, slug }] of (cases as { title: string; fallbackId?: string; slug: string }[]).entries()) {
+    test(`case ${index + 1}: ${JSON.stringify(title).slice(0, 50)}`, () => {
+      expect(generateSlug(title, fallbackId)).toBe(slug);
+    });
+  }
+
+  test('slugs are at most 80 characters', () => {
+    for (const { title, fallbackId } of cases as { title: string; fallbackId?: string }[]) {
+      expect(generateSlug(title, fallbackId).length).toBeLessThanOrEqual(80);
+    }
+  });
+});